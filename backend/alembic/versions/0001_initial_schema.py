@@ -0,0 +1,86 @@
+"""Initial schema (users, courses, alerts) as created by create_all
+
+Revision ID: 0001
+Revises:
+Create Date: 2025-10-20 00:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "users",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("email", sa.String(length=255), nullable=False),
+        sa.Column("full_name", sa.String(length=100)),
+        sa.Column("is_active", sa.Boolean()),
+        sa.Column("is_verified", sa.Boolean()),
+        sa.Column("email_notifications_enabled", sa.Boolean()),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime(timezone=True)),
+    )
+    op.create_index("ix_users_id", "users", ["id"])
+    op.create_index("ix_users_email", "users", ["email"], unique=True)
+
+    op.create_table(
+        "courses",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("section_id", sa.Integer(), nullable=False),
+        sa.Column("course_id", sa.Integer(), nullable=False),
+        sa.Column("section_name", sa.String(length=10), nullable=False),
+        sa.Column("course_code", sa.String(length=20), nullable=False),
+        sa.Column("course_credit", sa.Integer()),
+        sa.Column("section_type", sa.String(length=20)),
+        sa.Column("capacity", sa.Integer(), nullable=False),
+        sa.Column("consumed_seat", sa.Integer()),
+        sa.Column("real_time_seat_count", sa.Integer(), nullable=False),
+        sa.Column("room_name", sa.String(length=50)),
+        sa.Column("room_number", sa.String(length=50)),
+        sa.Column("faculties", sa.String(length=100)),
+        sa.Column("academic_degree", sa.String(length=20)),
+        sa.Column("semester_session_id", sa.Integer(), nullable=False),
+        sa.Column("schedule_data", sa.JSON()),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime(timezone=True)),
+        sa.Column("last_fetched_at", sa.DateTime(timezone=True)),
+    )
+    op.create_index("ix_courses_id", "courses", ["id"])
+    op.create_index("ix_courses_section_id", "courses", ["section_id"], unique=True)
+    op.create_index("ix_courses_course_id", "courses", ["course_id"])
+    op.create_index("ix_courses_course_code", "courses", ["course_code"])
+
+    op.create_table(
+        "alerts",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("course_id", sa.Integer(), sa.ForeignKey("courses.id"), nullable=False),
+        sa.Column("notification_interval_minutes", sa.Integer()),
+        sa.Column("is_active", sa.Boolean()),
+        sa.Column("last_notification_sent", sa.DateTime(timezone=True)),
+        sa.Column("notification_count", sa.Integer()),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime(timezone=True)),
+    )
+    op.create_index("ix_alerts_id", "alerts", ["id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_alerts_id", table_name="alerts")
+    op.drop_table("alerts")
+    op.drop_index("ix_courses_course_code", table_name="courses")
+    op.drop_index("ix_courses_course_id", table_name="courses")
+    op.drop_index("ix_courses_section_id", table_name="courses")
+    op.drop_index("ix_courses_id", table_name="courses")
+    op.drop_table("courses")
+    op.drop_index("ix_users_email", table_name="users")
+    op.drop_index("ix_users_id", table_name="users")
+    op.drop_table("users")
@@ -0,0 +1,93 @@
+"""Indexes for the hot router queries and a unique (user_id, course_id) on alerts
+
+On Postgres every index is built with CREATE INDEX CONCURRENTLY outside the
+migration transaction, so existing tables stay readable and writable while
+the indexes build. The unique constraint is attached to a concurrently built
+unique index, which only takes a brief lock. Duplicate alerts (possible only
+through races in the old create endpoint) are removed first, keeping the
+oldest row of each (user_id, course_id) pair.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2025-10-20 00:00:01
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+# (name, table, columns, postgres partial predicate, sqlite partial predicate)
+INDEXES = [
+    ("ix_alerts_is_active_course_id", "alerts", ["is_active", "course_id"], None, None),
+    ("ix_alerts_active_course_user", "alerts", ["course_id", "user_id"], "is_active", "is_active = 1"),
+    ("ix_courses_non_lab_seats", "courses", ["real_time_seat_count"], "section_type <> 'LAB'", "section_type <> 'LAB'"),
+    ("ix_courses_section_type_seats", "courses", ["section_type", "real_time_seat_count"], None, None),
+    ("ix_courses_last_fetched_at", "courses", ["last_fetched_at"], None, None),
+]
+
+DEDUPLICATE_ALERTS = """
+    DELETE FROM alerts
+    WHERE id NOT IN (
+        SELECT keep_id FROM (
+            SELECT MIN(id) AS keep_id FROM alerts GROUP BY user_id, course_id
+        ) AS keepers
+    )
+"""
+
+
+def upgrade() -> None:
+    op.execute(DEDUPLICATE_ALERTS)
+
+    if op.get_bind().dialect.name == "postgresql":
+        _upgrade_postgresql()
+        return
+
+    # Batch mode rebuilds the table on SQLite, so add the constraint first
+    with op.batch_alter_table("alerts") as batch_op:
+        batch_op.create_unique_constraint("uq_alerts_user_course", ["user_id", "course_id"])
+    for name, table, columns, _, sqlite_where in INDEXES:
+        op.create_index(
+            name, table, columns,
+            sqlite_where=sa.text(sqlite_where) if sqlite_where else None,
+        )
+
+
+def _upgrade_postgresql() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, columns, postgresql_where, _ in INDEXES:
+            # A failed concurrent build leaves an INVALID index behind
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+            op.create_index(
+                name, table, columns,
+                postgresql_concurrently=True,
+                postgresql_where=sa.text(postgresql_where) if postgresql_where else None,
+            )
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS uq_alerts_user_course")
+        op.execute(
+            "CREATE UNIQUE INDEX CONCURRENTLY uq_alerts_user_course "
+            "ON alerts (user_id, course_id)"
+        )
+        # Attaching the constraint needs a short exclusive lock; fail fast
+        # instead of queueing every request behind a long transaction
+        op.execute("SET lock_timeout = '5s'")
+        op.execute(
+            "ALTER TABLE alerts ADD CONSTRAINT uq_alerts_user_course "
+            "UNIQUE USING INDEX uq_alerts_user_course"
+        )
+        op.execute("RESET lock_timeout")
+
+
+def downgrade() -> None:
+    for name, table, _, _, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
+    if op.get_bind().dialect.name == "postgresql":
+        op.drop_constraint("uq_alerts_user_course", "alerts", type_="unique")
+    else:
+        with op.batch_alter_table("alerts") as batch_op:
+            batch_op.drop_constraint("uq_alerts_user_course", type_="unique")
@@ -0,0 +1,25 @@
+"""Optional exam clash filter on alerts
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2025-10-22 00:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Nullable column without a default: a metadata-only change on Postgres
+    op.add_column("alerts", sa.Column("avoid_exam_clash_with", sa.JSON()))
+
+
+def downgrade() -> None:
+    op.drop_column("alerts", "avoid_exam_clash_with")
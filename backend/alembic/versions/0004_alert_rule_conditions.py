@@ -0,0 +1,45 @@
+"""Rule conditions on alerts: course code targets, seat threshold, days, times and faculty
+
+An alert now targets either one section (course_id) or every section of a
+course code, so course_id becomes nullable. Every new column is nullable or
+has a constant server default, which Postgres applies without rewriting
+the table.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2025-10-24 00:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("alerts") as batch_op:
+        batch_op.alter_column("course_id", existing_type=sa.Integer(), nullable=True)
+        batch_op.add_column(sa.Column("course_code", sa.String(20)))
+        batch_op.add_column(sa.Column("min_seats", sa.Integer(), nullable=False, server_default="1"))
+        batch_op.add_column(sa.Column("days", sa.JSON()))
+        batch_op.add_column(sa.Column("start_after", sa.String(5)))
+        batch_op.add_column(sa.Column("end_before", sa.String(5)))
+        batch_op.add_column(sa.Column("faculty", sa.String(50)))
+
+
+def downgrade() -> None:
+    # Course code rules have no section to fall back to
+    op.execute("DELETE FROM alerts WHERE course_id IS NULL")
+    with op.batch_alter_table("alerts") as batch_op:
+        batch_op.drop_column("faculty")
+        batch_op.drop_column("end_before")
+        batch_op.drop_column("start_after")
+        batch_op.drop_column("days")
+        batch_op.drop_column("min_seats")
+        batch_op.drop_column("course_code")
+        batch_op.alter_column("course_id", existing_type=sa.Integer(), nullable=False)
@@ -0,0 +1,33 @@
+"""Notification state machine on alerts
+
+Alerts notify once per opening instead of every interval while a section
+has seats. Existing alerts start in the armed "watching" state.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2025-10-25 00:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("alerts") as batch_op:
+        batch_op.add_column(sa.Column("state", sa.String(16), nullable=False, server_default="watching"))
+        batch_op.add_column(sa.Column("state_changed_at", sa.DateTime(timezone=True)))
+        batch_op.add_column(sa.Column("last_notified_seats", sa.Integer()))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("alerts") as batch_op:
+        batch_op.drop_column("last_notified_seats")
+        batch_op.drop_column("state_changed_at")
+        batch_op.drop_column("state")
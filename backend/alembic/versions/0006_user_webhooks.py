@@ -0,0 +1,28 @@
+"""Webhook destination on users
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2025-10-26 00:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Nullable columns without defaults: metadata-only changes on Postgres
+    op.add_column("users", sa.Column("webhook_url", sa.String(500)))
+    op.add_column("users", sa.Column("webhook_secret", sa.String(128)))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("users") as batch_op:
+        batch_op.drop_column("webhook_secret")
+        batch_op.drop_column("webhook_url")
@@ -0,0 +1,82 @@
+"""Semester-leading indexes on courses, courses_archive table and frozen alert sections
+
+Past semesters move from courses to courses_archive (see
+app/services/semester_service.py). courses_archive keeps the original
+course ids, so it has no autoincrement key. On Postgres the new courses
+indexes are built concurrently, like the indexes in 0002.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2025-10-27 00:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "courses_archive",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=False),
+        sa.Column("section_id", sa.Integer(), nullable=False),
+        sa.Column("course_id", sa.Integer(), nullable=False),
+        sa.Column("section_name", sa.String(length=10), nullable=False),
+        sa.Column("course_code", sa.String(length=20), nullable=False),
+        sa.Column("course_credit", sa.Integer()),
+        sa.Column("section_type", sa.String(length=20)),
+        sa.Column("capacity", sa.Integer(), nullable=False),
+        sa.Column("consumed_seat", sa.Integer()),
+        sa.Column("real_time_seat_count", sa.Integer(), nullable=False),
+        sa.Column("room_name", sa.String(length=50)),
+        sa.Column("room_number", sa.String(length=50)),
+        sa.Column("faculties", sa.String(length=100)),
+        sa.Column("academic_degree", sa.String(length=20)),
+        sa.Column("semester_session_id", sa.Integer(), nullable=False),
+        sa.Column("schedule_data", sa.JSON()),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime(timezone=True)),
+        sa.Column("last_fetched_at", sa.DateTime(timezone=True)),
+        sa.Column("archived_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.create_index("ix_courses_archive_section_id", "courses_archive", ["section_id"])
+    op.create_index("ix_courses_archive_course_id", "courses_archive", ["course_id"])
+    op.create_index("ix_courses_archive_course_code", "courses_archive", ["course_code"])
+    op.create_index(
+        "ix_courses_archive_semester_code", "courses_archive", ["semester_session_id", "course_code"]
+    )
+
+    # Nullable column without a default: a metadata-only change on Postgres
+    op.add_column("alerts", sa.Column("archived_section_id", sa.Integer()))
+
+    # (name, columns, partial predicate)
+    indexes = [
+        ("ix_courses_semester_code", ["semester_session_id", "course_code"], None),
+        ("ix_courses_semester_non_lab_seats", ["semester_session_id", "real_time_seat_count"], "section_type <> 'LAB'"),
+    ]
+    if op.get_bind().dialect.name == "postgresql":
+        with op.get_context().autocommit_block():
+            for name, columns, where in indexes:
+                op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+                op.create_index(
+                    name, "courses", columns,
+                    postgresql_concurrently=True,
+                    postgresql_where=sa.text(where) if where else None,
+                )
+    else:
+        for name, columns, where in indexes:
+            op.create_index(name, "courses", columns, sqlite_where=sa.text(where) if where else None)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_courses_semester_non_lab_seats", table_name="courses")
+    op.drop_index("ix_courses_semester_code", table_name="courses")
+    with op.batch_alter_table("alerts") as batch_op:
+        batch_op.drop_column("archived_section_id")
+    op.drop_table("courses_archive")
@@ -0,0 +1,46 @@
+"""sync_runs table recording course sync jobs
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2025-10-28 00:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0008"
+down_revision = "0007"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "sync_runs",
+        sa.Column("id", sa.String(32), primary_key=True),
+        sa.Column("trigger", sa.String(16), nullable=False),
+        sa.Column("status", sa.String(16), nullable=False),
+        sa.Column("phase", sa.String(16)),
+        sa.Column("cancel_requested", sa.Boolean(), nullable=False, server_default=sa.false()),
+        sa.Column("worker_pid", sa.Integer()),
+        sa.Column("started_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("finished_at", sa.DateTime(timezone=True)),
+        sa.Column("phase_seconds", sa.JSON()),
+        sa.Column("sections_total", sa.Integer()),
+        sa.Column("processed", sa.Integer()),
+        sa.Column("added", sa.Integer()),
+        sa.Column("updated", sa.Integer()),
+        sa.Column("failed", sa.Integer()),
+        sa.Column("archived", sa.Integer()),
+        sa.Column("error", sa.Text()),
+    )
+    op.create_index("ix_sync_runs_started_at", "sync_runs", ["started_at"])
+    op.create_index("ix_sync_runs_status_finished_at", "sync_runs", ["status", "finished_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_sync_runs_status_finished_at", table_name="sync_runs")
+    op.drop_index("ix_sync_runs_started_at", table_name="sync_runs")
+    op.drop_table("sync_runs")
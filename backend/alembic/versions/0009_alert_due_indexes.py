@@ -0,0 +1,45 @@
+"""Alert indexes for due-alert selection
+
+The notifier loads only the active alerts that can change state (see
+app/services/notification_service.py): those fired or cooling down, found
+through ix_alerts_is_active_state, and armed alerts on course codes with open
+seats, found through ix_alerts_is_active_course_code (course code alerts) or
+ix_alerts_is_active_course_id (section alerts). On Postgres the indexes are
+built concurrently, like the indexes in 0002.
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2025-10-29 00:00:00
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "0009"
+down_revision = "0008"
+branch_labels = None
+depends_on = None
+
+# (name, columns)
+INDEXES = [
+    ("ix_alerts_is_active_state", ["is_active", "state"]),
+    ("ix_alerts_is_active_course_code", ["is_active", "course_code"]),
+]
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        with op.get_context().autocommit_block():
+            for name, columns in INDEXES:
+                # A failed concurrent build leaves an INVALID index behind
+                op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+                op.create_index(name, "alerts", columns, postgresql_concurrently=True)
+    else:
+        for name, columns in INDEXES:
+            op.create_index(name, "alerts", columns)
+
+
+def downgrade() -> None:
+    for name, _ in reversed(INDEXES):
+        op.drop_index(name, table_name="alerts")
@@ -0,0 +1,41 @@
+"""class_slots table: one row per weekly meeting of a section
+
+Written by the course sync (see app/services/class_slots.py); the next sync
+after this migration fills it for the active semester.
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2025-10-30 00:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0010"
+down_revision = "0009"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "class_slots",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("course_id", sa.Integer(), sa.ForeignKey("courses.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("kind", sa.String(length=8), nullable=False),
+        sa.Column("weekday", sa.String(length=10), nullable=False),
+        sa.Column("start_minute", sa.Integer(), nullable=False),
+        sa.Column("end_minute", sa.Integer(), nullable=False),
+    )
+    op.create_index(
+        "ix_class_slots_weekday_start", "class_slots", ["weekday", "start_minute", "end_minute", "course_id"]
+    )
+    op.create_index("ix_class_slots_course_kind_weekday", "class_slots", ["course_id", "kind", "weekday"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_class_slots_course_kind_weekday", table_name="class_slots")
+    op.drop_index("ix_class_slots_weekday_start", table_name="class_slots")
+    op.drop_table("class_slots")
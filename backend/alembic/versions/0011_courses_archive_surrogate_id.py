@@ -0,0 +1,99 @@
+"""courses_archive gets its own primary key; the source id moves to original_id
+
+0007 keyed courses_archive on the archived section's courses.id. SQLite
+hands the ids of an emptied courses table out again, so the sections of a
+later semester collided with archived ones and archiving failed with a
+unique constraint error. The table is rebuilt with an autoincrement id
+(existing rows keep theirs) and a non-unique original_id. Frozen alerts
+also record the archive row they point to in archived_course_id.
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2025-10-31 00:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0011"
+down_revision = "0010"
+branch_labels = None
+depends_on = None
+
+SECTION_COLUMNS = [
+    "section_id", "course_id", "section_name", "course_code", "course_credit", "section_type",
+    "capacity", "consumed_seat", "real_time_seat_count", "room_name", "room_number", "faculties",
+    "academic_degree", "semester_session_id", "schedule_data", "created_at", "updated_at",
+    "last_fetched_at", "archived_at",
+]
+
+
+def upgrade() -> None:
+    op.create_table(
+        "courses_archive_new",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("original_id", sa.Integer(), nullable=False),
+        sa.Column("section_id", sa.Integer(), nullable=False),
+        sa.Column("course_id", sa.Integer(), nullable=False),
+        sa.Column("section_name", sa.String(length=10), nullable=False),
+        sa.Column("course_code", sa.String(length=20), nullable=False),
+        sa.Column("course_credit", sa.Integer()),
+        sa.Column("section_type", sa.String(length=20)),
+        sa.Column("capacity", sa.Integer(), nullable=False),
+        sa.Column("consumed_seat", sa.Integer()),
+        sa.Column("real_time_seat_count", sa.Integer(), nullable=False),
+        sa.Column("room_name", sa.String(length=50)),
+        sa.Column("room_number", sa.String(length=50)),
+        sa.Column("faculties", sa.String(length=100)),
+        sa.Column("academic_degree", sa.String(length=20)),
+        sa.Column("semester_session_id", sa.Integer(), nullable=False),
+        sa.Column("schedule_data", sa.JSON()),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime(timezone=True)),
+        sa.Column("last_fetched_at", sa.DateTime(timezone=True)),
+        sa.Column("archived_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    columns = ", ".join(SECTION_COLUMNS)
+    op.execute(
+        f"INSERT INTO courses_archive_new (id, original_id, {columns}) "
+        f"SELECT id, id, {columns} FROM courses_archive"
+    )
+    op.drop_table("courses_archive")
+    op.rename_table("courses_archive_new", "courses_archive")
+    if op.get_bind().dialect.name == "postgresql":
+        # The copied ids were inserted explicitly; move the sequence past them
+        op.execute(
+            "SELECT setval(pg_get_serial_sequence('courses_archive', 'id'), "
+            "COALESCE((SELECT MAX(id) FROM courses_archive), 0) + 1, false)"
+        )
+
+    op.create_index("ix_courses_archive_section_id", "courses_archive", ["section_id"])
+    op.create_index("ix_courses_archive_course_id", "courses_archive", ["course_id"])
+    op.create_index("ix_courses_archive_course_code", "courses_archive", ["course_code"])
+    op.create_index(
+        "ix_courses_archive_semester_code", "courses_archive", ["semester_session_id", "course_code"]
+    )
+    op.create_index(
+        "ix_courses_archive_semester_original_id", "courses_archive", ["semester_session_id", "original_id"]
+    )
+
+    # Nullable column without a default: a metadata-only change on Postgres
+    op.add_column("alerts", sa.Column("archived_course_id", sa.Integer()))
+    # Alerts frozen so far point at the row keyed on their old course id
+    op.execute(
+        "UPDATE alerts SET archived_course_id = ("
+        "SELECT MAX(courses_archive.id) FROM courses_archive "
+        "WHERE courses_archive.section_id = alerts.archived_section_id"
+        ") WHERE archived_section_id IS NOT NULL"
+    )
+
+
+def downgrade() -> None:
+    # The archive keeps its own ids; only the columns added here are dropped
+    with op.batch_alter_table("alerts") as batch_op:
+        batch_op.drop_column("archived_course_id")
+    op.drop_index("ix_courses_archive_semester_original_id", table_name="courses_archive")
+    with op.batch_alter_table("courses_archive") as batch_op:
+        batch_op.drop_column("original_id")
@@ -0,0 +1,43 @@
+"""At most one running sync job, enforced by a partial unique index
+
+Workers checked for a running job and then inserted their own in separate
+statements, so two workers could both start a full sync. Starting a job is
+now claimed by inserting its running row; uq_sync_runs_running makes the
+second insert fail. Extra running rows left by such a race are marked
+failed first, keeping the newest.
+
+Revision ID: 0012
+Revises: 0011
+Create Date: 2025-11-02 00:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0012"
+down_revision = "0011"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute(sa.text(
+        "UPDATE sync_runs SET status = 'failed', error = 'Superseded by a concurrent run' "
+        "WHERE status = 'running' AND id NOT IN ("
+        "SELECT id FROM (SELECT id FROM sync_runs WHERE status = 'running' "
+        "ORDER BY started_at DESC LIMIT 1) AS newest)"
+    ))
+    op.create_index(
+        "uq_sync_runs_running",
+        "sync_runs",
+        ["status"],
+        unique=True,
+        postgresql_where=sa.text("status = 'running'"),
+        sqlite_where=sa.text("status = 'running'"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("uq_sync_runs_running", table_name="sync_runs")
@@ -0,0 +1,195 @@
+"""
+Cache with TTL, namespaces and pluggable backends.
+
+- memory: in-process LRU bounded by entry count and total bytes
+- redis:  shared by every worker and API node and kept across restarts;
+          eviction follows the server's maxmemory-policy (allkeys-lru in
+          docker-compose.yml)
+
+Values are bytes; get_json/set_json wrap JSON documents. A failing backend
+is treated as a miss, so the cache can never fail a request.
+"""
+from collections import OrderedDict
+from time import monotonic
+from typing import Any, Awaitable, Callable, Optional, Tuple
+import json
+import logging
+import os
+
+from app.metrics import Counter
+
+logger = logging.getLogger(__name__)
+
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "memory")
+CACHE_PREFIX = os.getenv("CACHE_PREFIX", "seatz")
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "4096"))
+CACHE_MAX_BYTES = int(os.getenv("CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+# Keep a dead Redis from stalling requests: fail fast and read it as a miss
+REDIS_TIMEOUT_SECONDS = float(os.getenv("REDIS_TIMEOUT_SECONDS", "0.5"))
+
+CACHE_REQUESTS = Counter("seatz_cache_requests_total", "Cache lookups by namespace and result", ["namespace", "result"])
+
+
+class MemoryBackend:
+    """Process-local LRU; entries past their TTL are dropped when read or evicted"""
+
+    shared = False
+
+    def __init__(self, max_entries: int = CACHE_MAX_ENTRIES, max_bytes: int = CACHE_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.size_bytes = 0
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[Optional[float], bytes]]" = OrderedDict()
+
+    async def get(self, namespace: str, key: str) -> Optional[bytes]:
+        entry_key = (namespace, key)
+        entry = self._entries.get(entry_key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at is not None and expires_at <= monotonic():
+            self._remove(entry_key)
+            return None
+        self._entries.move_to_end(entry_key)
+        return value
+
+    async def set(self, namespace: str, key: str, value: bytes, ttl: Optional[float] = None):
+        entry_key = (namespace, key)
+        if len(value) > self.max_bytes:
+            return
+        self._remove(entry_key)
+        self._entries[entry_key] = (monotonic() + ttl if ttl else None, value)
+        self.size_bytes += len(value)
+        while len(self._entries) > self.max_entries or self.size_bytes > self.max_bytes:
+            self._remove(next(iter(self._entries)))
+
+    async def delete(self, namespace: str, key: str):
+        self._remove((namespace, key))
+
+    async def clear(self, namespace: Optional[str] = None):
+        for entry_key in [entry_key for entry_key in self._entries if namespace is None or entry_key[0] == namespace]:
+            self._remove(entry_key)
+
+    async def close(self):
+        pass
+
+    def _remove(self, entry_key):
+        entry = self._entries.pop(entry_key, None)
+        if entry is not None:
+            self.size_bytes -= len(entry[1])
+
+
+class RedisBackend:
+    """Keys are "<prefix>:<namespace>:<key>"; TTLs use PX (milliseconds)"""
+
+    shared = True
+
+    def __init__(self, url: str = REDIS_URL, prefix: str = CACHE_PREFIX):
+        import redis.asyncio as redis
+
+        self.client = redis.Redis.from_url(
+            url, socket_timeout=REDIS_TIMEOUT_SECONDS, socket_connect_timeout=REDIS_TIMEOUT_SECONDS
+        )
+        self.prefix = prefix
+
+    def _key(self, namespace: str, key: str) -> str:
+        return f"{self.prefix}:{namespace}:{key}"
+
+    async def get(self, namespace: str, key: str) -> Optional[bytes]:
+        return await self.client.get(self._key(namespace, key))
+
+    async def set(self, namespace: str, key: str, value: bytes, ttl: Optional[float] = None):
+        await self.client.set(self._key(namespace, key), value, px=int(ttl * 1000) if ttl else None)
+
+    async def delete(self, namespace: str, key: str):
+        await self.client.delete(self._key(namespace, key))
+
+    async def clear(self, namespace: Optional[str] = None):
+        pattern = f"{self.prefix}:{namespace}:*" if namespace else f"{self.prefix}:*"
+        batch = []
+        async for key in self.client.scan_iter(match=pattern, count=500):
+            batch.append(key)
+            if len(batch) >= 500:
+                await self.client.delete(*batch)
+                batch = []
+        if batch:
+            await self.client.delete(*batch)
+
+    async def close(self):
+        await self.client.close()
+
+
+class Cache:
+    """Namespaced front end over a backend; errors are logged and read as misses"""
+
+    def __init__(self, backend):
+        self.backend = backend
+
+    @property
+    def shared(self) -> bool:
+        """True when entries are visible to other processes and survive restarts"""
+        return self.backend.shared
+
+    async def get(self, namespace: str, key: str) -> Optional[bytes]:
+        try:
+            value = await self.backend.get(namespace, key)
+        except Exception as e:
+            logger.warning(f"Cache get {namespace}:{key} failed: {e}")
+            value = None
+        CACHE_REQUESTS.labels(namespace, "hit" if value is not None else "miss").inc()
+        return value
+
+    async def set(self, namespace: str, key: str, value: bytes, ttl: Optional[float] = None):
+        try:
+            await self.backend.set(namespace, key, value, ttl)
+        except Exception as e:
+            logger.warning(f"Cache set {namespace}:{key} failed: {e}")
+
+    async def delete(self, namespace: str, key: str):
+        try:
+            await self.backend.delete(namespace, key)
+        except Exception as e:
+            logger.warning(f"Cache delete {namespace}:{key} failed: {e}")
+
+    async def clear(self, namespace: Optional[str] = None):
+        try:
+            await self.backend.clear(namespace)
+        except Exception as e:
+            logger.warning(f"Cache clear {namespace or '*'} failed: {e}")
+
+    async def get_json(self, namespace: str, key: str) -> Any:
+        value = await self.get(namespace, key)
+        return json.loads(value) if value is not None else None
+
+    async def set_json(self, namespace: str, key: str, value: Any, ttl: Optional[float] = None):
+        await self.set(namespace, key, json.dumps(value, separators=(",", ":"), default=str).encode(), ttl)
+
+    async def get_or_set_json(
+        self, namespace: str, key: str, factory: Callable[[], Awaitable[Any]], ttl: Optional[float] = None
+    ) -> Any:
+        """Cached JSON value, computing and storing it on a miss (None results are not cached)"""
+        value = await self.get_json(namespace, key)
+        if value is None:
+            value = await factory()
+            if value is not None:
+                await self.set_json(namespace, key, value, ttl)
+        return value
+
+    async def close(self):
+        try:
+            await self.backend.close()
+        except Exception as e:
+            logger.warning(f"Cache close failed: {e}")
+
+
+def create_cache(backend: str = CACHE_BACKEND) -> Cache:
+    if backend == "redis":
+        return Cache(RedisBackend())
+    if backend != "memory":
+        logger.warning(f"Unknown CACHE_BACKEND {backend!r}, using memory")
+    return Cache(MemoryBackend())
+
+
+# Global cache instance
+cache = create_cache()
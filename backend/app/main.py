@@ -1,10 +1,21 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
-from app.database import create_tables
-from app.routers import courses_router, users_router, alerts_router, sync_router, realtime_router
+from sqlalchemy.exc import OperationalError, TimeoutError as PoolTimeoutError
+from app.database import DB_BUSY_RETRY_AFTER_SECONDS, create_tables, run_migrations, engine, read_engine
+from app.metrics import REGISTRY, CONTENT_TYPE, MetricsMiddleware, register_db_pools
+from app.profiling import ProfilingMiddleware, install_query_hooks
+from app.responses import FastJSONResponse
+from app.services.coordination import coordinator, startup_lock
+from app.services.webhook_service import webhook_service
+from app.cache import cache
+from app.services.realtime_service import realtime_service
+from app.services.bracu_service import bracu_service
+from app.routers import courses_router, users_router, alerts_router, sync_router, realtime_router, schedule_router, occupancy_router, admin_router
 import logging
 from contextlib import asynccontextmanager
 import asyncio
+import os
 from datetime import datetime
 
 # Configure logging
@@ -16,20 +27,31 @@ async def lifespan(app: FastAPI):
     """Application lifespan events"""
     # Startup
     logger.info("Starting SeatZ Backend...")
-    create_tables()
-    logger.info("Database tables created/verified")
+    with startup_lock():
+        if os.getenv("MIGRATE_ON_STARTUP", "true").lower() == "true":
+            run_migrations()
+            logger.info("Database migrations applied")
+        else:
+            create_tables()
+            logger.info("Database tables created/verified")
+    # Loads the persisted feed snapshot (warm start) before serving
+    await coordinator.start()
     
     yield
     
     # Shutdown
     logger.info("Shutting down SeatZ Backend...")
+    await coordinator.stop()
+    await webhook_service.close()
+    await cache.close()
 
 # Create FastAPI app
 app = FastAPI(
     title="SeatZ API",
     description="Smart Seat Alerts for BRACU Students",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse
 )
 
 # Configure CORS
@@ -39,7 +61,36 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Snapshot-Version", "X-Snapshot-Age", "X-Snapshot-Stale"],
 )
+app.add_middleware(ProfilingMiddleware)
+app.add_middleware(MetricsMiddleware)
+
+engines = {"write": engine} if read_engine is engine else {"write": engine, "read": read_engine}
+register_db_pools(engines)
+for db_engine in engines.values():
+    install_query_hooks(db_engine)
+
+def _database_busy() -> FastJSONResponse:
+    return FastJSONResponse(
+        {"detail": "The database is busy, retry shortly"},
+        status_code=503,
+        headers={"Retry-After": str(DB_BUSY_RETRY_AFTER_SECONDS)},
+    )
+
+@app.exception_handler(PoolTimeoutError)
+async def writer_pool_timeout(request: Request, exc: PoolTimeoutError):
+    """No writer connection freed up in time (on SQLite, a course sync holds the only one)"""
+    logger.warning(f"{request.method} {request.url.path}: database pool timeout")
+    return _database_busy()
+
+@app.exception_handler(OperationalError)
+async def database_locked(request: Request, exc: OperationalError):
+    """SQLite's busy timeout ran out while another worker's writer held the lock"""
+    if "database is locked" not in str(exc.orig):
+        raise exc
+    logger.warning(f"{request.method} {request.url.path}: database locked")
+    return _database_busy()
 
 # Include routers
 app.include_router(courses_router)
@@ -47,6 +98,9 @@ app.include_router(users_router)
 app.include_router(alerts_router)
 app.include_router(sync_router)
 app.include_router(realtime_router)
+app.include_router(schedule_router)
+app.include_router(occupancy_router)
+app.include_router(admin_router)
 
 @app.get("/")
 async def root():
@@ -58,15 +112,49 @@ async def root():
         "health": "/health"
     }
 
+def _snapshot_status():
+    snapshot = realtime_service.snapshot
+    if snapshot is None:
+        return None
+    return {
+        "version": snapshot.version,
+        "fetched_at": snapshot.fetched_at.isoformat(),
+        "age_seconds": int(snapshot.age_seconds),
+        "stale": realtime_service.is_stale(snapshot),
+        "sections": len(snapshot.raw_courses),
+        # Oldest version /api/realtime/changes can catch a client up from
+        "changes_since": realtime_service.change_log.oldest_version,
+    }
+
 @app.get("/health")
 async def health_check():
-    """Health check endpoint"""
+    """Health check endpoint (liveness); `ready` tells whether course data can be served"""
     return {
         "status": "healthy",
+        "ready": realtime_service.ready,
         "timestamp": datetime.now().isoformat(),
-        "service": "SeatZ API"
+        "service": "SeatZ API",
+        "snapshot": _snapshot_status(),
+        "upstream": {
+            "realtime": realtime_service.breaker.to_dict(),
+            "bracu": bracu_service.breaker.to_dict(),
+        }
     }
 
+@app.get("/health/ready")
+async def readiness_check():
+    """Readiness probe: 503 until a feed snapshot (persisted or fresh) is loaded"""
+    ready = realtime_service.ready
+    return FastJSONResponse(
+        {"ready": ready, "snapshot": _snapshot_status()},
+        status_code=200 if ready else 503
+    )
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus metrics endpoint"""
+    return PlainTextResponse(REGISTRY.render(), media_type=CONTENT_TYPE)
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
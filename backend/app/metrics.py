@@ -0,0 +1,398 @@
+"""
+Prometheus-style metrics for the API and its background work.
+
+Metrics are plain Python counters updated from the event loop, so recording
+a sample is a dict lookup plus an addition: no locks on the request path.
+The only lock guards the creation of a new label combination, which happens
+once per series. Values are rendered in the Prometheus text exposition format
+by GET /metrics.
+"""
+from bisect import bisect_left
+from contextlib import contextmanager
+from time import perf_counter
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+import math
+import threading
+
+CONTENT_TYPE = "text/plain; version=0.0.4"
+
+# Seconds; covers a cached lookup up to a slow upstream download
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (), registry: Optional["Registry"] = None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], "_Metric"] = {}
+        self._create_lock = threading.Lock()
+        (registry if registry is not None else REGISTRY).register(self)
+
+    def labels(self, *values, **kwargs):
+        """Child series for one combination of label values"""
+        if kwargs:
+            values = tuple(str(kwargs[name]) for name in self.labelnames)
+        else:
+            values = tuple(str(value) for value in values)
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}")
+            with self._create_lock:
+                child = self._children.get(values)
+                if child is None:
+                    child = self._new_child()
+                    self._children[values] = child
+        return child
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def _series(self) -> List[Tuple[Tuple[str, ...], "_Metric"]]:
+        if self.labelnames:
+            return list(self._children.items())
+        return [((), self)]
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for values, child in self._series():
+            lines.extend(child._samples(self.name, self.labelnames, values))
+        return lines
+
+
+class Counter(_Metric):
+    """Monotonically increasing count"""
+
+    kind = "counter"
+
+    def __init__(self, *args, **kwargs):
+        self.value = 0.0
+        super().__init__(*args, **kwargs)
+
+    def _new_child(self):
+        child = Counter.__new__(Counter)
+        child.value = 0.0
+        return child
+
+    def inc(self, amount: float = 1):
+        self.value += amount
+
+    def _samples(self, name, labelnames, values):
+        return [f"{name}{_format_labels(labelnames, values)} {_format_value(self.value)}"]
+
+
+class Gauge(_Metric):
+    """Value that goes up and down, or is read from a callback at scrape time"""
+
+    kind = "gauge"
+
+    def __init__(self, *args, **kwargs):
+        self.value = 0.0
+        self._function: Optional[Callable[[], float]] = None
+        super().__init__(*args, **kwargs)
+
+    def _new_child(self):
+        child = Gauge.__new__(Gauge)
+        child.value = 0.0
+        child._function = None
+        return child
+
+    def inc(self, amount: float = 1):
+        self.value += amount
+
+    def dec(self, amount: float = 1):
+        self.value -= amount
+
+    def set(self, value: float):
+        self.value = value
+
+    def set_function(self, function: Callable[[], float]):
+        self._function = function
+
+    def _samples(self, name, labelnames, values):
+        value = self.value
+        if self._function is not None:
+            try:
+                value = self._function()
+            except Exception:
+                return []
+        return [f"{name}{_format_labels(labelnames, values)} {_format_value(float(value))}"]
+
+
+class Histogram(_Metric):
+    """Bucketed distribution of observed values (typically durations in seconds)"""
+
+    kind = "histogram"
+
+    def __init__(self, *args, buckets: Iterable[float] = DEFAULT_BUCKETS, **kwargs):
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        self._reset()
+        super().__init__(*args, **kwargs)
+
+    def _reset(self):
+        # Per-bucket (not cumulative) counts; cumulated at render time
+        self.counts = [0] * len(self.buckets)
+        self.sum = 0.0
+
+    def _new_child(self):
+        child = Histogram.__new__(Histogram)
+        child.buckets = self.buckets
+        child._reset()
+        return child
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+    @contextmanager
+    def time(self):
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(perf_counter() - start)
+
+    def _samples(self, name, labelnames, values):
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets, list(self.counts)):
+            cumulative += count
+            le = f'le="{_format_value(float(bound))}"'
+            lines.append(f"{name}_bucket{_format_labels(labelnames, values, le)} {cumulative}")
+        labels = _format_labels(labelnames, values)
+        lines.append(f"{name}_sum{labels} {_format_value(self.sum)}")
+        lines.append(f"{name}_count{labels} {cumulative}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric):
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in list(self._metrics.values()):
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+
+# HTTP
+HTTP_REQUESTS = Counter(
+    "seatz_http_requests_total", "HTTP requests by route template and status code",
+    ["method", "route", "status"],
+)
+HTTP_REQUEST_DURATION = Histogram(
+    "seatz_http_request_duration_seconds", "HTTP request latency by route template",
+    ["method", "route"],
+)
+HTTP_IN_FLIGHT = Gauge(
+    "seatz_http_requests_in_flight", "HTTP requests currently being served",
+    ["method", "route"],
+)
+
+# Upstream feed
+UPSTREAM_FETCH_DURATION = Histogram(
+    "seatz_upstream_fetch_duration_seconds", "Time to download the upstream course feed",
+    ["source"],
+)
+UPSTREAM_FETCH_BYTES = Counter(
+    "seatz_upstream_fetch_bytes_total", "Bytes downloaded from the upstream course feed",
+    ["source"],
+)
+UPSTREAM_FETCH_FAILURES = Counter(
+    "seatz_upstream_fetch_failures_total", "Failed upstream feed downloads",
+    ["source"],
+)
+FEED_PARSE_DURATION = Histogram(
+    "seatz_feed_parse_duration_seconds", "Time to decode the upstream feed JSON",
+    ["source"],
+)
+TRANSFORM_DURATION = Histogram(
+    "seatz_transform_duration_seconds", "Time to transform raw feed sections for a response",
+    ["operation"],
+)
+SNAPSHOT_FILE_DURATION = Histogram(
+    "seatz_snapshot_file_duration_seconds", "Time to write or load the on-disk feed snapshot",
+    ["operation"],
+)
+
+# Database sync
+SYNC_SECTIONS = Counter(
+    "seatz_sync_sections_total", "Sections processed by course sync, by result",
+    ["result"],
+)
+SYNC_DURATION = Histogram(
+    "seatz_sync_duration_seconds", "Duration of a full course sync",
+)
+SYNC_RUNS = Counter(
+    "seatz_sync_runs_total", "Course sync jobs finished, by trigger and status",
+    ["trigger", "status"],
+)
+SYNC_TRIGGERS_COALESCED = Counter(
+    "seatz_sync_triggers_coalesced_total", "Sync triggers joined to a job already running",
+)
+SECTIONS_ARCHIVED = Counter(
+    "seatz_sections_archived_total", "Sections of past semesters moved to courses_archive",
+)
+ALERTS_ARCHIVED = Counter(
+    "seatz_alerts_archived_total", "Alerts on archived sections, by result (frozen or pruned)",
+    ["result"],
+)
+
+# Alerts and notifications
+ALERT_EVALUATION_DURATION = Histogram(
+    "seatz_alert_evaluation_duration_seconds", "Time to evaluate every active alert",
+)
+ALERTS_EVALUATED = Counter(
+    "seatz_alerts_evaluated_total", "Active alerts loaded for evaluation (fired, cooling down or due)",
+)
+ALERT_TRANSITIONS = Counter(
+    "seatz_alert_transitions_total", "Alert state machine transitions",
+    ["from_state", "to_state"],
+)
+NOTIFICATIONS_SUPPRESSED = Counter(
+    "seatz_notifications_suppressed_total", "Firing alerts not notified because they already fired for this opening",
+)
+NOTIFICATION_QUEUE_DEPTH = Gauge(
+    "seatz_notification_queue_depth", "Notifications waiting to be sent",
+)
+SMTP_SEND_DURATION = Histogram(
+    "seatz_smtp_send_duration_seconds", "SMTP send latency per email",
+)
+SMTP_SEND_FAILURES = Counter(
+    "seatz_smtp_send_failures_total", "Emails that could not be sent",
+    ["reason"],
+)
+WEBHOOK_DELIVERY_DURATION = Histogram(
+    "seatz_webhook_delivery_duration_seconds", "Webhook POST latency per attempt",
+)
+WEBHOOK_DELIVERIES = Counter(
+    "seatz_webhook_deliveries_total", "Webhook batches delivered or given up on, by result",
+    ["result"],
+)
+WEBHOOK_EVENTS = Counter(
+    "seatz_webhook_events_total", "Seat events in webhook batches, by result",
+    ["result"],
+)
+WEBHOOK_RETRIES = Counter(
+    "seatz_webhook_retries_total", "Webhook POSTs retried after a failed attempt",
+)
+
+# Database connection pools (read at scrape time)
+DB_POOL_CHECKED_OUT = Gauge(
+    "seatz_db_pool_checked_out", "Database connections currently checked out",
+    ["engine"],
+)
+DB_POOL_SIZE = Gauge(
+    "seatz_db_pool_size", "Configured size of the database connection pool",
+    ["engine"],
+)
+DB_POOL_OVERFLOW = Gauge(
+    "seatz_db_pool_overflow", "Database connections opened beyond the pool size",
+    ["engine"],
+)
+
+
+def register_db_pools(engines: Dict[str, object]):
+    """Expose pool usage of the given SQLAlchemy engines, keyed by label"""
+    for label, engine in engines.items():
+        pool = engine.pool
+        # Only QueuePool-style pools report usage
+        if not hasattr(pool, "checkedout"):
+            continue
+        DB_POOL_CHECKED_OUT.labels(label).set_function(pool.checkedout)
+        DB_POOL_SIZE.labels(label).set_function(pool.size)
+        DB_POOL_OVERFLOW.labels(label).set_function(lambda pool=pool: max(pool.overflow(), 0))
+
+
+# Requests that match no route share one label so scanners cannot create series
+UNMATCHED_ROUTE = "<unmatched>"
+_ROUTE_CACHE_SIZE = 2048
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording latency, status and in-flight count per route.
+    Routes are labelled by their path template ("/api/courses/{course_id}"),
+    resolved once per distinct path and cached.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._route_cache: Dict[str, str] = {}
+
+    def _route_template(self, scope) -> str:
+        path = scope["path"]
+        template = self._route_cache.get(path)
+        if template is not None:
+            return template
+
+        from starlette.routing import Match
+
+        template = UNMATCHED_ROUTE
+        starlette_app = scope.get("app")
+        for route in getattr(getattr(starlette_app, "router", None), "routes", ()):
+            match, _ = route.matches(scope)
+            if match == Match.FULL:
+                template = getattr(route, "path", UNMATCHED_ROUTE)
+                break
+            if match == Match.PARTIAL and template == UNMATCHED_ROUTE:
+                template = getattr(route, "path", UNMATCHED_ROUTE)
+        if len(self._route_cache) < _ROUTE_CACHE_SIZE:
+            self._route_cache[path] = template
+        return template
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        route = self._route_template(scope)
+        in_flight = HTTP_IN_FLIGHT.labels(method, route)
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        in_flight.inc()
+        start = perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_REQUEST_DURATION.labels(method, route).observe(perf_counter() - start)
+            HTTP_REQUESTS.labels(method, route, status_code).inc()
+            in_flight.dec()
@@ -1,6 +1,8 @@
-from .course import Course
+from .course import Course, CourseArchive
 from .user import User
 from .alert import Alert
+from .sync_run import SyncRun
+from .class_slot import ClassSlot
 from .base import Base
 
-__all__ = ["Course", "User", "Alert", "Base"]
\ No newline at end of file
+__all__ = ["Course", "CourseArchive", "User", "Alert", "SyncRun", "ClassSlot", "Base"]
\ No newline at end of file
@@ -1,19 +1,65 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Interval
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Interval, Index, UniqueConstraint, JSON, text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from datetime import timedelta
 from .base import Base
 
+# Alert states (see app/services/notification_service.py)
+WATCHING = "watching"          # armed, never fired
+FIRED = "fired"                # notified for the current opening
+COOLING_DOWN = "cooling_down"  # the opening closed; waiting out the hysteresis period
+REARMED = "rearmed"            # closed long enough; the next opening notifies again
+FROZEN = "frozen"              # its section was archived with a past semester
+ARMED_STATES = (WATCHING, REARMED)
+# States the notifier evaluates on every run, whether or not seats are open
+TRACKED_STATES = (FIRED, COOLING_DOWN)
+
 class Alert(Base):
     __tablename__ = "alerts"
+    __table_args__ = (
+        UniqueConstraint("user_id", "course_id", name="uq_alerts_user_course"),
+        Index("ix_alerts_is_active_course_id", "is_active", "course_id"),
+        # Partial index: the notifier only ever scans active alerts
+        Index(
+            "ix_alerts_active_course_user",
+            "course_id",
+            "user_id",
+            postgresql_where=text("is_active"),
+            sqlite_where=text("is_active = 1"),
+        ),
+        # Due-alert selection: fired/cooling-down alerts, and course code alerts on open codes
+        Index("ix_alerts_is_active_state", "is_active", "state"),
+        Index("ix_alerts_is_active_course_code", "is_active", "course_code"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    course_id = Column(Integer, ForeignKey("courses.id"), nullable=False)
+    # One section (course_id) or, when unset, every section of course_code
+    course_id = Column(Integer, ForeignKey("courses.id"))
+    course_code = Column(String(20))
+    # Section of a frozen alert, moved to courses_archive with its semester:
+    # its feed section id and its courses_archive.id
+    archived_section_id = Column(Integer)
+    archived_course_id = Column(Integer)
+    
+    # Rule conditions; an unset condition matches every section
+    min_seats = Column(Integer, nullable=False, default=1, server_default="1")
+    days = Column(JSON)  # weekdays the section may meet on, e.g. ["SUNDAY", "TUESDAY"]
+    start_after = Column(String(5))  # "HH:MM", no class before this
+    end_before = Column(String(5))  # "HH:MM", no class after this
+    faculty = Column(String(50))  # faculty initials
     
     # Notification settings
     notification_interval_minutes = Column(Integer, default=30)  # minutes between notifications
     is_active = Column(Boolean, default=True)
+    # Section ids whose exams must not clash with this section (optional filter)
+    avoid_exam_clash_with = Column(JSON)
+    
+    # Notification state machine: watching -> fired -> cooling_down -> rearmed -> fired ...
+    state = Column(String(16), nullable=False, default=WATCHING, server_default=WATCHING)
+    state_changed_at = Column(DateTime(timezone=True))
+    # Best open-seat count reported by the last notification
+    last_notified_seats = Column(Integer)
     
     # Tracking notification history
     last_notification_sent = Column(DateTime(timezone=True))
@@ -29,7 +75,9 @@ class Alert(Base):
     
     @property
     def should_notify(self):
-        """Check if enough time has passed since last notification"""
+        """Check if the alert is armed and enough time has passed since last notification"""
+        if self.state not in ARMED_STATES:
+            return False
         if not self.last_notification_sent:
             return True
         
@@ -41,8 +89,8 @@ class Alert(Base):
     
     @property
     def course_has_seats(self):
-        """Check if the course currently has available seats"""
-        return self.course.is_available
+        """Check if the course currently has available seats (course_code rules are evaluated by the notifier)"""
+        return self.course is not None and self.course.available_seats >= (self.min_seats or 1)
     
     def mark_notified(self):
         """Update last notification time and increment count"""
@@ -51,4 +99,5 @@ class Alert(Base):
         self.notification_count += 1
     
     def __repr__(self):
-        return f"<Alert(user={self.user.email}, course={self.course.course_code}-{self.course.section_name})>"
\ No newline at end of file
+        target = f"{self.course.course_code}-{self.course.section_name}" if self.course else self.course_code
+        return f"<Alert(user={self.user.email}, course={target})>"
\ No newline at end of file
@@ -0,0 +1,30 @@
+from sqlalchemy import Column, Integer, String, ForeignKey, Index
+from sqlalchemy.orm import relationship
+from .base import Base
+
+# Slot kinds: a section's own classes, or the lab attached to it
+THEORY = "THEORY"
+LAB = "LAB"
+
+class ClassSlot(Base):
+    """One weekly meeting of a section, normalized from the feed's schedules by the course sync"""
+    __tablename__ = "class_slots"
+    __table_args__ = (
+        # Sections with a slot in a day/time range (/api/courses/ day and time filters)
+        Index("ix_class_slots_weekday_start", "weekday", "start_minute", "end_minute", "course_id"),
+        # Slots of one section, and the per-semester replace done by the sync
+        Index("ix_class_slots_course_kind_weekday", "course_id", "kind", "weekday"),
+    )
+    
+    id = Column(Integer, primary_key=True)
+    course_id = Column(Integer, ForeignKey("courses.id", ondelete="CASCADE"), nullable=False)
+    kind = Column(String(8), nullable=False)  # THEORY or LAB
+    weekday = Column(String(10), nullable=False)  # e.g. "SUNDAY"
+    # Minutes since midnight, end exclusive
+    start_minute = Column(Integer, nullable=False)
+    end_minute = Column(Integer, nullable=False)
+    
+    course = relationship("Course", back_populates="class_slots")
+    
+    def __repr__(self):
+        return f"<ClassSlot(course_id={self.course_id}, {self.kind} {self.weekday} {self.start_minute}-{self.end_minute})>"
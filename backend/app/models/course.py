@@ -1,13 +1,11 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Text, JSON
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Text, JSON, Index, text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from .base import Base
 
-class Course(Base):
-    __tablename__ = "courses"
+class CourseColumns:
+    """Section columns shared by the hot courses table and its archive"""
     
-    id = Column(Integer, primary_key=True, index=True)
-    section_id = Column(Integer, unique=True, index=True, nullable=False)
     course_id = Column(Integer, index=True, nullable=False)
     section_name = Column(String(10), nullable=False)
     course_code = Column(String(20), index=True, nullable=False)
@@ -30,9 +28,6 @@ class Course(Base):
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     last_fetched_at = Column(DateTime(timezone=True))
     
-    # Relationships
-    alerts = relationship("Alert", back_populates="course", cascade="all, delete-orphan")
-    
     @property
     def available_seats(self):
         return self.real_time_seat_count
@@ -46,4 +41,52 @@ class Course(Base):
         return self.real_time_seat_count > 0
     
     def __repr__(self):
-        return f"<Course({self.course_code}-{self.section_name})>"
\ No newline at end of file
+        return f"<{type(self).__name__}({self.course_code}-{self.section_name})>"
+
+class Course(CourseColumns, Base):
+    """Sections of the active semester (see app/services/semester_service.py)"""
+    __tablename__ = "courses"
+    __table_args__ = (
+        # Listing and stats always exclude labs and filter on seat counts
+        Index(
+            "ix_courses_non_lab_seats",
+            "real_time_seat_count",
+            postgresql_where=text("section_type <> 'LAB'"),
+            sqlite_where=text("section_type <> 'LAB'"),
+        ),
+        Index("ix_courses_section_type_seats", "section_type", "real_time_seat_count"),
+        Index("ix_courses_last_fetched_at", "last_fetched_at"),
+        # Every query is scoped to one semester (see app/services/semester_service.py)
+        Index("ix_courses_semester_code", "semester_session_id", "course_code"),
+        Index(
+            "ix_courses_semester_non_lab_seats",
+            "semester_session_id",
+            "real_time_seat_count",
+            postgresql_where=text("section_type <> 'LAB'"),
+            sqlite_where=text("section_type <> 'LAB'"),
+        ),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    section_id = Column(Integer, unique=True, index=True, nullable=False)
+    
+    # Relationships
+    alerts = relationship("Alert", back_populates="course", cascade="all, delete-orphan")
+    class_slots = relationship(
+        "ClassSlot", back_populates="course", cascade="all, delete-orphan", passive_deletes=True
+    )
+
+class CourseArchive(CourseColumns, Base):
+    """Sections of past semesters, moved out of `courses` in bulk"""
+    __tablename__ = "courses_archive"
+    __table_args__ = (
+        Index("ix_courses_archive_semester_code", "semester_session_id", "course_code"),
+        Index("ix_courses_archive_semester_original_id", "semester_session_id", "original_id"),
+    )
+    
+    id = Column(Integer, primary_key=True)
+    # The section's courses.id before archival. Not unique: SQLite reuses
+    # the ids of an emptied courses table for the next semester's sections
+    original_id = Column(Integer, nullable=False)
+    section_id = Column(Integer, index=True, nullable=False)
+    archived_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -0,0 +1,49 @@
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, JSON, Index, false, text
+from .base import Base
+
+# Sync run statuses (see app/services/sync_jobs.py)
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+class SyncRun(Base):
+    """One course sync job: trigger, phase timings and row counts"""
+    __tablename__ = "sync_runs"
+    __table_args__ = (
+        Index("ix_sync_runs_started_at", "started_at"),
+        Index("ix_sync_runs_status_finished_at", "status", "finished_at"),
+        # At most one running job: starting one is claimed by this insert
+        Index(
+            "uq_sync_runs_running",
+            "status",
+            unique=True,
+            postgresql_where=text("status = 'running'"),
+            sqlite_where=text("status = 'running'"),
+        ),
+    )
+    
+    id = Column(String(32), primary_key=True)  # job id
+    trigger = Column(String(16), nullable=False)  # manual, sync_now or scheduled
+    status = Column(String(16), nullable=False, default=RUNNING)
+    phase = Column(String(16))  # current (or last reached) phase
+    # Set by a cancel request from another worker; checked between sections
+    cancel_requested = Column(Boolean, nullable=False, default=False, server_default=false())
+    worker_pid = Column(Integer)
+    
+    started_at = Column(DateTime(timezone=True), nullable=False)
+    finished_at = Column(DateTime(timezone=True))
+    # Seconds spent in each phase, e.g. {"fetch": 0.8, "archive": 0.0, "upsert": 1.2}
+    phase_seconds = Column(JSON)
+    
+    # Row counts
+    sections_total = Column(Integer)  # sections in the feed
+    processed = Column(Integer, default=0)
+    added = Column(Integer, default=0)
+    updated = Column(Integer, default=0)
+    failed = Column(Integer, default=0)
+    archived = Column(Integer, default=0)
+    error = Column(Text)
+    
+    def __repr__(self):
+        return f"<SyncRun({self.id} {self.status})>"
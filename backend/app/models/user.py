@@ -14,6 +14,9 @@ class User(Base):
     
     # Notification preferences
     email_notifications_enabled = Column(Boolean, default=True)
+    # Seat events are also POSTed here, signed with webhook_secret (optional)
+    webhook_url = Column(String(500))
+    webhook_secret = Column(String(128))
     
     # Timestamps
     created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -0,0 +1,281 @@
+"""
+Opt-in request profiling, slow-query logging and N+1 detection.
+
+Everything here is off unless configured, and the disabled paths cost a
+couple of attribute checks per request:
+
+- Request profiling: a request carrying `X-Profile: 1` (when
+  PROFILING_ENABLED=true or header profiling was switched on through
+  /api/admin/profiling) or matching an armed admin toggle runs under
+  cProfile. The profile is kept in memory and its id returned in the
+  `X-Profile-Id` response header for download from /api/admin/profiles.
+- Slow queries: statements slower than SLOW_QUERY_MS are logged with the
+  statement, the shape of the parameters and the application frame that
+  issued them.
+- N+1 detection: when N_PLUS_ONE_THRESHOLD > 0, each request counts its
+  statements and logs any statement issued more than that many times.
+"""
+from collections import Counter as StatementCounter, OrderedDict
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from time import perf_counter
+from typing import Any, Dict, List, Optional
+import cProfile
+import io
+import itertools
+import logging
+import marshal
+import os
+import pstats
+import sys
+
+from sqlalchemy import event
+
+from app.metrics import Counter
+
+logger = logging.getLogger(__name__)
+
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "false").lower() == "true"
+PROFILE_HEADER = b"x-profile"
+PROFILE_MAX_STORED = int(os.getenv("PROFILE_MAX_STORED", "20"))
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "0"))
+N_PLUS_ONE_THRESHOLD = int(os.getenv("N_PLUS_ONE_THRESHOLD", "0"))
+
+# Statements longer than this are cut in log lines
+MAX_LOGGED_STATEMENT = 500
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+SLOW_QUERIES = Counter("seatz_db_slow_queries_total", "Statements slower than SLOW_QUERY_MS")
+N_PLUS_ONE_REQUESTS = Counter(
+    "seatz_n_plus_one_requests_total", "Requests that repeated one statement more than N_PLUS_ONE_THRESHOLD times",
+)
+
+# Statement counts of the current request; None when N+1 detection is off
+_request_statements: ContextVar[Optional[StatementCounter]] = ContextVar("request_statements", default=None)
+
+
+def _truncate(statement: str) -> str:
+    statement = " ".join(statement.split())
+    if len(statement) > MAX_LOGGED_STATEMENT:
+        return statement[:MAX_LOGGED_STATEMENT] + "..."
+    return statement
+
+
+def parameter_shape(parameters: Any, executemany: bool = False) -> str:
+    """Describe bound parameters by type and size, never by value"""
+    if executemany and isinstance(parameters, (list, tuple)):
+        first = parameter_shape(parameters[0]) if parameters else "()"
+        return f"{len(parameters)} x {first}"
+    if isinstance(parameters, dict):
+        return "{" + ", ".join(f"{key}: {type(value).__name__}" for key, value in parameters.items()) + "}"
+    if isinstance(parameters, (list, tuple)):
+        return "(" + ", ".join(type(value).__name__ for value in parameters) + ")"
+    return type(parameters).__name__
+
+
+def _caller() -> str:
+    """First application frame outside this module"""
+    frame = sys._getframe(1)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if filename.startswith(APP_DIR) and filename != __file__:
+            return f"{filename}:{frame.f_lineno} in {frame.f_code.co_name}"
+        frame = frame.f_back
+    return "unknown"
+
+
+def install_query_hooks(engine):
+    """Attach slow-query and N+1 hooks to an engine when either is enabled"""
+    if SLOW_QUERY_MS <= 0 and N_PLUS_ONE_THRESHOLD <= 0:
+        return
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed_ms = (perf_counter() - conn.info["query_start"].pop()) * 1000
+
+        statements = _request_statements.get()
+        if statements is not None:
+            statements[statement] += 1
+
+        if 0 < SLOW_QUERY_MS <= elapsed_ms:
+            SLOW_QUERIES.inc()
+            logger.warning(
+                f"Slow query ({elapsed_ms:.1f} ms) from {_caller()}: "
+                f"{_truncate(statement)} params={parameter_shape(parameters, executemany)}"
+            )
+
+
+class StoredProfile:
+    __slots__ = ("id", "method", "path", "status", "duration_ms", "created_at", "stats")
+
+    def __init__(self, id, method, path, status, duration_ms, stats):
+        self.id = id
+        self.method = method
+        self.path = path
+        self.status = status
+        self.duration_ms = duration_ms
+        self.created_at = datetime.now(timezone.utc)
+        self.stats = stats
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "status": self.status,
+            "duration_ms": round(self.duration_ms, 2),
+            "created_at": self.created_at.isoformat(),
+        }
+
+    def dump(self) -> bytes:
+        """Binary profile in the format of pstats.Stats.dump_stats (snakeviz, pstats)"""
+        return marshal.dumps(self.stats)
+
+    def text(self, sort: str = "cumulative", limit: int = 50) -> str:
+        output = io.StringIO()
+        stats = pstats.Stats(stream=output)
+        stats.stats = dict(self.stats)
+        stats.get_top_level_stats()
+        stats.sort_stats(sort).print_stats(limit)
+        return output.getvalue()
+
+
+class Profiler:
+    """
+    Stored profiles plus the runtime switches set through the admin router.
+    cProfile hooks the whole thread, so only one request is profiled at a
+    time and coroutines interleaved with it on the event loop show up in its
+    profile too; the profile still points at the expensive calls.
+    """
+
+    def __init__(self, header_enabled: bool = PROFILING_ENABLED, max_stored: int = PROFILE_MAX_STORED):
+        self.header_enabled = header_enabled
+        self.armed_prefix: Optional[str] = None
+        self.armed_remaining = 0
+        self.max_stored = max_stored
+        self.profiles: "OrderedDict[str, StoredProfile]" = OrderedDict()
+        self._ids = itertools.count(1)
+        self._active = False
+
+    def arm(self, path_prefix: str, count: int):
+        """Profile the next `count` requests whose path starts with `path_prefix`"""
+        self.armed_prefix = path_prefix
+        self.armed_remaining = count
+
+    def disarm(self):
+        self.armed_prefix = None
+        self.armed_remaining = 0
+
+    def state(self) -> Dict[str, Any]:
+        return {
+            "header_enabled": self.header_enabled,
+            "armed_prefix": self.armed_prefix,
+            "armed_remaining": self.armed_remaining,
+            "stored_profiles": len(self.profiles),
+            "slow_query_ms": SLOW_QUERY_MS,
+            "n_plus_one_threshold": N_PLUS_ONE_THRESHOLD,
+        }
+
+    def wants(self, scope) -> bool:
+        if self._active:
+            return False
+        if self.armed_remaining > 0 and scope["path"].startswith(self.armed_prefix or ""):
+            self.armed_remaining -= 1
+            return True
+        if self.header_enabled:
+            for name, value in scope["headers"]:
+                if name == PROFILE_HEADER:
+                    return value not in (b"", b"0", b"false")
+        return False
+
+    def store(self, profile: StoredProfile):
+        self.profiles[profile.id] = profile
+        while len(self.profiles) > self.max_stored:
+            self.profiles.popitem(last=False)
+
+    def list(self) -> List[Dict[str, Any]]:
+        return [profile.to_dict() for profile in reversed(self.profiles.values())]
+
+    def get(self, profile_id: str) -> Optional[StoredProfile]:
+        return self.profiles.get(profile_id)
+
+    def clear(self):
+        self.profiles.clear()
+
+    def next_id(self) -> str:
+        return f"p{next(self._ids)}"
+
+
+profiler = Profiler()
+
+
+class ProfilingMiddleware:
+    """ASGI middleware running selected requests under cProfile and counting statements for N+1 detection"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        profile_this = profiler.wants(scope)
+        if not profile_this and N_PLUS_ONE_THRESHOLD <= 0:
+            await self.app(scope, receive, send)
+            return
+
+        statements = None
+        token = None
+        if N_PLUS_ONE_THRESHOLD > 0:
+            statements = StatementCounter()
+            token = _request_statements.set(statements)
+
+        profile_id = profiler.next_id() if profile_this else None
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if profile_id:
+                    message = dict(message)
+                    message["headers"] = list(message.get("headers", [])) + [(b"x-profile-id", profile_id.encode())]
+            await send(message)
+
+        profile = None
+        if profile_this:
+            profiler._active = True
+            profile = cProfile.Profile()
+            profile.enable()
+        start = perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            if profile is not None:
+                profile.disable()
+                profiler._active = False
+                profile.create_stats()
+                profiler.store(StoredProfile(
+                    profile_id, scope["method"], scope["path"], status_code,
+                    (perf_counter() - start) * 1000, profile.stats,
+                ))
+            if token is not None:
+                _request_statements.reset(token)
+                self._report_repeats(scope, statements)
+
+    @staticmethod
+    def _report_repeats(scope, statements: StatementCounter):
+        repeated = [(statement, count) for statement, count in statements.items() if count > N_PLUS_ONE_THRESHOLD]
+        if not repeated:
+            return
+        N_PLUS_ONE_REQUESTS.inc()
+        for statement, count in repeated:
+            logger.warning(
+                f"Possible N+1 in {scope['method']} {scope['path']}: statement ran {count} times: {_truncate(statement)}"
+            )
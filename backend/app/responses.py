@@ -0,0 +1,63 @@
+"""
+Fast JSON responses.
+
+FastJSONResponse, the app's default response class, encodes with orjson
+when it is installed (several times faster than the stdlib encoder, and it
+handles datetimes natively) and falls back to json otherwise.
+
+Returning a Response from a path operation skips FastAPI's response_model
+handling: the model dump, re-validation and jsonable_encoder pass over every
+nested object. Bulk endpoints whose data the backend builds itself (course
+rows, feed snapshot data) use json_response / api_response for that, and
+keep response_model on the route so the OpenAPI schema stays documented.
+The payload must already have the documented shape.
+"""
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Mapping, Optional
+import json
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # optional; the stdlib encoder is used instead
+    orjson = None
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (set, frozenset, tuple)):
+        return list(value)
+    if hasattr(value, "model_dump"):
+        return value.model_dump(mode="json")
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+if orjson is not None:
+    def dumps(content: Any) -> bytes:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+else:
+    def dumps(content: Any) -> bytes:
+        return json.dumps(content, default=_default, separators=(",", ":"), ensure_ascii=False).encode()
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def json_response(content: Any, headers: Optional[Mapping[str, str]] = None, status_code: int = 200) -> FastJSONResponse:
+    """Serialize trusted content as is, bypassing response_model validation"""
+    return FastJSONResponse(content, status_code=status_code, headers=headers)
+
+
+def api_response(
+    message: str, data: Any = None, headers: Optional[Mapping[str, str]] = None, success: bool = True
+) -> FastJSONResponse:
+    """An ApiResponse body built without the pydantic model"""
+    return json_response({"success": success, "message": message, "data": data}, headers=headers)
+
@@ -3,5 +3,8 @@ from .users import router as users_router
 from .alerts import router as alerts_router
 from .sync import router as sync_router
 from .realtime import router as realtime_router
+from .schedule import router as schedule_router
+from .occupancy import router as occupancy_router
+from .admin import router as admin_router
 
-__all__ = ["courses_router", "users_router", "alerts_router", "sync_router", "realtime_router"]
\ No newline at end of file
+__all__ = ["courses_router", "users_router", "alerts_router", "sync_router", "realtime_router", "schedule_router", "occupancy_router", "admin_router"]
\ No newline at end of file
@@ -0,0 +1,81 @@
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import PlainTextResponse, Response
+from sqlalchemy.orm import Session
+from typing import Optional
+from app.cache import cache
+from app.database import get_db
+from app.profiling import profiler
+from app.schemas import ApiResponse, ArchiveRequest, ProfilingSettings
+from app.services.semester_service import archive_semesters_before
+import hmac
+import os
+
+router = APIRouter(prefix="/api/admin", tags=["admin"])
+
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+
+def is_admin(token: Optional[str]) -> bool:
+    """Whether `token` is the configured admin token (never true while ADMIN_TOKEN is unset)"""
+    return bool(ADMIN_TOKEN) and hmac.compare_digest(token or "", ADMIN_TOKEN)
+
+def require_admin(x_admin_token: Optional[str] = Header(None)):
+    """Require the X-Admin-Token header; admin endpoints are disabled until ADMIN_TOKEN is set"""
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=503, detail="Admin endpoints are disabled: ADMIN_TOKEN is not set")
+    if not is_admin(x_admin_token):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+@router.get("/profiling", response_model=ApiResponse, dependencies=[Depends(require_admin)])
+async def get_profiling_state():
+    """Current profiling switches and slow-query settings"""
+    return ApiResponse(success=True, message="Profiling state", data=profiler.state())
+
+@router.post("/profiling", response_model=ApiResponse, dependencies=[Depends(require_admin)])
+async def update_profiling(settings: ProfilingSettings):
+    """Toggle X-Profile header handling and/or profile the next requests under a path prefix"""
+    if settings.header_enabled is not None:
+        profiler.header_enabled = settings.header_enabled
+    if settings.path_prefix is not None:
+        if settings.count:
+            profiler.arm(settings.path_prefix, settings.count)
+        else:
+            profiler.disarm()
+    return ApiResponse(success=True, message="Profiling updated", data=profiler.state())
+
+@router.get("/profiles", response_model=ApiResponse, dependencies=[Depends(require_admin)])
+async def list_profiles():
+    """Stored request profiles, newest first"""
+    return ApiResponse(success=True, message="Stored profiles", data=profiler.list())
+
+@router.get("/profiles/{profile_id}", dependencies=[Depends(require_admin)])
+async def download_profile(
+    profile_id: str,
+    format: str = Query("pstats", pattern="^(pstats|text)$"),
+    sort: str = Query("cumulative", pattern="^(cumulative|tottime|calls|ncalls)$"),
+    limit: int = Query(50, ge=1, le=1000)
+):
+    """Download a profile as a pstats file (snakeviz, python -m pstats) or as a text report"""
+    profile = profiler.get(profile_id)
+    if not profile:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    
+    if format == "text":
+        return PlainTextResponse(profile.text(sort, limit))
+    return Response(
+        profile.dump(),
+        media_type="application/octet-stream",
+        headers={"Content-Disposition": f'attachment; filename="{profile_id}.prof"'}
+    )
+
+@router.delete("/profiles", response_model=ApiResponse, dependencies=[Depends(require_admin)])
+async def clear_profiles():
+    """Drop every stored profile"""
+    profiler.clear()
+    return ApiResponse(success=True, message="Profiles cleared")
+
+@router.post("/archive", response_model=ApiResponse, dependencies=[Depends(require_admin)])
+async def archive_semesters(request: ArchiveRequest, db: Session = Depends(get_db)):
+    """Move every semester before the given one to courses_archive, freezing or pruning their alerts"""
+    totals = archive_semesters_before(db, request.before_semester_session_id)
+    await cache.clear("course_stats")
+    return ApiResponse(success=True, message=f"Archived {totals['semesters']} semesters", data=totals)
@@ -1,15 +1,53 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import or_
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
-from typing import List
-from app.database import get_db
-from app.models.alert import Alert
+from typing import Any, Dict, List, Optional
+from app.database import get_db, get_read_db
+from app.models.alert import Alert, WATCHING
 from app.models.user import User
 from app.models.course import Course
-from app.schemas import Alert as AlertSchema, AlertCreate, AlertUpdate, AlertWithDetails, ApiResponse
-from app.services.email_service import email_service
+from app.responses import json_response
+from app.schemas import (
+    Alert as AlertSchema, AlertBulkCreate, AlertBulkDelete, AlertBulkUpdate, AlertCreate, AlertTarget,
+    AlertUpdate, AlertWithDetails, ApiResponse, User as UserSchema,
+)
+from app.services.notification_service import notify_due_alerts
 
 router = APIRouter(prefix="/api/alerts", tags=["alerts"])
 
+# Updating any of these restarts the alert's notification state machine
+RULE_FIELDS = {"is_active", "avoid_exam_clash_with", "min_seats", "days", "start_after", "end_before", "faculty"}
+
+def _alert_values(target: AlertTarget) -> Dict[str, Any]:
+    """Column values of a new alert: one section, or every section of a normalized course code"""
+    values = target.dict()
+    if target.course_id is not None:
+        values["course_code"] = None
+    else:
+        values["course_code"] = target.course_code.strip().upper()
+    if target.faculty:
+        values["faculty"] = target.faculty.strip().upper()
+    return values
+
+def _window_conflict(query, update_data: Dict[str, Any]) -> bool:
+    """True if changing one end of the time window leaves an alert in `query` with an empty window"""
+    start_after, end_before = update_data.get("start_after"), update_data.get("end_before")
+    if start_after and "end_before" not in update_data:
+        query = query.filter(Alert.end_before.isnot(None), Alert.end_before <= start_after)
+    elif end_before and "start_after" not in update_data:
+        query = query.filter(Alert.start_after.isnot(None), Alert.start_after >= end_before)
+    else:
+        # Both ends (checked by the schema) or neither
+        return False
+    return query.with_entities(Alert.id).first() is not None
+
+def _rule_reset(update_data: Dict[str, Any]) -> Dict[str, Any]:
+    """A changed rule (or a re-enabled alert) watches for a fresh opening"""
+    if update_data.keys() & RULE_FIELDS:
+        return {"state": WATCHING, "state_changed_at": None, "last_notified_seats": None}
+    return {}
+
 @router.post("/", response_model=AlertSchema)
 async def create_alert(alert: AlertCreate, db: Session = Depends(get_db)):
     """Create a new alert for course tracking"""
@@ -18,31 +56,203 @@ async def create_alert(alert: AlertCreate, db: Session = Depends(get_db)):
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
-    # Check if course exists
-    course = db.query(Course).filter(Course.id == alert.course_id).first()
-    if not course:
-        raise HTTPException(status_code=404, detail="Course not found")
+    if alert.course_id is None and not alert.course_code:
+        raise HTTPException(status_code=400, detail="Either course_id or course_code is required")
     
-    # Check if alert already exists
-    existing_alert = db.query(Alert).filter(
+    alert_data = _alert_values(alert)
+    if alert.course_id is not None:
+        # Check if course exists
+        course = db.query(Course).filter(Course.id == alert.course_id).first()
+        if not course:
+            raise HTTPException(status_code=404, detail="Course not found")
+        
+        # Check if alert already exists
+        existing_alert = db.query(Alert).filter(
+            Alert.user_id == alert.user_id,
+            Alert.course_id == alert.course_id
+        ).first()
+        
+        if existing_alert:
+            raise HTTPException(status_code=400, detail="Alert already exists for this course")
+    elif not db.query(Course.id).filter(Course.course_code == alert_data["course_code"]).first():
+        raise HTTPException(status_code=404, detail="Course not found")
+    elif db.query(Alert.id).filter(
         Alert.user_id == alert.user_id,
-        Alert.course_id == alert.course_id
-    ).first()
-    
-    if existing_alert:
+        Alert.course_id.is_(None),
+        Alert.course_code == alert_data["course_code"]
+    ).first():
+        # uq_alerts_user_course does not cover code alerts (course_id is NULL)
         raise HTTPException(status_code=400, detail="Alert already exists for this course")
     
-    db_alert = Alert(**alert.dict())
+    db_alert = Alert(**alert_data)
     db.add(db_alert)
-    db.commit()
+    try:
+        db.commit()
+    except IntegrityError:
+        # Lost a race with a concurrent request (uq_alerts_user_course)
+        db.rollback()
+        raise HTTPException(status_code=400, detail="Alert already exists for this course")
     db.refresh(db_alert)
     return db_alert
 
+@router.post("/bulk", response_model=ApiResponse)
+async def create_alerts(request: AlertBulkCreate, db: Session = Depends(get_db)):
+    """
+    Create many alerts for one user in a single transaction, resolving the
+    user by id or by email (creating it when new). Targets whose course does
+    not exist, or that the user already watches, are skipped and listed.
+    """
+    if request.user_id is None and request.email is None:
+        raise HTTPException(status_code=400, detail="Provide user_id or email")
+    
+    if request.user_id is not None:
+        user = db.query(User).filter(User.id == request.user_id).first()
+        if not user:
+            raise HTTPException(status_code=404, detail="User not found")
+    else:
+        user = db.query(User).filter(User.email == request.email).first()
+        if not user:
+            user = User(email=request.email, full_name=request.full_name or request.email.split("@")[0])
+            db.add(user)
+            db.flush()
+    
+    targets = []
+    skipped = []
+    for index, target in enumerate(request.alerts):
+        if target.course_id is None and not target.course_code:
+            skipped.append({"index": index, "reason": "Either course_id or course_code is required"})
+        else:
+            targets.append((index, _alert_values(target)))
+    
+    # One query per check, whatever the number of targets
+    course_ids = {values["course_id"] for _, values in targets if values["course_id"] is not None}
+    course_codes = {values["course_code"] for _, values in targets if values["course_code"]}
+    known_ids = {
+        course_id for (course_id,) in db.query(Course.id).filter(Course.id.in_(course_ids))
+    } if course_ids else set()
+    known_codes = {
+        code for (code,) in db.query(Course.course_code).filter(Course.course_code.in_(course_codes)).distinct()
+    } if course_codes else set()
+    watched_ids = {
+        course_id for (course_id,) in db.query(Alert.course_id).filter(
+            Alert.user_id == user.id, Alert.course_id.in_(known_ids)
+        )
+    } if known_ids else set()
+    watched_codes = {
+        code for (code,) in db.query(Alert.course_code).filter(
+            Alert.user_id == user.id, Alert.course_id.is_(None), Alert.course_code.in_(known_codes)
+        )
+    } if known_codes else set()
+    
+    new_alerts = []
+    for index, values in targets:
+        course_id, course_code = values["course_id"], values["course_code"]
+        key = course_id if course_id is not None else course_code
+        if course_id is not None and course_id not in known_ids or course_id is None and course_code not in known_codes:
+            skipped.append({"index": index, "reason": "Course not found"})
+            continue
+        if key in watched_ids or key in watched_codes:
+            skipped.append({"index": index, "reason": "Alert already exists for this course"})
+            continue
+        (watched_ids if course_id is not None else watched_codes).add(key)
+        new_alerts.append(Alert(**values, user_id=user.id))
+    
+    db.add_all(new_alerts)
+    try:
+        db.commit()
+    except IntegrityError:
+        # Lost a race with a concurrent request (users.email or uq_alerts_user_course)
+        db.rollback()
+        raise HTTPException(status_code=409, detail="Alerts changed concurrently, retry the request")
+    
+    return ApiResponse(
+        success=True,
+        message=f"Created {len(new_alerts)} alerts, skipped {len(skipped)}",
+        data={
+            "user": UserSchema.model_validate(user).model_dump(mode="json"),
+            "created": [AlertSchema.model_validate(alert).model_dump(mode="json") for alert in new_alerts],
+            "skipped": sorted(skipped, key=lambda item: item["index"]),
+        }
+    )
+
+@router.get("/bulk", response_model=List[AlertSchema])
+async def get_alerts_bulk(
+    user_ids: Optional[List[int]] = Query(None, max_length=200),
+    course_ids: Optional[List[int]] = Query(None, max_length=200),
+    course_codes: Optional[List[str]] = Query(None, max_length=50),
+    active_only: bool = True,
+    db: Session = Depends(get_read_db)
+):
+    """Alerts of many users and/or on many sections or course codes, in one query"""
+    if not user_ids and not course_ids and not course_codes:
+        raise HTTPException(status_code=400, detail="Provide user_ids, course_ids or course_codes")
+    
+    query = db.query(Alert)
+    if user_ids:
+        query = query.filter(Alert.user_id.in_(user_ids))
+    targets = []
+    if course_ids:
+        targets.append(Alert.course_id.in_(course_ids))
+    if course_codes:
+        targets.append(Alert.course_code.in_([code.strip().upper() for code in course_codes]))
+    if targets:
+        query = query.filter(or_(*targets))
+    if active_only:
+        query = query.filter(Alert.is_active == True)
+    
+    columns = [Alert.__table__.c[name] for name in AlertSchema.model_fields if name in Alert.__table__.c]
+    return json_response([row._asdict() for row in query.order_by(Alert.id).with_entities(*columns)])
+
+@router.put("/bulk", response_model=ApiResponse)
+async def update_alerts(request: AlertBulkUpdate, db: Session = Depends(get_db)):
+    """Apply the same change to many alerts with one UPDATE"""
+    update_data = request.dict(exclude_unset=True, exclude={"alert_ids", "user_id"})
+    if not update_data:
+        raise HTTPException(status_code=400, detail="Nothing to update")
+    if update_data.get("faculty"):
+        update_data["faculty"] = update_data["faculty"].strip().upper()
+    update_data.update(_rule_reset(update_data))
+    
+    query = db.query(Alert).filter(Alert.id.in_(request.alert_ids))
+    if request.user_id is not None:
+        query = query.filter(Alert.user_id == request.user_id)
+    if _window_conflict(query, update_data):
+        raise HTTPException(status_code=400, detail="start_after must be earlier than end_before")
+    updated_ids = [alert_id for (alert_id,) in query.with_entities(Alert.id)]
+    if updated_ids:
+        db.query(Alert).filter(Alert.id.in_(updated_ids)).update(update_data, synchronize_session=False)
+        db.commit()
+    
+    found = set(updated_ids)
+    return ApiResponse(
+        success=True,
+        message=f"Updated {len(updated_ids)} alerts",
+        data={"updated": sorted(found), "not_found": [alert_id for alert_id in request.alert_ids if alert_id not in found]}
+    )
+
+@router.post("/bulk/delete", response_model=ApiResponse)
+async def delete_alerts(request: AlertBulkDelete, db: Session = Depends(get_db)):
+    """Delete many alerts with one DELETE"""
+    query = db.query(Alert).filter(Alert.id.in_(request.alert_ids))
+    if request.user_id is not None:
+        query = query.filter(Alert.user_id == request.user_id)
+    deleted_ids = [alert_id for (alert_id,) in query.with_entities(Alert.id)]
+    if deleted_ids:
+        db.query(Alert).filter(Alert.id.in_(deleted_ids)).delete(synchronize_session=False)
+        db.commit()
+    
+    found = set(deleted_ids)
+    return ApiResponse(
+        success=True,
+        message=f"Deleted {len(deleted_ids)} alerts",
+        data={"deleted": sorted(found), "not_found": [alert_id for alert_id in request.alert_ids if alert_id not in found]}
+    )
+
 @router.get("/", response_model=List[AlertWithDetails])
 async def get_alerts(
     user_id: int = None,
     active_only: bool = True,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get all alerts with optional filtering"""
     query = db.query(Alert)
@@ -70,7 +280,7 @@ async def get_alerts(
     return enhanced_alerts
 
 @router.get("/{alert_id}", response_model=AlertWithDetails)
-async def get_alert(alert_id: int, db: Session = Depends(get_db)):
+async def get_alert(alert_id: int, db: Session = Depends(get_read_db)):
     """Get a specific alert"""
     alert = db.query(Alert).filter(Alert.id == alert_id).first()
     if not alert:
@@ -93,6 +303,11 @@ async def update_alert(alert_id: int, alert_update: AlertUpdate, db: Session = D
         raise HTTPException(status_code=404, detail="Alert not found")
     
     update_data = alert_update.dict(exclude_unset=True)
+    if update_data.get("faculty"):
+        update_data["faculty"] = update_data["faculty"].strip().upper()
+    if _window_conflict(db.query(Alert).filter(Alert.id == alert_id), update_data):
+        raise HTTPException(status_code=400, detail="start_after must be earlier than end_before")
+    update_data.update(_rule_reset(update_data))
     for field, value in update_data.items():
         setattr(alert, field, value)
     
@@ -116,7 +331,7 @@ async def delete_alert(alert_id: int, db: Session = Depends(get_db)):
     )
 
 @router.get("/user/{user_id}", response_model=List[AlertWithDetails])
-async def get_user_alerts(user_id: int, db: Session = Depends(get_db)):
+async def get_user_alerts(user_id: int, db: Session = Depends(get_read_db)):
     """Get all alerts for a specific user"""
     user = db.query(User).filter(User.id == user_id).first()
     if not user:
@@ -140,44 +355,12 @@ async def get_user_alerts(user_id: int, db: Session = Depends(get_db)):
 @router.post("/check-and-notify")
 async def check_and_send_notifications(db: Session = Depends(get_db)):
     """Check for seat availability and send notifications (admin endpoint)"""
-    from sqlalchemy.orm import joinedload
-    
-    # Get all active alerts
-    alerts = db.query(Alert).options(
-        joinedload(Alert.user),
-        joinedload(Alert.course)
-    ).filter(Alert.is_active == True).all()
+    queued, results = await notify_due_alerts(db)
     
-    notifications_to_send = []
-    
-    for alert in alerts:
-        if alert.should_notify and alert.course_has_seats:
-            notifications_to_send.append({
-                "user_email": alert.user.email,
-                "course_data": {
-                    "course_code": alert.course.course_code,
-                    "section_name": alert.course.section_name,
-                    "available_seats": alert.course.available_seats,
-                    "capacity": alert.course.capacity,
-                    "room_name": alert.course.room_name,
-                    "faculties": alert.course.faculties,
-                    "schedule_data": alert.course.schedule_data
-                }
-            })
-            
-            # Mark as notified
-            alert.mark_notified()
-    
-    if notifications_to_send:
-        # Send batch notifications
-        results = await email_service.send_batch_alerts(notifications_to_send)
-        
-        # Commit changes after successful notifications
-        db.commit()
-        
+    if queued:
         return ApiResponse(
             success=True,
-            message=f"Processed {len(notifications_to_send)} notifications",
+            message=f"Processed {queued} notifications",
             data=results
         )
     
@@ -185,4 +368,4 @@ async def check_and_send_notifications(db: Session = Depends(get_db)):
         success=True,
         message="No notifications to send",
         data={"sent": 0, "failed": 0}
-    )
\ No newline at end of file
+    )
@@ -1,13 +1,68 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import select
 from sqlalchemy.orm import Session
-from typing import List, Optional
-from app.database import get_db
+from typing import Any, Dict, List, Literal, Optional
+from app.database import get_read_db
+from app.models.class_slot import ClassSlot
 from app.models.course import Course
-from app.schemas import Course as CourseSchema, CourseWithStatus, ApiResponse
+from app.responses import json_response
+from app.services.semester_service import course_model
+from app.schemas import Course as CourseSchema, CourseWithStatus, CourseSearchResult, ApiResponse, TIME_PATTERN, Weekday
+from app.services.schedule_engine import parse_time
 from app.services.bracu_service import bracu_service
+from app.cache import cache
+import os
 
 router = APIRouter(prefix="/api/courses", tags=["courses"])
 
+COURSE_STATS_CACHE_TTL_SECONDS = int(os.getenv("COURSE_STATS_CACHE_TTL_SECONDS", "30"))
+
+def _course_dicts(model, query, include_schedule: bool = False) -> List[Dict[str, Any]]:
+    """
+    CourseWithStatus-shaped dicts selected as plain columns: no ORM objects
+    and no per-row pydantic validation (the rows come from our own sync).
+    The schedule_data JSON, the bulk of each row, is only read when asked for.
+    """
+    columns = [
+        model.__table__.c[name] for name in CourseWithStatus.model_fields
+        if name in model.__table__.c and (include_schedule or name != "schedule_data")
+    ]
+    courses = []
+    for row in query.with_entities(*columns):
+        course = row._asdict()
+        seats = course["real_time_seat_count"]
+        course["available_seats"] = seats
+        course["is_full"] = seats <= 0
+        course["is_available"] = seats > 0
+        course.setdefault("schedule_data", None)
+        courses.append(course)
+    return courses
+
+def _filter_slots(
+    query,
+    days: Optional[List[str]],
+    start_after: Optional[str],
+    end_before: Optional[str],
+    exclude_days: Optional[List[str]],
+    slot_kind: Optional[str],
+):
+    """Day and time filters, answered from class_slots"""
+    kind = [ClassSlot.kind == slot_kind] if slot_kind else []
+    meets = []
+    if days:
+        meets.append(ClassSlot.weekday.in_(days))
+    if start_after:
+        meets.append(ClassSlot.start_minute >= parse_time(start_after))
+    if end_before:
+        meets.append(ClassSlot.end_minute <= parse_time(end_before))
+    if meets:
+        query = query.filter(Course.id.in_(select(ClassSlot.course_id).where(*meets, *kind)))
+    if exclude_days:
+        query = query.filter(
+            Course.id.notin_(select(ClassSlot.course_id).where(ClassSlot.weekday.in_(exclude_days), *kind))
+        )
+    return query
+
 @router.get("/", response_model=List[CourseWithStatus])
 async def get_courses(
     skip: int = Query(0, ge=0),
@@ -16,40 +71,61 @@ async def get_courses(
     available_only: Optional[bool] = Query(None),
     section_type: Optional[str] = Query(None),
     search: Optional[str] = Query(None),
-    db: Session = Depends(get_db)
+    semester_session_id: Optional[int] = Query(None, description="Defaults to the active semester"),
+    days: Optional[List[Weekday]] = Query(None, description="Sections with a class on one of these days"),
+    start_after: Optional[str] = Query(
+        None, pattern=TIME_PATTERN, description="Sections with a class starting at or after this time (HH:MM)"
+    ),
+    end_before: Optional[str] = Query(
+        None, pattern=TIME_PATTERN, description="Sections with a class ending at or before this time (HH:MM)"
+    ),
+    exclude_days: Optional[List[Weekday]] = Query(None, description="Sections with no class on these days"),
+    slot_kind: Optional[Literal["THEORY", "LAB"]] = Query(
+        None, description="Apply the day and time filters to theory classes or labs only"
+    ),
+    include_schedule: bool = Query(False, description="Include schedule_data"),
+    db: Session = Depends(get_read_db)
 ):
-    """Get all courses with optional filtering"""
-    query = db.query(Course)
+    """
+    Get all courses with optional filtering. days, start_after and
+    end_before select sections with one class matching all three.
+    """
+    model, semester = course_model(db, semester_session_id)
+    query = db.query(model).filter(model.semester_session_id == semester)
+    
+    if days or start_after or end_before or exclude_days:
+        if model is not Course:
+            raise HTTPException(status_code=400, detail="Day and time filters cover current semesters only")
+        query = _filter_slots(query, days, start_after, end_before, exclude_days, slot_kind)
     
     if course_code:
-        query = query.filter(Course.course_code.ilike(f"%{course_code}%"))
+        query = query.filter(model.course_code.ilike(f"%{course_code}%"))
     
     if search:
         # For search parameter, prioritize exact matches for course codes
         if search.upper().startswith("CSE") and search.upper().isalnum():
             # First try exact match for course codes like CSE110
-            exact_matches = query.filter(Course.course_code == search.upper()).all()
+            exact_matches = _course_dicts(model, query.filter(model.course_code == search.upper()), include_schedule)
             if exact_matches:
-                return exact_matches
+                return json_response(exact_matches)
             # Then try starts with match
-            query = query.filter(Course.course_code.startswith(search.upper()))
+            query = query.filter(model.course_code.startswith(search.upper()))
         else:
             # For other searches, use the existing partial match
-            query = query.filter(Course.course_code.ilike(f"%{search}%"))
+            query = query.filter(model.course_code.ilike(f"%{search}%"))
     
     if available_only is True:
-        query = query.filter(Course.real_time_seat_count > 0)
+        query = query.filter(model.real_time_seat_count > 0)
     elif available_only is False:
-        query = query.filter(Course.real_time_seat_count <= 0)
+        query = query.filter(model.real_time_seat_count <= 0)
     
     # Always filter out lab sections as they are now embedded in parent courses
-    query = query.filter(Course.section_type != 'LAB')
+    query = query.filter(model.section_type != 'LAB')
     
-    courses = query.offset(skip).limit(limit).all()
-    return courses
+    return json_response(_course_dicts(model, query.offset(skip).limit(limit), include_schedule))
 
 @router.get("/{course_id}", response_model=CourseWithStatus)
-async def get_course(course_id: int, db: Session = Depends(get_db)):
+async def get_course(course_id: int, db: Session = Depends(get_read_db)):
     """Get a specific course by ID"""
     course = db.query(Course).filter(Course.id == course_id).first()
     if not course:
@@ -57,55 +133,79 @@ async def get_course(course_id: int, db: Session = Depends(get_db)):
     return course
 
 @router.get("/code/{course_code}", response_model=List[CourseWithStatus])
-async def get_courses_by_code(course_code: str, db: Session = Depends(get_db)):
+async def get_courses_by_code(
+    course_code: str,
+    semester_session_id: Optional[int] = Query(None, description="Defaults to the active semester"),
+    include_schedule: bool = Query(False, description="Include schedule_data"),
+    db: Session = Depends(get_read_db)
+):
     """Get all sections for a specific course code"""
-    courses = db.query(Course).filter(
-        Course.course_code.ilike(course_code)
-    ).all()
-    return courses
+    model, semester = course_model(db, semester_session_id)
+    query = db.query(model).filter(
+        model.semester_session_id == semester,
+        model.course_code.ilike(course_code)
+    )
+    return json_response(_course_dicts(model, query, include_schedule))
 
-@router.get("/search/")
+@router.get("/search/", response_model=CourseSearchResult)
 async def search_courses(
     q: str = Query(..., min_length=2),
     limit: int = Query(20, ge=1, le=100),
-    db: Session = Depends(get_db)
+    semester_session_id: Optional[int] = Query(None, description="Defaults to the active semester"),
+    include_schedule: bool = Query(False, description="Include schedule_data"),
+    db: Session = Depends(get_read_db)
 ):
     """Search courses by course code or name"""
-    query = db.query(Course)
+    model, semester = course_model(db, semester_session_id)
+    query = db.query(model).filter(model.semester_session_id == semester)
     
     # Prioritize exact matches for course codes like CSE110
     if q.upper().startswith("CSE") and q.upper().isalnum():
         # First try exact match
-        exact_matches = query.filter(Course.course_code == q.upper()).all()
+        exact_matches = _course_dicts(model, query.filter(model.course_code == q.upper()), include_schedule)
         if exact_matches:
-            return {
+            return json_response({
                 "query": q,
                 "results": len(exact_matches),
                 "courses": exact_matches
-            }
+            })
         # Then try starts with match
-        query = query.filter(Course.course_code.startswith(q.upper()))
+        query = query.filter(model.course_code.startswith(q.upper()))
     else:
         # For other searches, use partial match
-        query = query.filter(Course.course_code.ilike(f"%{q}%"))
+        query = query.filter(model.course_code.ilike(f"%{q}%"))
     
-    courses = query.limit(limit).all()
-    return {
+    courses = _course_dicts(model, query.limit(limit), include_schedule)
+    return json_response({
         "query": q,
         "results": len(courses),
         "courses": courses
-    }
+    })
 
 @router.get("/stats/overview")
-async def get_course_stats(db: Session = Depends(get_db)):
+async def get_course_stats(
+    semester_session_id: Optional[int] = Query(None, description="Defaults to the active semester"),
+    db: Session = Depends(get_read_db)
+):
     """Get course statistics overview"""
-    total_courses = db.query(Course).count()
-    available_courses = db.query(Course).filter(Course.real_time_seat_count > 0).count()
+    model, semester = course_model(db, semester_session_id)
+    cache_key = f"overview:{semester}"
+    cached = await cache.get_json("course_stats", cache_key)
+    if cached is not None:
+        return cached
+    
+    query = db.query(model).filter(model.semester_session_id == semester)
+    total_courses = query.count()
+    available_courses = query.filter(model.real_time_seat_count > 0).count()
     full_courses = total_courses - available_courses
     
-    return {
+    stats = {
         "total_courses": total_courses,
         "available_courses": available_courses,
         "full_courses": full_courses,
-        "availability_rate": round((available_courses / total_courses * 100), 2) if total_courses > 0 else 0
-    }
\ No newline at end of file
+        "availability_rate": round((available_courses / total_courses * 100), 2) if total_courses > 0 else 0,
+        "semester_session_id": semester
+    }
+    # Cleared by every course sync; the TTL bounds staleness from other writers
+    await cache.set_json("course_stats", cache_key, stats, ttl=COURSE_STATS_CACHE_TTL_SECONDS)
+    return stats
\ No newline at end of file
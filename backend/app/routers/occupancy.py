@@ -0,0 +1,112 @@
+from fastapi import APIRouter, HTTPException, Query
+from typing import List, Optional
+from app.services.realtime_service import realtime_service
+from app.services.schedule_engine import DAY_INDEX, parse_time
+from app.schemas import ApiResponse
+
+router = APIRouter(prefix="/api/occupancy", tags=["occupancy"])
+
+async def _get_snapshot():
+    snapshot = await realtime_service.get_snapshot()
+    if not snapshot:
+        raise HTTPException(status_code=503, detail="Course data is not available yet")
+    return snapshot
+
+def _parse_day(day: str) -> str:
+    if day.upper() not in DAY_INDEX:
+        raise HTTPException(status_code=400, detail=f"Invalid day: {day}")
+    return day.upper()
+
+def _parse_range(start: str, end: str):
+    start_minutes = parse_time(start)
+    end_minutes = parse_time(end)
+    if start_minutes is None or end_minutes is None or end_minutes <= start_minutes:
+        raise HTTPException(status_code=400, detail="Invalid time range, expected start < end as HH:MM")
+    return start_minutes, end_minutes
+
+@router.get("/rooms/free", response_model=ApiResponse)
+async def get_free_rooms(
+    day: str = Query(..., description="Weekday, e.g. SUNDAY"),
+    start: str = Query(..., description="Start time as HH:MM"),
+    end: str = Query(..., description="End time as HH:MM")
+):
+    """List rooms with no class or lab booked during the given time range"""
+    day = _parse_day(day)
+    start_minutes, end_minutes = _parse_range(start, end)
+    snapshot = await _get_snapshot()
+    
+    rooms = snapshot.occupancy_index.free_rooms(day, start_minutes, end_minutes)
+    return ApiResponse(
+        success=True,
+        message=f"Found {len(rooms)} free rooms",
+        data={
+            "day": day,
+            "start": start,
+            "end": end,
+            "rooms": rooms,
+            "total": len(rooms),
+            "snapshot_version": snapshot.version
+        }
+    )
+
+@router.get("/rooms/utilization", response_model=ApiResponse)
+async def get_room_utilization(
+    day: Optional[List[str]] = Query(None, description="Weekdays to include (default: all teaching days)"),
+    start: str = Query("08:00", description="Window start as HH:MM"),
+    end: str = Query("17:00", description="Window end as HH:MM")
+):
+    """Percentage of the time window each room is booked"""
+    days = [_parse_day(value) for value in day] if day else None
+    start_minutes, end_minutes = _parse_range(start, end)
+    snapshot = await _get_snapshot()
+    
+    usage = snapshot.occupancy_index.utilization(start_minutes, end_minutes, days)
+    return ApiResponse(
+        success=True,
+        message=f"Utilization for {len(usage)} rooms",
+        data={
+            "start": start,
+            "end": end,
+            "rooms": [{"room": room, "utilization_percent": percent} for room, percent in usage],
+            "snapshot_version": snapshot.version
+        }
+    )
+
+@router.get("/rooms/{room_name}", response_model=ApiResponse)
+async def get_room_timetable(room_name: str):
+    """Weekly timetable of a room"""
+    snapshot = await _get_snapshot()
+    index = snapshot.occupancy_index
+    
+    if room_name not in index.rooms:
+        raise HTTPException(status_code=404, detail="Room not found")
+    
+    bookings = index.room_bookings(room_name)
+    return ApiResponse(
+        success=True,
+        message=f"Found {len(bookings)} bookings",
+        data={
+            "room": room_name,
+            "bookings": [booking.to_dict() for booking in bookings],
+            "snapshot_version": snapshot.version
+        }
+    )
+
+@router.get("/faculty/{initials}", response_model=ApiResponse)
+async def get_faculty_timetable(initials: str):
+    """Weekly timetable of a faculty member (by initials)"""
+    snapshot = await _get_snapshot()
+    
+    bookings = snapshot.occupancy_index.faculty_timetable(initials)
+    if not bookings:
+        raise HTTPException(status_code=404, detail="Faculty not found")
+    
+    return ApiResponse(
+        success=True,
+        message=f"Found {len(bookings)} classes",
+        data={
+            "faculty": initials.upper(),
+            "bookings": [booking.to_dict() for booking in bookings],
+            "snapshot_version": snapshot.version
+        }
+    )
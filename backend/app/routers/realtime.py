@@ -1,7 +1,10 @@
 from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import Response
 from typing import List, Optional
+from app.cache import cache
+from app.responses import api_response, dumps
 from app.services.realtime_service import realtime_service
-from app.schemas import ApiResponse
+from app.schemas import ApiResponse, SectionLookupRequest
 import logging
 
 router = APIRouter(prefix="/api/realtime", tags=["realtime"])
@@ -11,33 +14,121 @@ logger = logging.getLogger(__name__)
 async def get_realtime_courses():
     """Get all courses directly from BRACU Connect API (real-time)"""
     try:
-        courses = await realtime_service.get_courses()
+        snapshot = await realtime_service.get_snapshot()
+        cache_key = snapshot.cache_key if snapshot else None
+        if cache_key:
+            body = await cache.get("responses", f"realtime_courses:{cache_key}")
+            if body is not None:
+                return Response(body, media_type="application/json", headers=realtime_service.snapshot_headers(snapshot))
+        
+        courses = realtime_service.transform_courses(snapshot.raw_courses if snapshot else [])
         timestamp = courses[0]["last_updated"] if courses and len(courses) > 0 else None
-        return ApiResponse(
-            success=True,
-            message=f"Retrieved {len(courses)} courses in real-time",
-            data={
+        
+        # The full list is the largest response; keep it serialized per snapshot
+        body = dumps({
+            "success": True,
+            "message": f"Retrieved {len(courses)} courses in real-time",
+            "data": {
                 "courses": courses,
                 "total": len(courses),
+                "version": snapshot.version if snapshot else None,
+                # Pass as ?since= to /api/realtime/changes to poll for updates
+                "cursor": snapshot.cache_key if snapshot else None,
                 "timestamp": timestamp
             }
-        )
+        })
+        if cache_key:
+            await cache.set(
+                "responses", f"realtime_courses:{cache_key}", body,
+                ttl=max(realtime_service.snapshot_ttl_seconds * 2, 60)
+            )
+        return Response(body, media_type="application/json", headers=realtime_service.snapshot_headers(snapshot))
     except Exception as e:
         logger.error(f"Error fetching real-time courses: {e}")
         raise HTTPException(status_code=500, detail="Failed to fetch real-time course data")
 
+@router.post("/courses/batch", response_model=ApiResponse)
+async def get_realtime_sections(request: SectionLookupRequest):
+    """Get many sections in one call by section id and/or course code (watchlists)"""
+    if not request.section_ids and not request.course_codes:
+        raise HTTPException(status_code=400, detail="Provide section_ids or course_codes")
+    try:
+        result = await realtime_service.get_sections(
+            request.section_ids, request.course_codes, request.semester_session_id
+        )
+        return api_response(
+            f"Retrieved {len(result['sections'])} sections",
+            {
+                "sections": result["sections"],
+                "total": len(result["sections"]),
+                "unknown_section_ids": result["unknown_section_ids"],
+                "unknown_course_codes": result["unknown_course_codes"]
+            },
+            headers=realtime_service.snapshot_headers(realtime_service.snapshot)
+        )
+    except Exception as e:
+        logger.error(f"Error fetching real-time sections: {e}")
+        raise HTTPException(status_code=500, detail="Failed to fetch section data")
+
+@router.get("/changes", response_model=ApiResponse)
+async def get_realtime_changes(
+    since: str = Query(
+        ..., max_length=64, description="Snapshot the client already has (data.cursor of the last response)"
+    )
+):
+    """
+    Sections whose seats changed, or that were added or removed, since a
+    snapshot. When `resync_required` is true the snapshot is too old or not
+    known to this node: reload /api/realtime/courses and poll again from its
+    cursor.
+    """
+    try:
+        snapshot = await realtime_service.get_snapshot()
+        cache_key = f"realtime_changes:{snapshot.cache_key}:{since}" if snapshot else None
+        if cache_key:
+            body = await cache.get("responses", cache_key)
+            if body is not None:
+                return Response(body, media_type="application/json", headers=realtime_service.snapshot_headers(snapshot))
+        
+        changes = realtime_service.changes_since(snapshot, since)
+        body = dumps({
+            "success": True,
+            "message": (
+                "Full resync required" if changes["resync_required"]
+                else f"{len(changes['courses'])} sections changed, {len(changes['removed_section_ids'])} removed"
+            ),
+            "data": {
+                "since": since,
+                **changes,
+                "total": len(snapshot.raw_courses) if snapshot else 0
+            }
+        })
+        if cache_key:
+            await cache.set(
+                "responses", cache_key, body,
+                ttl=max(realtime_service.snapshot_ttl_seconds * 2, 60)
+            )
+        return Response(body, media_type="application/json", headers=realtime_service.snapshot_headers(snapshot))
+    except Exception as e:
+        logger.error(f"Error fetching real-time changes since {since}: {e}")
+        raise HTTPException(status_code=500, detail="Failed to fetch course changes")
+
 @router.get("/courses/{course_code}", response_model=ApiResponse)
 async def get_realtime_course(course_code: str):
-    """Get specific course by course code directly from API"""
+    """Get every section of a course code directly from API"""
     try:
-        course = await realtime_service.get_course_by_code(course_code)
-        if not course:
+        sections = await realtime_service.get_sections_by_code(course_code)
+        if not sections:
             raise HTTPException(status_code=404, detail="Course not found")
         
-        return ApiResponse(
-            success=True,
-            message="Course retrieved successfully",
-            data=course
+        return api_response(
+            f"Retrieved {len(sections)} sections",
+            {
+                "course_code": course_code.upper(),
+                "sections": sections,
+                "total": len(sections)
+            },
+            headers=realtime_service.snapshot_headers(realtime_service.snapshot)
         )
     except HTTPException:
         raise
@@ -52,37 +143,28 @@ async def search_realtime_courses(
     """Search courses directly from API without storage"""
     try:
         courses = await realtime_service.search_courses(q)
-        return ApiResponse(
-            success=True,
-            message=f"Found {len(courses)} matching courses",
-            data={
+        return api_response(
+            f"Found {len(courses)} matching courses",
+            {
                 "query": q,
                 "results": len(courses),
                 "courses": courses
-            }
+            },
+            headers=realtime_service.snapshot_headers(realtime_service.snapshot)
         )
     except Exception as e:
         logger.error(f"Error searching real-time courses: {e}")
         raise HTTPException(status_code=500, detail="Failed to search courses")
 
 @router.get("/stats", response_model=ApiResponse)
-async def get_realtime_stats():
+async def get_realtime_stats(response: Response):
     """Get real-time statistics from API"""
     try:
         logger.info("Fetching real-time stats")
-        courses = await realtime_service.get_courses()
-        logger.info(f"Got {len(courses)} courses for stats calculation")
-        total_courses = len(courses)
-        available_courses = len([c for c in courses if c["available_seats"] > 0])
-        full_courses = total_courses - available_courses
-        
-        stats_data = {
-            "total_courses": total_courses,
-            "available_courses": available_courses,
-            "full_courses": full_courses,
-            "availability_rate": round((available_courses / total_courses * 100), 2) if total_courses > 0 else 0,
-            "timestamp": courses[0]["last_updated"] if courses and len(courses) > 0 else None
-        }
+        stats_data = await realtime_service.get_stats()
+        snapshot = realtime_service.snapshot
+        response.headers.update(realtime_service.snapshot_headers(snapshot))
+        stats_data = {**stats_data, "stale": realtime_service.is_stale(snapshot)}
         
         logger.info(f"Returning stats: {stats_data}")
         
@@ -0,0 +1,116 @@
+from fastapi import APIRouter, HTTPException
+from app.services.realtime_service import realtime_service
+from app.schemas import ApiResponse, ConflictCheckRequest, RoutineRequest, ExamCompatibleRequest
+import logging
+import time
+
+router = APIRouter(prefix="/api/schedule", tags=["schedule"])
+logger = logging.getLogger(__name__)
+
+async def _get_snapshot():
+    snapshot = await realtime_service.get_snapshot()
+    if not snapshot:
+        raise HTTPException(status_code=503, detail="Course data is not available yet")
+    return snapshot
+
+async def _get_schedule_index():
+    snapshot = await _get_snapshot()
+    return snapshot, snapshot.schedule_index
+
+@router.post("/conflicts", response_model=ApiResponse)
+async def check_conflicts(request: ConflictCheckRequest):
+    """Check whether the given sections clash in their weekly class or lab slots"""
+    snapshot, index = await _get_schedule_index()
+    
+    unknown = [section_id for section_id in request.section_ids if section_id not in index.sections]
+    conflicts = index.conflicts(request.section_ids)
+    
+    return ApiResponse(
+        success=True,
+        message=f"Found {len(conflicts)} conflicting section pairs",
+        data={
+            "has_conflict": bool(conflicts),
+            "conflicts": [
+                {"section_id": first, "conflicts_with": second}
+                for first, second in conflicts
+            ],
+            "unknown_section_ids": unknown,
+            "snapshot_version": snapshot.version
+        }
+    )
+
+@router.post("/routines", response_model=ApiResponse)
+async def build_routines(request: RoutineRequest):
+    """Enumerate conflict-free routines taking one section of each course code"""
+    snapshot, index = await _get_schedule_index()
+    
+    started = time.perf_counter()
+    result = index.build_routines(
+        request.course_codes,
+        open_seats_only=request.open_seats_only,
+        max_results=request.max_results
+    )
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    logger.info(f"Built {len(result['routines'])} routines for {request.course_codes} in {elapsed_ms:.2f}ms")
+    
+    return ApiResponse(
+        success=True,
+        message=f"Found {len(result['routines'])} conflict-free routines",
+        data={
+            "routines": [
+                {"sections": [section.to_dict() for section in routine]}
+                for routine in result["routines"]
+            ],
+            "total": len(result["routines"]),
+            "truncated": result["truncated"],
+            "missing_courses": result["missing_courses"],
+            "snapshot_version": snapshot.version
+        }
+    )
+
+@router.post("/exam-clashes", response_model=ApiResponse)
+async def check_exam_clashes(request: ConflictCheckRequest):
+    """Check whether any of the given sections have overlapping mid or final exams"""
+    snapshot = await _get_snapshot()
+    index = snapshot.exam_index
+    
+    clashes = index.clashes(request.section_ids)
+    
+    return ApiResponse(
+        success=True,
+        message=f"Found {len(clashes)} exam clashes",
+        data={
+            "has_clash": bool(clashes),
+            "clashes": [
+                {"section_id": first, "conflicts_with": second, "exam": kind}
+                for first, second, kind in clashes
+            ],
+            "unknown_section_ids": [
+                section_id for section_id in request.section_ids if section_id not in index.slots
+            ],
+            "snapshot_version": snapshot.version
+        }
+    )
+
+@router.post("/exam-compatible", response_model=ApiResponse)
+async def get_exam_compatible_sections(request: ExamCompatibleRequest):
+    """List the sections of a course whose exams avoid the exams of the given sections"""
+    snapshot = await _get_snapshot()
+    index = snapshot.exam_index
+    
+    if request.course_code.upper() not in index.by_course:
+        raise HTTPException(status_code=404, detail="Course not found")
+    
+    compatible = index.compatible_sections(request.course_code, request.section_ids)
+    schedule_index = snapshot.schedule_index
+    
+    return ApiResponse(
+        success=True,
+        message=f"Found {len(compatible)} sections without exam clashes",
+        data={
+            "course_code": request.course_code.upper(),
+            "sections": [schedule_index.sections[section_id].to_dict() for section_id in compatible],
+            "total": len(compatible),
+            "snapshot_version": snapshot.version
+        }
+    )
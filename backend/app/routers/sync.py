@@ -1,7 +1,10 @@
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
-from app.database import get_db
-from app.services.bracu_service import bracu_service
+from app.database import get_read_db
+from app.models.course import Course
+from app.models.sync_run import FAILED, RUNNING, SUCCEEDED
+from app.services.semester_service import active_semester_id
+from app.services.sync_jobs import sync_jobs
 from app.schemas import ApiResponse
 import logging
 
@@ -9,51 +12,83 @@ router = APIRouter(prefix="/api/sync", tags=["sync"])
 logger = logging.getLogger(__name__)
 
 @router.post("/courses", response_model=ApiResponse)
-async def sync_courses(
-    background_tasks: BackgroundTasks,
-    db: Session = Depends(get_db)
-):
-    """Sync courses from BRACU Connect (manual trigger)"""
+async def sync_courses():
+    """
+    Sync courses from BRACU Connect in the background (manual trigger).
+    Joins the sync job already running, if any; poll /api/sync/jobs/{job_id}.
+    """
     try:
-        # Run sync in background to avoid timeout
-        background_tasks.add_task(bracu_service.sync_courses_to_db, db)
-        
-        return ApiResponse(
-            success=True,
-            message="Course sync started in background"
-        )
+        job, started = await sync_jobs.start("manual")
     except Exception as e:
         logger.error(f"Error starting course sync: {e}")
         raise HTTPException(status_code=500, detail="Failed to start sync")
 
+    return ApiResponse(
+        success=True,
+        message="Course sync started in background" if started else "Course sync already running",
+        data=job
+    )
+
 @router.post("/courses/sync-now", response_model=ApiResponse)
-async def sync_courses_now(db: Session = Depends(get_db)):
-    """Sync courses from BRACU Connect immediately (blocking)"""
+async def sync_courses_now():
+    """Sync courses from BRACU Connect immediately (blocking), or wait for the running sync"""
     try:
-        stats = await bracu_service.sync_courses_to_db(db)
-        
-        return ApiResponse(
-            success=True,
-            message="Course sync completed",
-            data=stats
-        )
+        job, finished = await sync_jobs.run("sync_now")
     except Exception as e:
         logger.error(f"Error syncing courses: {e}")
         raise HTTPException(status_code=500, detail="Failed to sync courses")
 
+    if not finished:
+        raise HTTPException(
+            status_code=409, detail=f"Course sync {job['job_id']} is running on another worker"
+        )
+    if job["status"] == FAILED:
+        raise HTTPException(status_code=500, detail=f"Failed to sync courses: {job['error']}")
+    return ApiResponse(
+        success=job["status"] == SUCCEEDED,
+        message=f"Course sync {job['status']}",
+        data=job
+    )
+
+@router.get("/jobs", response_model=ApiResponse)
+async def list_sync_jobs(
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_read_db)
+):
+    """Most recent sync jobs, newest first"""
+    return ApiResponse(success=True, message="Sync jobs", data=sync_jobs.recent(db, limit))
+
+@router.get("/jobs/{job_id}", response_model=ApiResponse)
+async def get_sync_job(job_id: str):
+    """Status, phase timings and progress of a sync job"""
+    job = sync_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Sync job not found")
+    return ApiResponse(success=True, message=f"Sync job {job['status']}", data=job)
+
+@router.post("/jobs/{job_id}/cancel", response_model=ApiResponse)
+async def cancel_sync_job(job_id: str):
+    """Stop a running sync job at its next section; its upserts are rolled back"""
+    job = sync_jobs.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Sync job not found")
+    if job["status"] != RUNNING:
+        raise HTTPException(status_code=409, detail=f"Sync job already {job['status']}")
+    return ApiResponse(success=True, message="Sync job cancellation requested", data=job)
+
 @router.get("/status")
-async def get_sync_status(db: Session = Depends(get_db)):
+async def get_sync_status(db: Session = Depends(get_read_db)):
     """Get sync status and last sync time"""
-    from sqlalchemy import func
-    from app.models.course import Course
-    
-    # Get the most recent course update
-    latest_course = db.query(Course).order_by(Course.last_fetched_at.desc()).first()
-    
-    total_courses = db.query(Course).count()
-    
+    last_run = sync_jobs.last_finished(db)
+
+    semester = active_semester_id(db)
+    total_courses = db.query(Course).filter(Course.semester_session_id == semester).count()
+
     return {
         "total_courses": total_courses,
-        "last_sync": latest_course.last_fetched_at if latest_course else None,
+        "semester_session_id": semester,
+        "last_sync": last_run["finished_at"] if last_run else None,
+        "last_run": last_run,
+        "running_job": sync_jobs.running(db),
         "sync_enabled": True
-    }
\ No newline at end of file
+    }
@@ -1,12 +1,23 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException
 from sqlalchemy.orm import Session
-from typing import List
-from app.database import get_db
+from typing import List, Optional
+from app.database import get_db, get_read_db
 from app.models.user import User
+from app.routers.admin import is_admin
 from app.schemas import User as UserSchema, UserCreate, UserUpdate, ApiResponse
+from app.services.webhook_service import UnsafeWebhookURL, webhook_service
+import hmac
 
 router = APIRouter(prefix="/api/users", tags=["users"])
 
+async def _check_webhook_url(url: Optional[str]):
+    """Reject webhook URLs whose host is not a public address (checked again on every delivery)"""
+    if url:
+        try:
+            await webhook_service.check_url(url)
+        except UnsafeWebhookURL as e:
+            raise HTTPException(status_code=400, detail=f"Invalid webhook_url: {e}")
+
 @router.post("/", response_model=UserSchema)
 async def create_user(user: UserCreate, db: Session = Depends(get_db)):
     """Create a new user"""
@@ -14,21 +25,27 @@ async def create_user(user: UserCreate, db: Session = Depends(get_db)):
     existing_user = db.query(User).filter(User.email == user.email).first()
     if existing_user:
         raise HTTPException(status_code=400, detail="User already exists")
+    await _check_webhook_url(user.webhook_url)
     
-    db_user = User(email=user.email, full_name=user.full_name)
+    db_user = User(
+        email=user.email,
+        full_name=user.full_name,
+        webhook_url=user.webhook_url,
+        webhook_secret=user.webhook_secret,
+    )
     db.add(db_user)
     db.commit()
     db.refresh(db_user)
     return db_user
 
 @router.get("/", response_model=List[UserSchema])
-async def get_users(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+async def get_users(skip: int = 0, limit: int = 100, db: Session = Depends(get_read_db)):
     """Get all users"""
     users = db.query(User).offset(skip).limit(limit).all()
     return users
 
 @router.get("/{user_id}", response_model=UserSchema)
-async def get_user(user_id: int, db: Session = Depends(get_db)):
+async def get_user(user_id: int, db: Session = Depends(get_read_db)):
     """Get a specific user"""
     user = db.query(User).filter(User.id == user_id).first()
     if not user:
@@ -36,7 +53,7 @@ async def get_user(user_id: int, db: Session = Depends(get_db)):
     return user
 
 @router.get("/email/{email}", response_model=UserSchema)
-async def get_user_by_email(email: str, db: Session = Depends(get_db)):
+async def get_user_by_email(email: str, db: Session = Depends(get_read_db)):
     """Get a user by email"""
     user = db.query(User).filter(User.email == email).first()
     if not user:
@@ -51,6 +68,7 @@ async def update_user(user_id: int, user_update: UserUpdate, db: Session = Depen
         raise HTTPException(status_code=404, detail="User not found")
     
     update_data = user_update.dict(exclude_unset=True)
+    await _check_webhook_url(update_data.get("webhook_url"))
     for field, value in update_data.items():
         setattr(user, field, value)
     
@@ -58,6 +76,40 @@ async def update_user(user_id: int, user_update: UserUpdate, db: Session = Depen
     db.refresh(user)
     return user
 
+@router.post("/{user_id}/webhook/test", response_model=ApiResponse)
+async def test_user_webhook(
+    user_id: int,
+    x_webhook_secret: Optional[str] = Header(None),
+    x_admin_token: Optional[str] = Header(None),
+    db: Session = Depends(get_read_db)
+):
+    """Send a signed test event to the user's webhook (requires its secret in X-Webhook-Secret, or the admin token)"""
+    user = db.query(User).filter(User.id == user_id).first()
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    webhook_url, webhook_secret = user.webhook_url, user.webhook_secret
+    # Release the pooled connection before waiting on the webhook's retries
+    db.close()
+    
+    owner = webhook_secret and hmac.compare_digest(x_webhook_secret or "", webhook_secret)
+    if not owner and not is_admin(x_admin_token):
+        raise HTTPException(status_code=403, detail="Send the user's webhook secret in X-Webhook-Secret")
+    if not webhook_url:
+        raise HTTPException(status_code=400, detail="User has no webhook configured")
+    try:
+        await webhook_service.check_url(webhook_url)
+    except UnsafeWebhookURL as e:
+        raise HTTPException(status_code=400, detail=f"Invalid webhook_url: {e}")
+    
+    delivered, status = await webhook_service.post(
+        webhook_url, webhook_secret, [{"type": "ping", "user_id": user_id}]
+    )
+    return ApiResponse(
+        success=delivered,
+        message="Webhook delivered" if delivered else "Webhook delivery failed",
+        data={"status_code": status}
+    )
+
 @router.delete("/{user_id}", response_model=ApiResponse)
 async def delete_user(user_id: int, db: Session = Depends(get_db)):
     """Delete a user"""
@@ -1,24 +1,31 @@
-from pydantic import BaseModel, EmailStr, Field
-from typing import Optional, List, Dict, Any
+from pydantic import BaseModel, EmailStr, Field, model_validator
+from typing import Optional, List, Dict, Any, Literal
 from datetime import datetime
 
+WEBHOOK_URL_PATTERN = r"^https?://[^\s/]+(/\S*)?$"
+
 # User schemas
 class UserBase(BaseModel):
     email: EmailStr
     full_name: Optional[str] = None
 
 class UserCreate(UserBase):
-    pass
+    webhook_url: Optional[str] = Field(default=None, max_length=500, pattern=WEBHOOK_URL_PATTERN)
+    webhook_secret: Optional[str] = Field(default=None, min_length=16, max_length=128)
 
 class UserUpdate(BaseModel):
     full_name: Optional[str] = None
     email_notifications_enabled: Optional[bool] = None
+    webhook_url: Optional[str] = Field(default=None, max_length=500, pattern=WEBHOOK_URL_PATTERN)
+    webhook_secret: Optional[str] = Field(default=None, min_length=16, max_length=128)
 
 class User(UserBase):
     id: int
     is_active: bool
     is_verified: bool
     email_notifications_enabled: bool
+    # The webhook secret is write-only
+    webhook_url: Optional[str] = None
     created_at: datetime
     updated_at: Optional[datetime] = None
 
@@ -65,11 +72,47 @@ class CourseWithStatus(Course):
     is_full: bool
     is_available: bool
 
+class CourseSearchResult(BaseModel):
+    query: str
+    results: int
+    courses: List[CourseWithStatus]
+
 # Alert schemas
-class AlertBase(BaseModel):
-    user_id: int
-    course_id: int
+Weekday = Literal["SATURDAY", "SUNDAY", "MONDAY", "TUESDAY", "WEDNESDAY", "THURSDAY", "FRIDAY"]
+TIME_PATTERN = r"^([01][0-9]|2[0-3]):[0-5][0-9]$"
+
+def check_time_window(start_after: Optional[str], end_before: Optional[str]):
+    """A window that ends before it starts matches no section; "HH:MM" strings compare in time order"""
+    if start_after and end_before and start_after >= end_before:
+        raise ValueError("start_after must be earlier than end_before")
+
+class AlertRuleConditions(BaseModel):
+    # Fire only for sections with at least this many open seats
+    min_seats: int = Field(ge=1, le=500, default=1)
+    # Only sections whose classes and lab all fall on these days and
+    # between start_after and end_before ("HH:MM")
+    days: Optional[List[Weekday]] = None
+    start_after: Optional[str] = Field(default=None, pattern=TIME_PATTERN)
+    end_before: Optional[str] = Field(default=None, pattern=TIME_PATTERN)
+    # Only sections taught by this faculty member (initials)
+    faculty: Optional[str] = Field(default=None, max_length=50)
+
+    @model_validator(mode="after")
+    def _check_window(self):
+        check_time_window(self.start_after, self.end_before)
+        return self
+
+class AlertTarget(AlertRuleConditions):
+    # Either one section (course_id) or every section of a course code
+    course_id: Optional[int] = None
+    course_code: Optional[str] = Field(default=None, max_length=20)
     notification_interval_minutes: int = Field(ge=1, le=1440, default=30)
+    # Section ids of the student's current routine; skip notifying if the
+    # alert's section has a mid or final exam clashing with any of them
+    avoid_exam_clash_with: Optional[List[int]] = None
+
+class AlertBase(AlertTarget):
+    user_id: int
 
 class AlertCreate(AlertBase):
     pass
@@ -77,12 +120,45 @@ class AlertCreate(AlertBase):
 class AlertUpdate(BaseModel):
     notification_interval_minutes: Optional[int] = Field(ge=1, le=1440, default=None)
     is_active: Optional[bool] = None
+    avoid_exam_clash_with: Optional[List[int]] = None
+    min_seats: Optional[int] = Field(ge=1, le=500, default=None)
+    days: Optional[List[Weekday]] = None
+    start_after: Optional[str] = Field(default=None, pattern=TIME_PATTERN)
+    end_before: Optional[str] = Field(default=None, pattern=TIME_PATTERN)
+    faculty: Optional[str] = Field(default=None, max_length=50)
+
+    @model_validator(mode="after")
+    def _check_window(self):
+        check_time_window(self.start_after, self.end_before)
+        return self
+
+class AlertBulkCreate(BaseModel):
+    # The owner: an existing user, or an email to find the user by (created if new)
+    user_id: Optional[int] = None
+    email: Optional[EmailStr] = None
+    full_name: Optional[str] = None
+    alerts: List[AlertTarget] = Field(min_length=1, max_length=100)
+
+class AlertBulkUpdate(AlertUpdate):
+    alert_ids: List[int] = Field(min_length=1, max_length=500)
+    # Only change alerts of this user
+    user_id: Optional[int] = None
+
+class AlertBulkDelete(BaseModel):
+    alert_ids: List[int] = Field(min_length=1, max_length=500)
+    # Only delete alerts of this user
+    user_id: Optional[int] = None
 
 class Alert(AlertBase):
     id: int
     is_active: bool
     last_notification_sent: Optional[datetime] = None
     notification_count: int
+    state: str = "watching"
+    state_changed_at: Optional[datetime] = None
+    last_notified_seats: Optional[int] = None
+    archived_section_id: Optional[int] = None
+    archived_course_id: Optional[int] = None
     created_at: datetime
     updated_at: Optional[datetime] = None
     
@@ -91,7 +167,7 @@ class Alert(AlertBase):
 
 class AlertWithDetails(Alert):
     user: User
-    course: Course
+    course: Optional[Course] = None
     should_notify: bool
     course_has_seats: bool
 
@@ -107,4 +183,31 @@ class SeatStatusResponse(BaseModel):
     available_seats: int
     capacity: int
     last_updated: datetime
-    class_schedules: Optional[List[Dict[str, Any]]] = None
\ No newline at end of file
+    class_schedules: Optional[List[Dict[str, Any]]] = None
+
+class SectionLookupRequest(BaseModel):
+    section_ids: List[int] = Field(default_factory=list, max_length=200)
+    course_codes: List[str] = Field(default_factory=list, max_length=50)
+    semester_session_id: Optional[int] = None
+
+# Schedule schemas
+class ConflictCheckRequest(BaseModel):
+    section_ids: List[int] = Field(min_length=1, max_length=50)
+
+class RoutineRequest(BaseModel):
+    course_codes: List[str] = Field(min_length=1, max_length=10)
+    open_seats_only: bool = False
+    max_results: int = Field(ge=1, le=500, default=50)
+
+class ExamCompatibleRequest(BaseModel):
+    course_code: str
+    section_ids: List[int] = Field(max_length=50)
+
+# Admin schemas
+class ArchiveRequest(BaseModel):
+    before_semester_session_id: int
+
+class ProfilingSettings(BaseModel):
+    header_enabled: Optional[bool] = None
+    path_prefix: Optional[str] = None
+    count: int = Field(ge=0, le=100, default=1)
@@ -2,9 +2,19 @@ import httpx
 import asyncio
 import os
 from datetime import datetime, timezone
+from time import perf_counter
 from typing import List, Dict, Any, Optional
 from sqlalchemy.orm import Session
+from app.metrics import (
+    UPSTREAM_FETCH_DURATION, UPSTREAM_FETCH_BYTES, UPSTREAM_FETCH_FAILURES,
+    FEED_PARSE_DURATION, SYNC_SECTIONS, SYNC_DURATION,
+)
 from app.models.course import Course
+from app.cache import cache
+from app.services.class_slots import replace_class_slots
+from app.services.resilience import CircuitBreaker
+from app.services.semester_service import archive_superseded
+from app.services.sync_jobs import SyncCancelled, SyncJob
 import logging
 
 logger = logging.getLogger(__name__)
@@ -14,21 +24,30 @@ class BracuConnectService:
         self.base_url = os.getenv("BRACU_API_URL", "https://usis-cdn.eniamza.com/connect.json")
         self.raw_schedule_endpoint = "/raw-schedule"
         self.timeout = 30
+        self.breaker = CircuitBreaker("bracu")
     
     async def fetch_course_data(self) -> Optional[List[Dict[str, Any]]]:
         """
         Fetch course data from BRACU Connect API
-        Returns list of course dictionaries or None if error
+        Returns list of course dictionaries or None if error (or while the
+        circuit breaker is open)
         """
+        if not self.breaker.allow():
+            logger.warning("Skipping course data fetch: upstream circuit is open")
+            return None
         try:
             async with httpx.AsyncClient(timeout=self.timeout) as client:
                 url = f"{self.base_url}{self.raw_schedule_endpoint}"
                 logger.info(f"Fetching course data from: {url}")
                 
+                start = perf_counter()
                 response = await client.get(url)
+                UPSTREAM_FETCH_DURATION.labels("bracu").observe(perf_counter() - start)
                 response.raise_for_status()
+                UPSTREAM_FETCH_BYTES.labels("bracu").inc(len(response.content))
                 
-                data = response.json()
+                with FEED_PARSE_DURATION.labels("bracu").time():
+                    data = response.json()
                 
                 # Handle both new direct array format and old nested format
                 if isinstance(data, list):
@@ -39,17 +58,26 @@ class BracuConnectService:
                     courses = data["data"]
                 else:
                     logger.warning("No course data found in response")
+                    self.breaker.record_failure()
                     return None
                 
                 logger.info(f"Successfully fetched {len(courses)} courses")
+                self.breaker.record_success()
                 return courses
                 
         except httpx.HTTPError as e:
+            UPSTREAM_FETCH_FAILURES.labels("bracu").inc()
+            self.breaker.record_failure()
             logger.error(f"HTTP error fetching course data: {e}")
             return None
         except Exception as e:
+            UPSTREAM_FETCH_FAILURES.labels("bracu").inc()
+            self.breaker.record_failure()
             logger.error(f"Unexpected error fetching course data: {e}")
             return None
+        finally:
+            # A cancelled call records no outcome; free the half-open probe slot
+            self.breaker.release()
     
     def process_course_data(self, raw_course: Dict[str, Any], db: Session) -> Dict[str, Any]:
         """
@@ -65,7 +93,8 @@ class BracuConnectService:
             # Find parent course and update its schedule with lab data
             parent_course = db.query(Course).filter(
                 Course.course_code == parent_code,
-                Course.section_type != "LAB"
+                Course.section_type != "LAB",
+                Course.semester_session_id == raw_course["semesterSessionId"]
             ).first()
             
             if parent_course:
@@ -81,7 +110,8 @@ class BracuConnectService:
                     }
                 }
                 parent_course.schedule_data = parent_schedule
-                db.commit()
+                # Flushed, not committed: the whole sync commits (or rolls back) once
+                db.flush()
                 logger.info(f"Updated lab schedule for {parent_code} with lab section {raw_course['courseCode']}")
             else:
                 logger.warning(f"Could not find parent course {parent_code} for lab section {raw_course['courseCode']}")
@@ -91,7 +121,8 @@ class BracuConnectService:
         if raw_course.get("courseCode"):
             lab_course = db.query(Course).filter(
                 Course.course_code == raw_course["courseCode"] + "L",
-                Course.section_type == "LAB"
+                Course.section_type == "LAB",
+                Course.semester_session_id == raw_course["semesterSessionId"]
             ).first()
             
             if lab_course and lab_course.schedule_data:
@@ -125,18 +156,56 @@ class BracuConnectService:
             "last_fetched_at": datetime.now(timezone.utc)
         }
     
-    async def sync_courses_to_db(self, db: Session) -> Dict[str, int]:
+    async def sync_courses_to_db(self, db: Session, progress: Optional[SyncJob] = None) -> Dict[str, int]:
         """
         Sync course data from BRACU Connect to local database
         Returns dict with sync statistics
+        progress: the sync job to report phases and sections to (raises
+        SyncCancelled between sections once the job is cancelled)
         """
+        start = perf_counter()
+        if progress:
+            progress.enter_phase("fetch")
         raw_courses = await self.fetch_course_data()
         if not raw_courses:
+            if progress:
+                progress.fail("Upstream returned no sections")
             return {"added": 0, "updated": 0, "failed": 0}
+        if progress:
+            progress.set_total(len(raw_courses))
+        
+        # The upserts run in a worker thread so the API keeps answering
+        # (progress and cancel requests included) during a sync
+        stats = await asyncio.to_thread(self._store_courses, db, raw_courses, progress)
+        await cache.clear("course_stats")
         
+        for result, count in stats.items():
+            SYNC_SECTIONS.labels(result).inc(count)
+        SYNC_DURATION.observe(perf_counter() - start)
+        return stats
+    
+    def _store_courses(self, db: Session, raw_courses: List[Dict[str, Any]], progress: Optional[SyncJob]) -> Dict[str, int]:
+        """Archive superseded semesters, then upsert the feed's sections in one transaction"""
         stats = {"added": 0, "updated": 0, "failed": 0}
+        if progress:
+            progress.enter_phase("archive")
         
+        # A new semester in the feed moves the previous ones to the archive first
+        archived = archive_superseded(
+            db, {raw_course["semesterSessionId"] for raw_course in raw_courses if raw_course.get("semesterSessionId")}
+        )
+        if archived:
+            stats["archived"] = archived["sections"]
+        
+        if progress:
+            progress.enter_phase("upsert")
         for raw_course in raw_courses:
+            if progress:
+                try:
+                    progress.advance()
+                except SyncCancelled:
+                    db.rollback()
+                    raise
             try:
                 processed_data = self.process_course_data(raw_course, db)
                 
@@ -165,46 +234,20 @@ class BracuConnectService:
                 stats["failed"] += 1
         
         try:
+            if progress:
+                progress.enter_phase("slots")
+            replace_class_slots(db, raw_courses)
+            if progress:
+                progress.enter_phase("commit")
             db.commit()
             logger.info(f"Course sync completed: {stats}")
         except Exception as e:
             logger.error(f"Database commit failed: {e}")
             db.rollback()
             stats = {"added": 0, "updated": 0, "failed": len(raw_courses)}
-        
+            if progress:
+                progress.fail(f"Database commit failed: {e}")
         return stats
     
-    async def get_course_by_code(self, course_code: str, db: Session) -> Optional[Dict[str, Any]]:
-        """
-        Fetch specific course by course code
-        """
-        try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                url = f"{self.base_url}{self.raw_schedule_endpoint}"
-                response = await client.get(url)
-                response.raise_for_status()
-                
-                data = response.json()
-                
-                # Handle both new direct array format and old nested format
-                if isinstance(data, list):
-                    # New format: courses directly in array
-                    courses = data
-                elif isinstance(data, dict) and data.get("data"):
-                    # Old format: courses nested under "data" key
-                    courses = data["data"]
-                else:
-                    courses = []
-                
-                for course in courses:
-                    if course.get("courseCode", "").upper() == course_code.upper():
-                        return self.process_course_data(course, db)
-                
-                return None
-                
-        except Exception as e:
-            logger.error(f"Error fetching course {course_code}: {e}")
-            return None
-
 # Global service instance
 bracu_service = BracuConnectService()
\ No newline at end of file
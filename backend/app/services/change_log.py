@@ -0,0 +1,149 @@
+from collections import deque
+from typing import Any, Deque, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+import os
+
+# Bounds of the delta ring buffer: snapshot versions kept, and section ids across them
+REALTIME_CHANGES_MAX_VERSIONS = int(os.getenv("REALTIME_CHANGES_MAX_VERSIONS", "120"))
+REALTIME_CHANGES_MAX_SECTIONS = int(os.getenv("REALTIME_CHANGES_MAX_SECTIONS", "50000"))
+
+
+class Delta(NamedTuple):
+    """Sections that changed between two consecutive installed snapshot versions"""
+    from_version: int
+    to_version: int
+    section_ids: frozenset
+
+
+def seat_signature(raw_courses: Iterable[Dict[str, Any]]) -> Dict[int, Tuple[Any, Any]]:
+    """sectionId -> (capacity, consumedSeat): what a change is detected on"""
+    return {
+        raw_course["sectionId"]: (raw_course.get("capacity"), raw_course.get("consumedSeat"))
+        for raw_course in raw_courses
+        if raw_course and raw_course.get("sectionId") is not None
+    }
+
+
+class ChangeLog:
+    """
+    Ring buffer of the sections whose seats changed, added or removed between
+    recent snapshot versions, so a polling client can ask for what changed
+    since the version it has instead of downloading the whole feed again.
+
+    Only section ids are kept; the section data sent to the client comes from
+    the current snapshot. Entries are dropped oldest first once there are more
+    than `max_versions` of them or they hold more than `max_sections` ids.
+    A version older than the oldest entry needs a full resync.
+
+    Versions are counters local to each process, so clients poll with a
+    snapshot's cache_key (version and fetch time) instead of the bare
+    version. A key this log did not record, such as one handed out by
+    another node behind the load balancer, resolves to no version.
+    """
+
+    def __init__(
+        self,
+        max_versions: int = REALTIME_CHANGES_MAX_VERSIONS,
+        max_sections: int = REALTIME_CHANGES_MAX_SECTIONS,
+    ):
+        self.max_versions = max_versions
+        self.max_sections = max_sections
+        self._deltas: Deque[Delta] = deque()
+        self._section_count = 0
+        self._version: Optional[int] = None
+        self._signature: Dict[int, Tuple[Any, Any]] = {}
+        # version -> snapshot key, for every version a client can catch up from
+        self._keys: Dict[int, str] = {}
+
+    @property
+    def version(self) -> Optional[int]:
+        """Version of the last snapshot recorded"""
+        return self._version
+
+    @property
+    def oldest_version(self) -> Optional[int]:
+        """Oldest version a client can catch up from"""
+        return self._deltas[0].from_version if self._deltas else self._version
+
+    def version_of(self, key: str) -> Optional[int]:
+        """Version of the recorded snapshot with this key, or None if it was not recorded here"""
+        version, _, _ = key.partition("-")
+        if not version.isdigit():
+            return None
+        version = int(version)
+        return version if self._keys.get(version) == key else None
+
+    def reset(self, version: int, raw_courses: Iterable[Dict[str, Any]], key: Optional[str] = None):
+        """Start over from a baseline snapshot; older versions need a full resync"""
+        self._deltas.clear()
+        self._section_count = 0
+        self._version = version
+        self._signature = seat_signature(raw_courses)
+        self._keys = {version: key} if key else {}
+
+    def record(
+        self, version: int, raw_courses: Iterable[Dict[str, Any]], key: Optional[str] = None
+    ) -> Optional[Delta]:
+        """
+        Record the snapshot installed after the last one, under its cache
+        key. A version that does not move forward (another leader, a restart)
+        resets the log.
+        """
+        if self._version is None or version <= self._version:
+            self.reset(version, raw_courses, key)
+            return None
+
+        signature = seat_signature(raw_courses)
+        previous = self._signature
+        changed = {section_id for section_id, seats in signature.items() if previous.get(section_id) != seats}
+        changed.update(section_id for section_id in previous if section_id not in signature)
+        delta = Delta(self._version, version, frozenset(changed))
+
+        self._deltas.append(delta)
+        self._section_count += len(delta.section_ids)
+        if key:
+            self._keys[version] = key
+        while self._deltas and (
+            len(self._deltas) > self.max_versions or self._section_count > self.max_sections
+        ):
+            dropped = self._deltas.popleft()
+            self._section_count -= len(dropped.section_ids)
+            self._keys.pop(dropped.from_version, None)
+        self._version = version
+        self._signature = signature
+        return delta
+
+    def changed_since(self, since: int, until: Optional[int] = None) -> Optional[Set[int]]:
+        """
+        Ids of the sections that changed after version `since`, up to version
+        `until` (default: the last recorded), or None when the log cannot
+        tell (too old, unknown or from the future)
+        """
+        until = self._version if until is None else until
+        if self._version is None or since > until or until > self._version:
+            return None
+        if since == until:
+            return set()
+        if not self._deltas or since < self._deltas[0].from_version:
+            return None
+        changed: Set[int] = set()
+        for delta in reversed(self._deltas):
+            if delta.to_version <= since:
+                break
+            if delta.to_version <= until:
+                changed.update(delta.section_ids)
+        return changed
+
+
+def split_changes(
+    section_ids: Iterable[int], by_section_id: Dict[int, Dict[str, Any]]
+) -> Tuple[List[Dict[str, Any]], List[int]]:
+    """(raw sections still in the feed, ids of sections gone from it)"""
+    changed = []
+    removed = []
+    for section_id in sorted(section_ids):
+        raw_course = by_section_id.get(section_id)
+        if raw_course is None:
+            removed.append(section_id)
+        else:
+            changed.append(raw_course)
+    return changed, removed
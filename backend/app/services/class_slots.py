@@ -0,0 +1,84 @@
+"""
+Normalized class schedules.
+
+Course.schedule_data keeps each section's schedule as the feed sends it,
+which the database cannot filter on. Every course sync also writes one
+class_slots row per weekly meeting (theory classes from sectionSchedule,
+the attached lab from labSchedules) so day and time questions ("open
+sections meeting on Sunday after 14:00", "sections without a Saturday
+lab") are answered by an indexed query instead of parsing every row's JSON.
+"""
+from typing import Any, Dict, Iterable, List, Optional
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+from app.models.class_slot import ClassSlot, LAB, THEORY
+from app.models.course import Course
+from app.services.schedule_engine import DAY_INDEX, parse_time
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Rows per INSERT statement
+INSERT_CHUNK = 5000
+
+
+def _slots(course_id: int, kind: str, schedules: Optional[Iterable[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    slots = []
+    for schedule in schedules or []:
+        if not schedule:
+            continue
+        weekday = (schedule.get("day") or "").upper()
+        start = parse_time(schedule.get("startTime"))
+        end = parse_time(schedule.get("endTime"))
+        if weekday not in DAY_INDEX or start is None or end is None or end <= start:
+            continue
+        slots.append({
+            "course_id": course_id, "kind": kind, "weekday": weekday,
+            "start_minute": start, "end_minute": end,
+        })
+    return slots
+
+
+def section_slots(course_id: int, raw_course: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """class_slots rows of one raw (non-lab) feed section"""
+    return (
+        _slots(course_id, THEORY, (raw_course.get("sectionSchedule") or {}).get("classSchedules"))
+        + _slots(course_id, LAB, raw_course.get("labSchedules"))
+    )
+
+
+def replace_class_slots(db: Session, raw_courses: List[Dict[str, Any]]) -> int:
+    """
+    Rewrite the slots of every semester in the feed from the synced sections,
+    in the caller's transaction. Returns the number of slots written.
+    """
+    semesters = {raw_course["semesterSessionId"] for raw_course in raw_courses if raw_course.get("semesterSessionId")}
+    if not semesters:
+        return 0
+    db.flush()
+    course_ids = dict(
+        db.query(Course.section_id, Course.id).filter(Course.semester_session_id.in_(semesters))
+    )
+
+    db.query(ClassSlot).filter(
+        ClassSlot.course_id.in_(select(Course.id).where(Course.semester_session_id.in_(semesters)))
+    ).delete(synchronize_session=False)
+
+    rows = []
+    for raw_course in raw_courses:
+        if not raw_course or raw_course.get("sectionType") == "LAB":
+            continue
+        course_id = course_ids.get(raw_course.get("sectionId"))
+        if course_id is not None:
+            rows.extend(section_slots(course_id, raw_course))
+    for start in range(0, len(rows), INSERT_CHUNK):
+        db.execute(insert(ClassSlot), rows[start:start + INSERT_CHUNK])
+    logger.info(f"Wrote {len(rows)} class slots for semesters {sorted(semesters)}")
+    return len(rows)
+
+
+def delete_class_slots(db: Session, semester_session_id: int) -> int:
+    """Drop the slots of a semester's sections (before they move to the archive)"""
+    return db.query(ClassSlot).filter(
+        ClassSlot.course_id.in_(select(Course.id).where(Course.semester_session_id == semester_session_id))
+    ).delete(synchronize_session=False)
@@ -0,0 +1,321 @@
+"""
+Coordination between API worker processes.
+
+One worker is elected leader, either through an exclusive file lock (one
+host) or a PostgreSQL advisory lock (any number of hosts). The leader alone
+downloads the upstream feed, runs the scheduled course sync and sends alert
+notifications. It publishes each snapshot to a memory-mapped file, and the
+other workers read snapshots from that file instead of calling upstream.
+
+The same file persists the latest snapshot across restarts: every worker
+loads it at startup (warm_start) and serves it until a fresher one arrives.
+Without coordination, each process writes the file itself.
+
+Followers keep retrying the election, so when the leader exits (and its
+lock is released by the OS or the database) another worker takes over.
+"""
+import asyncio
+import hashlib
+import os
+import tempfile
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Optional
+from app.database import DATABASE_URL, IS_SQLITE, SessionLocal, engine
+from app.metrics import SNAPSHOT_FILE_DURATION
+from app.services.snapshot import CourseSnapshot, SnapshotFile
+import logging
+
+logger = logging.getLogger(__name__)
+
+COORDINATION_ENABLED = os.getenv("COORDINATION_ENABLED", "true").lower() == "true"
+# auto: advisory lock on PostgreSQL, file lock otherwise
+LEADER_ELECTION = os.getenv("LEADER_ELECTION", "auto")
+LEADER_RETRY_SECONDS = float(os.getenv("LEADER_RETRY_SECONDS", "10"))
+BACKGROUND_JOBS_ENABLED = os.getenv("BACKGROUND_JOBS_ENABLED", "false").lower() == "true"
+SYNC_INTERVAL_MINUTES = float(os.getenv("SYNC_INTERVAL_MINUTES", "15"))
+NOTIFICATION_INTERVAL_MINUTES = float(os.getenv("NOTIFICATION_INTERVAL_MINUTES", "30"))
+
+# Same directory for every worker of one deployment, distinct per database
+COORDINATION_DIR = os.getenv(
+    "COORDINATION_DIR",
+    os.path.join(tempfile.gettempdir(), "seatz-" + hashlib.sha1(DATABASE_URL.encode()).hexdigest()[:12]),
+)
+# Latest snapshot on disk; point it at persistent storage to survive redeploys
+SNAPSHOT_PATH = os.getenv("SNAPSHOT_PATH", os.path.join(COORDINATION_DIR, "snapshot.bin"))
+SNAPSHOT_PERSIST_ENABLED = os.getenv("SNAPSHOT_PERSIST_ENABLED", "true").lower() == "true"
+
+# Keys for PostgreSQL advisory locks, shared by every worker of the deployment
+ADVISORY_LOCK_KEY = 0x5EA72001
+STARTUP_LOCK_KEY = 0x5EA72002
+
+
+@contextmanager
+def startup_lock():
+    """
+    Serialize schema setup across workers starting at the same time, so only
+    one runs the migrations and the rest find the schema already at head.
+    """
+    if not IS_SQLITE:
+        from sqlalchemy import text
+
+        with engine.connect() as connection:
+            connection.execute(text("SELECT pg_advisory_lock(:key)"), {"key": STARTUP_LOCK_KEY})
+            connection.commit()
+            try:
+                yield
+            finally:
+                connection.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": STARTUP_LOCK_KEY})
+                connection.commit()
+        return
+
+    import fcntl
+
+    os.makedirs(COORDINATION_DIR, exist_ok=True)
+    with open(os.path.join(COORDINATION_DIR, "startup.lock"), "w") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+class FileLeaderLock:
+    """Leadership held as an exclusive flock on a file; released when the process exits"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._fd: Optional[int] = None
+
+    def try_acquire(self) -> bool:
+        import fcntl
+
+        if self._fd is not None:
+            return True
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            return False
+        os.ftruncate(fd, 0)
+        os.write(fd, str(os.getpid()).encode())
+        self._fd = fd
+        return True
+
+    def still_held(self) -> bool:
+        return self._fd is not None
+
+    def release(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+
+class PostgresLeaderLock:
+    """Leadership held as a session-level advisory lock on a dedicated connection"""
+
+    def __init__(self, db_engine, key: int = ADVISORY_LOCK_KEY):
+        self.engine = db_engine
+        self.key = key
+        self._connection = None
+
+    def try_acquire(self) -> bool:
+        from sqlalchemy import text
+
+        if self._connection is not None:
+            return True
+        connection = self.engine.connect()
+        try:
+            acquired = connection.execute(text("SELECT pg_try_advisory_lock(:key)"), {"key": self.key}).scalar()
+            connection.commit()
+        except Exception:
+            connection.close()
+            raise
+        if not acquired:
+            connection.close()
+            return False
+        self._connection = connection
+        return True
+
+    def still_held(self) -> bool:
+        from sqlalchemy import text
+
+        if self._connection is None:
+            return False
+        try:
+            self._connection.execute(text("SELECT 1"))
+            self._connection.commit()
+            return True
+        except Exception as e:
+            # The lock died with the connection
+            logger.warning(f"Lost leader connection: {e}")
+            self.release()
+            return False
+
+    def release(self):
+        if self._connection is not None:
+            try:
+                self._connection.close()
+            except Exception:
+                pass
+            self._connection = None
+
+
+class Coordinator:
+    """Runs the leader election loop and, while leader, the background jobs"""
+
+    def __init__(self):
+        self.enabled = COORDINATION_ENABLED
+        self.is_leader = False
+        self.lock = None
+        self.snapshot_file: Optional[SnapshotFile] = None
+        self._election_task: Optional[asyncio.Task] = None
+        self._job_tasks = []
+
+    def _create_lock(self):
+        method = LEADER_ELECTION
+        if method == "auto":
+            method = "file" if IS_SQLITE else "postgres"
+        if method == "postgres":
+            return PostgresLeaderLock(engine)
+        return FileLeaderLock(os.path.join(COORDINATION_DIR, "leader.lock"))
+
+    @property
+    def follower(self) -> bool:
+        """True while another worker is (or may become) the leader"""
+        return self.enabled and not self.is_leader
+
+    async def start(self):
+        from app.services.realtime_service import realtime_service
+
+        if self.enabled or SNAPSHOT_PERSIST_ENABLED:
+            self.snapshot_file = SnapshotFile(SNAPSHOT_PATH)
+            realtime_service.coordinator = self
+        # Before the election, so a new leader's first fetch is versioned
+        # above the persisted snapshot rather than racing it
+        await realtime_service.warm_start()
+        if not self.enabled:
+            return
+        os.makedirs(COORDINATION_DIR, exist_ok=True)
+        self.lock = self._create_lock()
+        self._election_task = asyncio.create_task(self._election_loop())
+
+    async def stop(self):
+        if self._election_task:
+            self._election_task.cancel()
+            await asyncio.gather(self._election_task, return_exceptions=True)
+            self._election_task = None
+        await self._stop_jobs()
+        if self.lock:
+            await asyncio.to_thread(self.lock.release)
+        if self.snapshot_file:
+            self.snapshot_file.close()
+        self.is_leader = False
+
+    async def _election_loop(self):
+        while True:
+            try:
+                if self.is_leader:
+                    if not await asyncio.to_thread(self.lock.still_held):
+                        logger.warning(f"Worker {os.getpid()} lost leadership")
+                        self.is_leader = False
+                        await self._stop_jobs()
+                elif await asyncio.to_thread(self.lock.try_acquire):
+                    logger.info(f"Worker {os.getpid()} is now the leader")
+                    self.is_leader = True
+                    self._start_jobs()
+            except Exception as e:
+                logger.error(f"Leader election failed: {e}")
+            await asyncio.sleep(LEADER_RETRY_SECONDS)
+
+    def _start_jobs(self):
+        from app.services.realtime_service import realtime_service
+
+        if realtime_service.snapshot_ttl_seconds > 0:
+            self._job_tasks.append(asyncio.create_task(
+                self._every(realtime_service.snapshot_ttl_seconds, "snapshot refresh", realtime_service.refresh_snapshot)
+            ))
+        if BACKGROUND_JOBS_ENABLED:
+            self._job_tasks.append(asyncio.create_task(
+                self._every(SYNC_INTERVAL_MINUTES * 60, "course sync", self._sync_courses)
+            ))
+            self._job_tasks.append(asyncio.create_task(
+                self._every(NOTIFICATION_INTERVAL_MINUTES * 60, "alert notifications", self._send_notifications)
+            ))
+
+    async def _stop_jobs(self):
+        for task in self._job_tasks:
+            task.cancel()
+        await asyncio.gather(*self._job_tasks, return_exceptions=True)
+        self._job_tasks = []
+
+    async def _every(self, seconds: float, name: str, job):
+        while True:
+            try:
+                await job()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Background job {name} failed: {e}")
+            await asyncio.sleep(seconds)
+
+    async def _sync_courses(self):
+        from app.services.sync_jobs import sync_jobs
+
+        # Joins a manual sync already running instead of starting another one
+        await sync_jobs.run("scheduled")
+
+    async def _send_notifications(self):
+        from app.services.notification_service import notify_due_alerts
+
+        db = SessionLocal()
+        try:
+            queued, results = await notify_due_alerts(db)
+            if queued:
+                logger.info(f"Scheduled notifications: {queued} queued, {results}")
+        finally:
+            db.close()
+
+    async def publish_snapshot(self, snapshot: CourseSnapshot):
+        """Write a freshly fetched snapshot for followers and the next restart"""
+        if self.follower or not self.snapshot_file:
+            return
+        try:
+            with SNAPSHOT_FILE_DURATION.labels("write").time():
+                await asyncio.to_thread(self.snapshot_file.write, snapshot)
+        except OSError as e:
+            logger.error(f"Could not write snapshot file {SNAPSHOT_PATH}: {e}")
+
+    def load_persisted_snapshot(self) -> Optional[CourseSnapshot]:
+        """The last snapshot written to disk, however old (for a warm start)"""
+        if not self.snapshot_file:
+            return None
+        try:
+            with SNAPSHOT_FILE_DURATION.labels("load").time():
+                return self.snapshot_file.read()
+        except (OSError, ValueError, EOFError, TypeError) as e:
+            logger.warning(f"Ignoring unreadable snapshot file {SNAPSHOT_PATH}: {e}")
+            return None
+
+    def read_shared_snapshot(self, newer_than: int, max_age_seconds: float):
+        """
+        For followers: (snapshot or None, leader_alive). The snapshot is
+        returned when the leader published a newer one; leader_alive tells
+        whether the published data is recent enough to keep relying on it.
+        Reads the file, so call it from a thread.
+        """
+        if not self.follower or not self.snapshot_file:
+            return None, False
+        header = self.snapshot_file.header()
+        if header is None:
+            return None, False
+        version, fetched_at = header
+        alive = (datetime.now(timezone.utc) - fetched_at).total_seconds() < max_age_seconds
+        if not alive or version <= newer_than:
+            return None, alive
+        return self.snapshot_file.read(newer_than), True
+
+
+# Global coordinator instance
+coordinator = Coordinator()
@@ -7,6 +7,7 @@ import os
 import logging
 from datetime import datetime
 from jinja2 import Template
+from app.metrics import NOTIFICATION_QUEUE_DEPTH, SMTP_SEND_DURATION, SMTP_SEND_FAILURES
 
 logger = logging.getLogger(__name__)
 
@@ -147,6 +148,7 @@ class EmailService:
         """
         try:
             if not all([self.smtp_username, self.smtp_password]):
+                SMTP_SEND_FAILURES.labels("not_configured").inc()
                 logger.error("SMTP credentials not configured")
                 return False
             
@@ -163,15 +165,17 @@ class EmailService:
             msg.attach(html_part)
             
             # Send email
-            with smtplib.SMTP(self.smtp_server, self.smtp_port) as server:
-                server.starttls()
-                server.login(self.smtp_username, self.smtp_password)
-                server.send_message(msg)
+            with SMTP_SEND_DURATION.time():
+                with smtplib.SMTP(self.smtp_server, self.smtp_port) as server:
+                    server.starttls()
+                    server.login(self.smtp_username, self.smtp_password)
+                    server.send_message(msg)
             
             logger.info(f"Email sent successfully to {to_email}")
             return True
             
         except Exception as e:
+            SMTP_SEND_FAILURES.labels("error").inc()
             logger.error(f"Failed to send email to {to_email}: {e}")
             return False
     
@@ -188,12 +192,14 @@ class EmailService:
             text_content=email_content["text"]
         )
     
-    async def send_batch_alerts(self, alerts: List[Dict[str, Any]]) -> Dict[str, int]:
+    async def send_batch_alerts(self, alerts: List[Dict[str, Any]]) -> Dict[str, Any]:
         """
         Send batch seat availability alerts
-        Returns dict with success/failure counts
+        Returns dict with success/failure counts and, under "delivered", the
+        positions in `alerts` of the emails that were sent
         """
-        results = {"sent": 0, "failed": 0}
+        results = {"sent": 0, "failed": 0, "delivered": []}
+        NOTIFICATION_QUEUE_DEPTH.inc(len(alerts))
         
         # Process alerts in batches to avoid rate limiting
         batch_size = 10
@@ -210,17 +216,19 @@ class EmailService:
             
             # Execute batch
             batch_results = await asyncio.gather(*tasks, return_exceptions=True)
+            NOTIFICATION_QUEUE_DEPTH.dec(len(batch))
             
-            for result in batch_results:
+            for position, result in enumerate(batch_results, start=i):
                 if result is True:
                     results["sent"] += 1
+                    results["delivered"].append(position)
                 else:
                     results["failed"] += 1
             
             # Small delay between batches
             await asyncio.sleep(1)
         
-        logger.info(f"Batch alerts completed: {results}")
+        logger.info(f"Batch alerts completed: {results['sent']} sent, {results['failed']} failed")
         return results
 
 # Global service instance
@@ -0,0 +1,131 @@
+from bisect import bisect_left
+from datetime import date
+from typing import List, Dict, Any, Optional, Iterable, Tuple, Set
+from app.services.schedule_engine import parse_time
+import logging
+
+logger = logging.getLogger(__name__)
+
+EXAM_KINDS = ("mid", "final")
+
+# Used when the feed has a start time but no end time for an exam
+DEFAULT_EXAM_MINUTES = 120
+
+
+def _absolute_minutes(exam_date: Optional[str], time_value: Optional[str]) -> Optional[int]:
+    minutes = parse_time(time_value)
+    if not exam_date or minutes is None:
+        return None
+    try:
+        return date.fromisoformat(exam_date).toordinal() * 1440 + minutes
+    except ValueError:
+        return None
+
+
+def exam_slots(schedule: Optional[Dict[str, Any]]) -> List[Tuple[str, int, int]]:
+    """(kind, start, end) for the mid and final exam of a raw sectionSchedule"""
+    slots = []
+    if not schedule:
+        return slots
+    for kind in EXAM_KINDS:
+        exam_date = schedule.get(f"{kind}ExamDate")
+        start = _absolute_minutes(exam_date, schedule.get(f"{kind}ExamStartTime"))
+        if start is None:
+            continue
+        end = _absolute_minutes(exam_date, schedule.get(f"{kind}ExamEndTime"))
+        if end is None or end <= start:
+            end = start + DEFAULT_EXAM_MINUTES
+        slots.append((kind, start, end))
+    return slots
+
+
+class ExamIndex:
+    """
+    Interval index over the mid and final exam slots of every section.
+    Slots are kept in one array sorted by start; since no exam is longer
+    than `max_duration`, every slot overlapping [a, b) starts inside
+    [a - max_duration, b) and is found with a single bisect.
+    """
+
+    def __init__(self, entries: Iterable[Tuple[int, str, Optional[Dict[str, Any]]]]):
+        self.slots: Dict[int, List[Tuple[str, int, int]]] = {}
+        self.by_course: Dict[str, List[int]] = {}
+        intervals = []
+        for section_id, course_code, schedule in entries:
+            slots = exam_slots(schedule)
+            self.slots[section_id] = slots
+            self.by_course.setdefault((course_code or "").upper(), []).append(section_id)
+            for kind, start, end in slots:
+                intervals.append((start, end, section_id, kind))
+
+        intervals.sort()
+        self._starts = [interval[0] for interval in intervals]
+        self._intervals = intervals
+        self.max_duration = max((end - start for start, end, _, _ in intervals), default=0)
+
+    @classmethod
+    def from_raw_courses(cls, raw_courses: Iterable[Dict[str, Any]]) -> "ExamIndex":
+        return cls(
+            (raw_course["sectionId"], raw_course.get("courseCode"), raw_course.get("sectionSchedule"))
+            for raw_course in raw_courses
+            if raw_course and raw_course.get("sectionType") != "LAB" and raw_course.get("sectionId") is not None
+        )
+
+    @classmethod
+    def from_courses(cls, courses) -> "ExamIndex":
+        """Build from Course rows, whose schedule_data holds the raw sectionSchedule"""
+        return cls((course.section_id, course.course_code, course.schedule_data) for course in courses)
+
+    def overlapping(self, start: int, end: int) -> List[Tuple[int, str]]:
+        """(section_id, kind) of every exam slot overlapping [start, end)"""
+        first = bisect_left(self._starts, start - self.max_duration)
+        last = bisect_left(self._starts, end)
+        return [
+            (section_id, kind)
+            for slot_start, slot_end, section_id, kind in self._intervals[first:last]
+            if slot_end > start
+        ]
+
+    def clashes(self, section_ids: Iterable[int]) -> List[Tuple[int, int, str]]:
+        """Pairs of the given sections whose mid or final exams overlap, as (a, b, kind of b)"""
+        intervals = sorted(
+            (start, end, section_id, kind)
+            for section_id in dict.fromkeys(section_ids)
+            for kind, start, end in self.slots.get(section_id, ())
+        )
+        pairs = []
+        active: List[Tuple[int, int]] = []
+        for start, end, section_id, kind in intervals:
+            active = [(active_end, active_id) for active_end, active_id in active if active_end > start]
+            for _, active_id in active:
+                if active_id != section_id:
+                    pairs.append((active_id, section_id, kind))
+            active.append((end, section_id))
+        return pairs
+
+    def clashing_sections(self, section_ids: Iterable[int]) -> Set[int]:
+        """Every indexed section whose exams overlap an exam of the given sections"""
+        own = set(section_ids)
+        clashing = set()
+        for section_id in own:
+            for _, start, end in self.slots.get(section_id, ()):
+                clashing.update(other for other, _ in self.overlapping(start, end))
+        return clashing - own
+
+    def has_clash(self, section_id: int, other_section_ids: Iterable[int]) -> bool:
+        others = set(other_section_ids)
+        others.discard(section_id)
+        return any(
+            other in others
+            for _, start, end in self.slots.get(section_id, ())
+            for other, _ in self.overlapping(start, end)
+        )
+
+    def compatible_sections(self, course_code: str, section_ids: Iterable[int]) -> List[int]:
+        """Sections of `course_code` whose exams avoid every exam of the given sections"""
+        clashing = self.clashing_sections(section_ids)
+        return [
+            section_id
+            for section_id in self.by_course.get(course_code.upper(), [])
+            if section_id not in clashing
+        ]
@@ -0,0 +1,322 @@
+from datetime import datetime, timedelta, timezone
+from time import perf_counter
+from typing import Dict, Any, List, NamedTuple, Optional, Tuple
+from sqlalchemy import func, or_, true
+from sqlalchemy.orm import Session
+from app.metrics import ALERT_EVALUATION_DURATION, ALERTS_EVALUATED, ALERT_TRANSITIONS, NOTIFICATIONS_SUPPRESSED
+from app.models.alert import Alert, ARMED_STATES, COOLING_DOWN, FIRED, REARMED, TRACKED_STATES, WATCHING
+from app.models.course import Course
+from app.models.user import User
+from app.services.email_service import email_service
+from app.services.exam_index import ExamIndex
+from app.services.realtime_service import realtime_service
+from app.services.rule_engine import CompiledRules, Rule, SectionTable
+from app.services.semester_service import active_semester_id
+from app.services.snapshot import CourseSnapshot
+from app.services.webhook_service import seat_event, webhook_service
+import asyncio
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+# Hysteresis: an opening must stay closed this long before the alert rearms
+ALERT_REARM_AFTER_MINUTES = float(os.getenv("ALERT_REARM_AFTER_MINUTES", "60"))
+# A fired alert notifies again if its opening grows by this many seats (0 = never)
+ALERT_RENOTIFY_SEAT_DELTA = int(os.getenv("ALERT_RENOTIFY_SEAT_DELTA", "5"))
+
+# Alerts updated per UPDATE statement
+UPDATE_CHUNK = 500
+# Alert rows fetched per round trip while loading rules
+LOAD_CHUNK = 1000
+
+
+async def _section_data(db: Session) -> Tuple[SectionTable, Optional[CourseSnapshot]]:
+    """Seat data to evaluate against: the live feed snapshot, else the last synced courses"""
+    snapshot = await realtime_service.get_snapshot()
+    if snapshot and snapshot.raw_courses:
+        return snapshot.section_table, snapshot
+    logger.warning("No feed snapshot available, evaluating alerts against synced courses")
+    return SectionTable.from_courses(
+        db.query(Course).filter(Course.semester_session_id == active_semester_id(db)).all()
+    ), None
+
+
+def advance(
+    state: str,
+    open_seats: Optional[int],
+    last_notified_seats: Optional[int],
+    state_changed_at: Optional[datetime],
+    interval_elapsed: bool,
+    now: datetime,
+) -> Tuple[str, bool]:
+    """
+    One step of an alert's state machine. `open_seats` is the best open-seat
+    count among the sections the rule fires on, or None when it does not
+    fire. Returns (next state, whether to notify).
+
+    watching/rearmed --fires--> fired (notify)
+    fired --stops firing--> cooling_down
+    cooling_down --fires again--> fired (same opening, no notification)
+    cooling_down --closed for ALERT_REARM_AFTER_MINUTES--> rearmed
+    fired or cooling_down notify again only when the opening grew by
+    ALERT_RENOTIFY_SEAT_DELTA seats since the last notification.
+    """
+    firing = open_seats is not None
+    if state in ARMED_STATES:
+        if firing and interval_elapsed:
+            return FIRED, True
+        return state, False
+
+    if state == COOLING_DOWN and not firing:
+        closed_for = now - (state_changed_at or now)
+        if closed_for >= timedelta(minutes=ALERT_REARM_AFTER_MINUTES):
+            return REARMED, False
+        return COOLING_DOWN, False
+
+    if not firing:
+        return COOLING_DOWN, False
+    grew = (
+        ALERT_RENOTIFY_SEAT_DELTA > 0
+        and open_seats >= (last_notified_seats or 0) + ALERT_RENOTIFY_SEAT_DELTA
+    )
+    return FIRED, grew and interval_elapsed
+
+
+class AlertTracking(NamedTuple):
+    """Notification state and delivery settings of one active alert"""
+    state: str
+    state_changed_at: Optional[datetime]
+    last_notified_seats: Optional[int]
+    interval_minutes: Optional[int]
+    last_sent: Optional[datetime]
+    avoid_exam_clash_with: Optional[List[int]]
+    email: Optional[str]
+    webhook_url: Optional[str]
+    webhook_secret: Optional[str]
+
+
+def _interval_elapsed(db: Session, now: datetime):
+    """SQL condition: the alert's notification interval has passed since its last notification"""
+    minutes = func.coalesce(Alert.notification_interval_minutes, 0)
+    if db.get_bind().dialect.name == "sqlite":
+        # SQLite keeps datetimes as UTC text; julianday() differences are in days
+        now_text = now.astimezone(timezone.utc).strftime("%Y-%m-%d %H:%M:%S.%f")
+        elapsed = (func.julianday(now_text) - func.julianday(Alert.last_notification_sent)) * 1440
+        return or_(Alert.last_notification_sent.is_(None), elapsed >= minutes)
+    return or_(
+        Alert.last_notification_sent.is_(None),
+        Alert.last_notification_sent + func.make_interval(0, 0, 0, 0, 0, minutes) <= now,
+    )
+
+
+def _load_rules(
+    db: Session, table: SectionTable, now: datetime
+) -> Tuple[List[Rule], Dict[int, AlertTracking]]:
+    """
+    Rules of the active alerts the state machine can move, plus per-alert
+    notification state: every fired or cooling-down alert, and the armed
+    alerts whose interval has elapsed and whose course code has an open
+    section. Any other armed alert would stay as it is, so it is not loaded.
+    """
+    seats = table.available_seats
+    open_codes = [
+        code for code, positions in table.by_code.items()
+        if code and any(seats[position] > 0 for position in positions)
+    ]
+
+    # true() renders a literal, so the planner can match the partial alert indexes
+    query = db.query(
+        Alert.id, Alert.user_id, Course.section_id, Alert.course_code, Alert.min_seats,
+        Alert.days, Alert.start_after, Alert.end_before, Alert.faculty,
+        Alert.state, Alert.state_changed_at, Alert.last_notified_seats,
+        Alert.notification_interval_minutes, Alert.last_notification_sent,
+        Alert.avoid_exam_clash_with, User.email, User.email_notifications_enabled,
+        User.webhook_url, User.webhook_secret,
+    ).join(User, Alert.user_id == User.id).filter(Alert.is_active == true())
+    candidates = [
+        query.outerjoin(Course, Alert.course_id == Course.id).filter(Alert.state.in_(TRACKED_STATES))
+    ]
+    if open_codes:
+        armed_due = (Alert.state.in_(ARMED_STATES), _interval_elapsed(db, now))
+        # Section alerts through their section's code, course code alerts directly
+        candidates.append(
+            query.join(Course, Alert.course_id == Course.id).filter(
+                Course.course_code.in_(open_codes), *armed_due
+            )
+        )
+        candidates.append(
+            query.outerjoin(Course, Alert.course_id == Course.id).filter(
+                Alert.course_id.is_(None), Alert.course_code.in_(open_codes), *armed_due
+            )
+        )
+
+    rules = []
+    states = {}
+    for (alert_id, user_id, section_id, course_code, min_seats, days, start_after, end_before, faculty,
+         state, state_changed_at, last_notified_seats, interval_minutes, last_sent,
+         avoid_exam_clash_with, email, email_enabled, webhook_url, webhook_secret
+         ) in candidates[0].union_all(*candidates[1:]).yield_per(LOAD_CHUNK):
+        rules.append(Rule(
+            alert_id, user_id, section_id, course_code, min_seats, days, start_after, end_before, faculty
+        ))
+        states[alert_id] = AlertTracking(
+            state or WATCHING, _aware(state_changed_at), last_notified_seats,
+            interval_minutes, _aware(last_sent), avoid_exam_clash_with,
+            email if email_enabled is not False else None, webhook_url, webhook_secret,
+        )
+    ALERTS_EVALUATED.inc(len(states))
+    return rules, states
+
+
+def _aware(value: Optional[datetime]) -> Optional[datetime]:
+    # SQLite returns naive datetimes for timezone-aware columns
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def _update_alerts(db: Session, alert_ids: List[int], values: Dict[Any, Any]):
+    for start in range(0, len(alert_ids), UPDATE_CHUNK):
+        db.query(Alert).filter(Alert.id.in_(alert_ids[start:start + UPDATE_CHUNK])).update(
+            values, synchronize_session=False,
+        )
+
+
+async def notify_due_alerts(db: Session) -> Tuple[int, Dict[str, Any]]:
+    """
+    Evaluate every active alert rule, advance each alert's state machine and
+    notify the alerts that fired for a new opening, by email and/or webhook.
+    An alert none of whose deliveries went through keeps its state and is
+    notified again on the next run. Returns (notifications queued, send results).
+    """
+    now = datetime.now(timezone.utc)
+    table, snapshot = await _section_data(db)
+    rules, states = _load_rules(db, table, now)
+
+    evaluation_start = perf_counter()
+    compiled = CompiledRules(table, rules)
+    fired = [(hit, rule) for hit, group in compiled.evaluate() for rule in group]
+
+    # Exam slots of every section an alert must not clash with, plus the fired sections
+    exam_filtered = [(hit, rule) for hit, rule in fired if states[rule.alert_id].avoid_exam_clash_with]
+    exam_index = None
+    if exam_filtered and snapshot:
+        exam_index = snapshot.exam_index
+    elif exam_filtered:
+        section_ids = {
+            section_id for _, rule in exam_filtered for section_id in states[rule.alert_id].avoid_exam_clash_with
+        }
+        section_ids.update(table.section_ids[position] for hit, _ in exam_filtered for position in hit)
+        exam_index = ExamIndex.from_courses(
+            db.query(Course).filter(Course.section_id.in_(section_ids)).all()
+        )
+
+    # Best section each alert fires on, after the exam clash filter
+    firing: Dict[int, int] = {}
+    for hit, rule in fired:
+        avoid_exam_clash_with = states[rule.alert_id].avoid_exam_clash_with
+        if avoid_exam_clash_with:
+            hit = [
+                position for position in hit
+                if not exam_index.has_clash(table.section_ids[position], avoid_exam_clash_with)
+            ]
+            if not hit:
+                continue
+        firing[rule.alert_id] = compiled.best_section(hit)
+
+    notifications_to_send = []
+    webhook_deliveries = []
+    # new state -> alert ids, for transitions without a notification
+    transitions: Dict[str, List[int]] = {}
+    # alert id -> (state, open seats) of the alerts to notify
+    pending: Dict[int, Tuple[str, int]] = {}
+    seats = table.available_seats
+
+    for alert_id, tracking in states.items():
+        state = tracking.state
+        position = firing.get(alert_id)
+        open_seats = seats[position] if position is not None else None
+        last_sent = tracking.last_sent
+        interval_elapsed = (
+            last_sent is None or now - last_sent >= timedelta(minutes=tracking.interval_minutes or 0)
+        )
+        next_state, notify = advance(
+            state, open_seats, tracking.last_notified_seats, tracking.state_changed_at, interval_elapsed, now
+        )
+
+        if notify:
+            pending[alert_id] = (state, open_seats)
+            course_data = {
+                **table.details[position],
+                "section_id": table.section_ids[position],
+                "available_seats": open_seats,
+            }
+            if tracking.email:
+                notifications_to_send.append({
+                    "alert_id": alert_id, "user_email": tracking.email, "course_data": course_data,
+                })
+            if tracking.webhook_url:
+                webhook_deliveries.append({
+                    "alert_id": alert_id,
+                    "url": tracking.webhook_url,
+                    "secret": tracking.webhook_secret,
+                    "event": seat_event(alert_id, course_data),
+                })
+        else:
+            if open_seats is not None and next_state == FIRED:
+                NOTIFICATIONS_SUPPRESSED.inc()
+            if next_state != state:
+                ALERT_TRANSITIONS.labels(state, next_state).inc()
+                transitions.setdefault(next_state, []).append(alert_id)
+
+    ALERT_EVALUATION_DURATION.observe(perf_counter() - evaluation_start)
+
+    for next_state, alert_ids in transitions.items():
+        _update_alerts(db, alert_ids, {Alert.state: next_state, Alert.state_changed_at: now})
+    # Commit before sending so the writer connection is not held while
+    # awaiting SMTP (SQLite runs a single writer connection)
+    if transitions:
+        db.commit()
+
+    if not pending:
+        return 0, {"sent": 0, "failed": 0}
+
+    # Emails and webhooks go out concurrently; a slow SMTP server does not delay webhooks
+    results, webhook_results = await asyncio.gather(
+        email_service.send_batch_alerts(notifications_to_send),
+        webhook_service.deliver(webhook_deliveries),
+    )
+
+    # An alert moves to fired once one of its channels delivered it. One whose
+    # deliveries all failed keeps its state, so the next run notifies it again
+    delivered = {notifications_to_send[position]["alert_id"] for position in results.pop("delivered")}
+    delivered.update(webhook_deliveries[position]["alert_id"] for position in webhook_results.pop("delivered"))
+    with_channel = {notification["alert_id"] for notification in notifications_to_send}
+    with_channel.update(delivery["alert_id"] for delivery in webhook_deliveries)
+    delivered.update(alert_id for alert_id in pending if alert_id not in with_channel)
+
+    # (state changed, open seats) -> alert ids notified
+    notified: Dict[Tuple[bool, int], List[int]] = {}
+    for alert_id in delivered:
+        state, open_seats = pending[alert_id]
+        if state != FIRED:
+            ALERT_TRANSITIONS.labels(state, FIRED).inc()
+        notified.setdefault((state != FIRED, open_seats), []).append(alert_id)
+    for (state_changed, open_seats), alert_ids in notified.items():
+        values = {
+            Alert.state: FIRED,
+            Alert.last_notified_seats: open_seats,
+            Alert.last_notification_sent: now,
+            Alert.notification_count: Alert.notification_count + 1,
+        }
+        if state_changed:
+            values[Alert.state_changed_at] = now
+        _update_alerts(db, alert_ids, values)
+    if notified:
+        db.commit()
+
+    undelivered = len(pending) - len(delivered)
+    if undelivered:
+        logger.warning(f"{undelivered} alert notifications were not delivered and will be retried")
+    return len(pending), {**results, "webhooks": webhook_results, "undelivered": undelivered}
@@ -0,0 +1,180 @@
+from bisect import bisect_left
+from typing import List, Dict, Any, Optional, Iterable, Tuple
+from app.services.schedule_engine import WEEKDAYS, DAY_INDEX, parse_time
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Days with scheduled teaching; utilization is measured over these by default
+TEACHING_DAYS = [day for day in WEEKDAYS if day != "FRIDAY"]
+
+# Faculty placeholders in the feed that do not identify a person
+UNASSIGNED_FACULTY = {"", "TBA"}
+
+
+def split_faculties(value: Optional[str]) -> List[str]:
+    return [
+        initials
+        for initials in (part.strip().upper() for part in (value or "").split(","))
+        if initials not in UNASSIGNED_FACULTY
+    ]
+
+
+def format_minutes(minutes: int) -> str:
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+class Booking:
+    """One weekly meeting of a section in a room"""
+
+    __slots__ = ("section_id", "course_code", "section_name", "kind", "room", "faculties", "day", "start", "end")
+
+    def __init__(self, section_id, course_code, section_name, kind, room, faculties, day, start, end):
+        self.section_id = section_id
+        self.course_code = course_code
+        self.section_name = section_name
+        self.kind = kind
+        self.room = room
+        self.faculties = faculties
+        self.day = day
+        self.start = start
+        self.end = end
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "section_id": self.section_id,
+            "course_code": self.course_code,
+            "section_name": self.section_name,
+            "kind": self.kind,
+            "room": self.room,
+            "faculties": self.faculties,
+            "day": self.day,
+            "start_time": format_minutes(self.start),
+            "end_time": format_minutes(self.end),
+        }
+
+
+class _DayIntervals:
+    """Bookings of one room on one weekday, sorted by start for bisect lookups"""
+
+    __slots__ = ("bookings", "starts", "max_duration")
+
+    def __init__(self, bookings: List[Booking]):
+        self.bookings = sorted(bookings, key=lambda booking: (booking.start, booking.end))
+        self.starts = [booking.start for booking in self.bookings]
+        self.max_duration = max((booking.end - booking.start for booking in self.bookings), default=0)
+
+    def overlapping(self, start: int, end: int) -> List[Booking]:
+        first = bisect_left(self.starts, start - self.max_duration)
+        last = bisect_left(self.starts, end)
+        return [booking for booking in self.bookings[first:last] if booking.end > start]
+
+    def occupied_minutes(self, start: int, end: int) -> int:
+        """Minutes of [start, end) covered by at least one booking"""
+        total = 0
+        covered_until = start
+        for booking in self.overlapping(start, end):
+            booking_start = max(booking.start, covered_until)
+            booking_end = min(booking.end, end)
+            if booking_end > booking_start:
+                total += booking_end - booking_start
+                covered_until = booking_end
+        return total
+
+
+class OccupancyIndex:
+    """
+    Per-snapshot occupancy keyed by room and by faculty.
+    Each (room, weekday) keeps its bookings sorted by start time, so
+    "is this room free" is a bisect instead of a scan of every section.
+    """
+
+    def __init__(self, bookings: Iterable[Booking]):
+        by_room: Dict[str, Dict[str, List[Booking]]] = {}
+        self.by_faculty: Dict[str, List[Booking]] = {}
+        for booking in bookings:
+            if booking.room:
+                by_room.setdefault(booking.room, {}).setdefault(booking.day, []).append(booking)
+            for initials in booking.faculties:
+                self.by_faculty.setdefault(initials, []).append(booking)
+
+        self.rooms: Dict[str, Dict[str, _DayIntervals]] = {
+            room: {day: _DayIntervals(day_bookings) for day, day_bookings in days.items()}
+            for room, days in by_room.items()
+        }
+        for faculty_bookings in self.by_faculty.values():
+            faculty_bookings.sort(key=lambda booking: (DAY_INDEX[booking.day], booking.start))
+
+    @classmethod
+    def from_raw_courses(cls, raw_courses: Iterable[Dict[str, Any]]) -> "OccupancyIndex":
+        raw_courses = [raw_course for raw_course in raw_courses if raw_course]
+        # Lab rows that a parent section already carries via labSchedules
+        embedded_labs = {raw_course.get("labSectionId") for raw_course in raw_courses if raw_course.get("labSectionId")}
+
+        def expand(raw_course):
+            section_id = raw_course.get("sectionId")
+            course_code = raw_course.get("courseCode")
+            section_name = raw_course.get("sectionName")
+            is_lab_row = raw_course.get("sectionType") == "LAB"
+            if is_lab_row and section_id in embedded_labs:
+                return
+
+            meetings = [(
+                "lab" if is_lab_row else "class",
+                raw_course.get("roomName") or raw_course.get("roomNumber"),
+                raw_course.get("faculties"),
+                (raw_course.get("sectionSchedule") or {}).get("classSchedules"),
+            )]
+            if not is_lab_row and raw_course.get("labSectionId"):
+                meetings.append((
+                    "lab",
+                    raw_course.get("labRoomName"),
+                    raw_course.get("labFaculties"),
+                    raw_course.get("labSchedules"),
+                ))
+
+            for kind, room, faculties, schedules in meetings:
+                faculty_list = split_faculties(faculties)
+                for schedule in schedules or []:
+                    if not schedule:
+                        continue
+                    day = (schedule.get("day") or "").upper()
+                    start = parse_time(schedule.get("startTime"))
+                    end = parse_time(schedule.get("endTime"))
+                    if day not in DAY_INDEX or start is None or end is None or end <= start:
+                        continue
+                    yield Booking(section_id, course_code, section_name, kind, room, faculty_list, day, start, end)
+
+        return cls(booking for raw_course in raw_courses for booking in expand(raw_course))
+
+    def free_rooms(self, day: str, start: int, end: int) -> List[str]:
+        """Rooms with no booking overlapping [start, end) on the given day"""
+        day = day.upper()
+        return sorted(
+            room for room, days in self.rooms.items()
+            if day not in days or not days[day].overlapping(start, end)
+        )
+
+    def room_bookings(self, room: str) -> List[Booking]:
+        days = self.rooms.get(room, {})
+        return [booking for day in WEEKDAYS if day in days for booking in days[day].bookings]
+
+    def faculty_timetable(self, initials: str) -> List[Booking]:
+        return self.by_faculty.get(initials.upper(), [])
+
+    def utilization(self, start: int, end: int, days: Optional[List[str]] = None) -> List[Tuple[str, float]]:
+        """(room, percent of [start, end) booked across `days`), busiest first"""
+        days = [day.upper() for day in days] if days else TEACHING_DAYS
+        window = (end - start) * len(days)
+        if window <= 0:
+            return []
+        usage = []
+        for room, room_days in self.rooms.items():
+            occupied = sum(
+                room_days[day].occupied_minutes(start, end)
+                for day in days
+                if day in room_days
+            )
+            usage.append((room, round(occupied / window * 100, 2)))
+        usage.sort(key=lambda item: (-item[1], item[0]))
+        return usage
@@ -1,30 +1,61 @@
 import httpx
 import asyncio
 import os
-from datetime import datetime
+from datetime import datetime, timezone
+from time import perf_counter
 from typing import List, Dict, Any, Optional
+from app.metrics import (
+    UPSTREAM_FETCH_DURATION, UPSTREAM_FETCH_BYTES, UPSTREAM_FETCH_FAILURES,
+    FEED_PARSE_DURATION, TRANSFORM_DURATION,
+)
+from app.cache import cache
+from app.services.change_log import ChangeLog, split_changes
+from app.services.resilience import CircuitBreaker
+from app.services.snapshot import CourseSnapshot
+import json
 import logging
 
 logger = logging.getLogger(__name__)
 
 class RealtimeService:
     def __init__(self):
-        self.base_url = "https://usis-cdn.eniamza.com/connect.json"
+        self.base_url = os.getenv("REALTIME_API_URL", "https://usis-cdn.eniamza.com/connect.json")
         self.timeout = 30
+        self.snapshot_ttl_seconds = int(os.getenv("REALTIME_SNAPSHOT_TTL_SECONDS", "60"))
+        # Past this age a served snapshot is reported as stale
+        self.stale_after_seconds = int(os.getenv(
+            "REALTIME_STALE_AFTER_SECONDS", str(max(self.snapshot_ttl_seconds * 2, 10))
+        ))
+        self.breaker = CircuitBreaker("realtime")
+        self._snapshot: Optional[CourseSnapshot] = None
+        self._snapshot_lock = asyncio.Lock()
+        self._refresh_task: Optional[asyncio.Task] = None
+        # Sections changed between recent snapshot versions (/api/realtime/changes)
+        self.change_log = ChangeLog()
+        # Set by the multi-worker coordinator when it is running
+        self.coordinator = None
     
     async def fetch_realtime_courses(self) -> Optional[List[Dict[str, Any]]]:
         """
         Fetch real-time course data directly from BRACU Connect API
-        No caching, no storage - direct API access
+        No caching, no storage - direct API access.
+        Returns [] without calling upstream while the circuit breaker is open.
         """
+        if not self.breaker.allow():
+            logger.warning("Skipping real-time fetch: upstream circuit is open")
+            return []
         try:
             async with httpx.AsyncClient(timeout=self.timeout) as client:
                 logger.info(f"Fetching real-time course data from: {self.base_url}")
                 
+                start = perf_counter()
                 response = await client.get(self.base_url)
+                UPSTREAM_FETCH_DURATION.labels("realtime").observe(perf_counter() - start)
                 response.raise_for_status()
+                UPSTREAM_FETCH_BYTES.labels("realtime").inc(len(response.content))
                 
-                data = response.json()
+                with FEED_PARSE_DURATION.labels("realtime").time():
+                    data = response.json()
                 
                 # Handle both new direct array format and old nested format
                 if isinstance(data, list):
@@ -33,17 +64,198 @@ class RealtimeService:
                     courses = data["data"]
                 else:
                     logger.warning("No course data found in response")
+                    self.breaker.record_failure()
                     return []
                 
                 logger.info(f"Successfully fetched {len(courses)} courses in real-time")
+                self.breaker.record_success()
                 return courses
                 
         except httpx.HTTPError as e:
+            UPSTREAM_FETCH_FAILURES.labels("realtime").inc()
+            self.breaker.record_failure()
             logger.error(f"HTTP error fetching real-time course data: {e}")
             return []
         except Exception as e:
+            UPSTREAM_FETCH_FAILURES.labels("realtime").inc()
+            self.breaker.record_failure()
             logger.error(f"Unexpected error fetching real-time course data: {e}")
             return []
+        finally:
+            # A cancelled call records no outcome; free the half-open probe slot
+            self.breaker.release()
+    
+    async def get_snapshot(self) -> Optional[CourseSnapshot]:
+        """
+        Get the current feed snapshot (stale-while-revalidate).
+        A snapshot older than the TTL is still returned immediately while one
+        background refresh replaces it; callers only wait when there is no
+        snapshot at all. If a refresh fails the previous snapshot is kept.
+        Worker processes that follow an elected leader take the leader's
+        published snapshot instead of calling upstream.
+        """
+        snapshot = self._snapshot
+        if snapshot:
+            if snapshot.age_seconds >= self.snapshot_ttl_seconds:
+                self._start_background_refresh()
+            return snapshot
+        
+        async with self._snapshot_lock:
+            if self._snapshot is not None:
+                return self._snapshot
+            return await self._update_snapshot()
+    
+    @property
+    def snapshot(self) -> Optional[CourseSnapshot]:
+        """The snapshot currently being served, without triggering a refresh"""
+        return self._snapshot
+    
+    @property
+    def ready(self) -> bool:
+        """True once there is a snapshot to serve, persisted or fresh"""
+        return self._snapshot is not None
+    
+    async def warm_start(self) -> Optional[CourseSnapshot]:
+        """
+        Install the snapshot persisted on disk, so requests are served right
+        after a restart (stale until the first refresh replaces it) instead of
+        waiting for an upstream download, or getting nothing if upstream is down.
+        Starts a refresh in the background unless the leader's job does it.
+        """
+        coordinator = self.coordinator
+        snapshot = None
+        if self._snapshot is None and coordinator is not None:
+            snapshot = await asyncio.to_thread(coordinator.load_persisted_snapshot)
+        if snapshot is not None:
+            async with self._snapshot_lock:
+                if self._snapshot is None:
+                    self._install(snapshot)
+                    logger.info(
+                        f"Warm start: serving persisted snapshot v{snapshot.version} "
+                        f"({len(snapshot.raw_courses)} sections, {int(snapshot.age_seconds)}s old)"
+                    )
+        
+        # Readiness waits for a snapshot, so a cold worker fetches one now
+        if self._snapshot is None or (
+            self._snapshot.age_seconds >= self.snapshot_ttl_seconds
+            and (coordinator is None or not coordinator.enabled)
+        ):
+            self._start_background_refresh()
+        return self._snapshot
+    
+    def is_stale(self, snapshot: Optional[CourseSnapshot]) -> bool:
+        """True when the snapshot is overdue for replacement or upstream is failing"""
+        if snapshot is None:
+            return False
+        return snapshot.age_seconds >= self.stale_after_seconds or self.breaker.current_state != CircuitBreaker.CLOSED
+    
+    def snapshot_headers(self, snapshot: Optional[CourseSnapshot]) -> Dict[str, str]:
+        """Response headers describing the snapshot a response was built from"""
+        if snapshot is None:
+            return {}
+        return {
+            "X-Snapshot-Version": str(snapshot.version),
+            "X-Snapshot-Age": str(int(snapshot.age_seconds)),
+            "X-Snapshot-Stale": "true" if self.is_stale(snapshot) else "false",
+        }
+    
+    def _start_background_refresh(self):
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._background_refresh())
+    
+    async def _background_refresh(self):
+        try:
+            async with self._snapshot_lock:
+                snapshot = self._snapshot
+                if snapshot and snapshot.age_seconds < self.snapshot_ttl_seconds:
+                    return
+                await self._update_snapshot()
+        except Exception as e:
+            logger.error(f"Background snapshot refresh failed: {e}")
+    
+    async def _update_snapshot(self) -> Optional[CourseSnapshot]:
+        """Take a newer snapshot from the leader, the shared cache or upstream (lock held)"""
+        snapshot = self._snapshot
+        coordinator = self.coordinator
+        if coordinator is not None and coordinator.follower:
+            shared, leader_alive = await asyncio.to_thread(
+                coordinator.read_shared_snapshot,
+                snapshot.version if snapshot else 0,
+                max_age_seconds=self.snapshot_ttl_seconds * 3
+            )
+            if shared:
+                self._install(shared)
+                return shared
+            if leader_alive and snapshot:
+                return snapshot
+        
+        return await self._fetch_snapshot()
+    
+    async def refresh_snapshot(self) -> Optional[CourseSnapshot]:
+        """Fetch a new snapshot now (used by the leader's refresh job)"""
+        async with self._snapshot_lock:
+            return await self._fetch_snapshot()
+    
+    async def _fetch_snapshot(self) -> Optional[CourseSnapshot]:
+        snapshot = self._snapshot
+        
+        # Another node (or this one before a restart) may have fetched recently
+        cached = await self._load_cached_snapshot()
+        if (
+            cached
+            and cached.age_seconds < self.snapshot_ttl_seconds
+            and (not snapshot or cached.fetched_at > snapshot.fetched_at)
+        ):
+            version = snapshot.version + 1 if snapshot else cached.version
+            self._install(CourseSnapshot(cached.raw_courses, version, cached.fetched_at))
+            logger.info(f"Installed cached course snapshot v{version} ({len(cached.raw_courses)} sections)")
+        else:
+            raw_courses = await self.fetch_realtime_courses()
+            if raw_courses:
+                version = snapshot.version + 1 if snapshot else 1
+                self._install(CourseSnapshot(raw_courses, version))
+                logger.info(f"Installed course snapshot v{version} ({len(raw_courses)} sections)")
+                await self._store_cached_snapshot(self._snapshot)
+            elif not snapshot and cached:
+                # Upstream is down on a cold start: an old snapshot beats none
+                self._install(cached)
+                logger.warning(f"Upstream unavailable, serving cached snapshot from {cached.fetched_at.isoformat()}")
+        
+        if self._snapshot is not snapshot and self.coordinator is not None:
+            await self.coordinator.publish_snapshot(self._snapshot)
+        return self._snapshot
+    
+    def _install(self, snapshot: CourseSnapshot):
+        """Serve a new snapshot, recording which sections changed since the last one"""
+        self.change_log.record(snapshot.version, snapshot.raw_courses, snapshot.cache_key)
+        self._snapshot = snapshot
+    
+    async def _load_cached_snapshot(self) -> Optional[CourseSnapshot]:
+        """Snapshot from a shared cache backend (a process-local cache adds nothing here)"""
+        if not cache.shared:
+            return None
+        value = await cache.get("snapshot", "current")
+        if value is None:
+            return None
+        try:
+            document = json.loads(value)
+            return CourseSnapshot(
+                document["raw_courses"],
+                document["version"],
+                datetime.fromtimestamp(document["fetched_at"], tz=timezone.utc)
+            )
+        except (ValueError, KeyError, TypeError) as e:
+            logger.warning(f"Ignoring unreadable cached snapshot: {e}")
+            return None
+    
+    async def _store_cached_snapshot(self, snapshot: CourseSnapshot):
+        if not cache.shared:
+            return
+        await cache.set_json("snapshot", "current", {
+            "version": snapshot.version,
+            "fetched_at": snapshot.fetched_at.timestamp(),
+            "raw_courses": snapshot.raw_courses
+        })
     
     def transform_course_data(self, raw_course: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -120,55 +332,152 @@ class RealtimeService:
         """
         Get all courses in real-time, transformed for immediate use
         """
-        raw_courses = await self.fetch_realtime_courses()
-        if not raw_courses:
-            return []
-        
+        snapshot = await self.get_snapshot()
+        return self.transform_courses(snapshot.raw_courses if snapshot else [])
+    
+    def transform_courses(self, raw_courses: List[Dict[str, Any]], operation: str = "get_courses") -> List[Dict[str, Any]]:
         transformed_courses = []
-        for course in raw_courses:
-            try:
-                transformed_course = self.transform_course_data(course)
-                if transformed_course:
-                    transformed_courses.append(transformed_course)
-            except Exception as e:
-                logger.error(f"Error transforming course {course.get('courseCode', 'unknown')}: {e}")
-                continue
+        with TRANSFORM_DURATION.labels(operation).time():
+            for course in raw_courses:
+                try:
+                    transformed_course = self.transform_course_data(course)
+                    if transformed_course:
+                        transformed_courses.append(transformed_course)
+                except Exception as e:
+                    logger.error(f"Error transforming course {course.get('courseCode', 'unknown')}: {e}")
+                    continue
         
         return transformed_courses
     
-    async def get_course_by_code(self, course_code: str) -> Optional[Dict[str, Any]]:
+    async def get_sections_by_code(self, course_code: str) -> List[Dict[str, Any]]:
         """
-        Get specific course by course code in real-time
+        Every section of a course code in real-time (lab codes resolve to the
+        sections carrying that lab)
         """
-        raw_courses = await self.fetch_realtime_courses()
-        if not raw_courses:
-            return None
+        snapshot = await self.get_snapshot()
+        if not snapshot:
+            return []
+        return self.transform_courses(snapshot.section_index.sections_for_code(course_code), "sections_by_code")
+    
+    async def get_sections(
+        self,
+        section_ids: List[int],
+        course_codes: List[str],
+        semester_session_id: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Look up many sections at once by section id and/or course code.
+        Each section appears once even when matched by both.
+        """
+        snapshot = await self.get_snapshot()
+        if not snapshot:
+            return {"sections": [], "unknown_section_ids": section_ids, "unknown_course_codes": course_codes}
+        index = snapshot.section_index
         
-        for course in raw_courses:
-            if course.get("courseCode", "").upper() == course_code.upper():
-                return self.transform_course_data(course)
+        matched: Dict[int, Dict[str, Any]] = {}
+        unknown_section_ids = []
+        for section_id in section_ids:
+            section = index.section(section_id)
+            if section is None:
+                unknown_section_ids.append(section_id)
+            else:
+                matched.setdefault(section["sectionId"], section)
+        unknown_course_codes = []
+        for course_code in course_codes:
+            sections = index.sections_for_code(course_code)
+            if not sections:
+                unknown_course_codes.append(course_code)
+            for section in sections:
+                matched.setdefault(section["sectionId"], section)
         
-        return None
+        sections = list(matched.values())
+        if semester_session_id is not None:
+            sections = [section for section in sections if section.get("semesterSessionId") == semester_session_id]
+        return {
+            "sections": self.transform_courses(sections, "section_lookup"),
+            "unknown_section_ids": unknown_section_ids,
+            "unknown_course_codes": unknown_course_codes,
+        }
+    
+    def changes_since(self, snapshot: Optional[CourseSnapshot], since: str) -> Dict[str, Any]:
+        """
+        Sections of `snapshot` whose seats changed, or that were added or
+        removed, after the snapshot whose cache_key is `since` (the `cursor`
+        of an earlier response). `resync_required` is set when the change log
+        no longer reaches back that far or never recorded that snapshot (a
+        restart, or a cursor from another node); the client then reloads the
+        full course list.
+        """
+        since_version = self.change_log.version_of(since)
+        section_ids = None
+        if snapshot and since_version is not None:
+            section_ids = self.change_log.changed_since(since_version, snapshot.version)
+        if section_ids is None:
+            return {
+                "version": snapshot.version if snapshot else None,
+                "cursor": snapshot.cache_key if snapshot else None,
+                "resync_required": True,
+                "courses": [],
+                "removed_section_ids": [],
+            }
+        
+        changed, removed = split_changes(section_ids, snapshot.section_index.by_section_id)
+        return {
+            "version": snapshot.version,
+            "cursor": snapshot.cache_key,
+            "resync_required": False,
+            "courses": self.transform_courses(changed, "changes"),
+            "removed_section_ids": removed,
+        }
     
     async def search_courses(self, query: str) -> List[Dict[str, Any]]:
         """
         Search courses in real-time without storage
         """
-        raw_courses = await self.fetch_realtime_courses()
+        snapshot = await self.get_snapshot()
+        raw_courses = snapshot.raw_courses if snapshot else []
         if not raw_courses:
             return []
         
         results = []
         query_upper = query.upper()
         
-        for course in raw_courses:
-            course_code = course.get("courseCode", "").upper()
-            course_name = course.get("sectionName", "").upper()
-            
-            if query_upper in course_code or query_upper in course_name:
-                results.append(self.transform_course_data(course))
+        with TRANSFORM_DURATION.labels("search_courses").time():
+            for course in raw_courses:
+                course_code = course.get("courseCode", "").upper()
+                course_name = course.get("sectionName", "").upper()
+                
+                if query_upper in course_code or query_upper in course_name:
+                    results.append(self.transform_course_data(course))
         
         return results
 
+    async def get_stats(self) -> Dict[str, Any]:
+        """
+        Seat availability totals for the current snapshot, cached per snapshot
+        """
+        snapshot = await self.get_snapshot()
+        
+        async def compute_stats():
+            raw_courses = [course for course in (snapshot.raw_courses if snapshot else []) if course]
+            total_courses = len(raw_courses)
+            available_courses = len([
+                c for c in raw_courses if c.get("capacity", 0) - c.get("consumedSeat", 0) > 0
+            ])
+            return {
+                "total_courses": total_courses,
+                "available_courses": available_courses,
+                "full_courses": total_courses - available_courses,
+                "availability_rate": round((available_courses / total_courses * 100), 2) if total_courses > 0 else 0,
+                "timestamp": datetime.now().isoformat() if raw_courses else None
+            }
+        
+        if not snapshot:
+            return await compute_stats()
+        return await cache.get_or_set_json(
+            "realtime_stats", snapshot.cache_key, compute_stats,
+            ttl=max(self.snapshot_ttl_seconds * 2, 60)
+        )
+
 # Global service instance
 realtime_service = RealtimeService()
\ No newline at end of file
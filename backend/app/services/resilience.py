@@ -0,0 +1,105 @@
+from time import monotonic
+from typing import Dict, Any
+from app.metrics import Counter, Gauge
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "3"))
+CIRCUIT_RESET_SECONDS = float(os.getenv("CIRCUIT_RESET_SECONDS", "30"))
+
+CIRCUIT_STATE = Gauge("seatz_circuit_state", "Circuit breaker state (0 closed, 1 half-open, 2 open)", ["name"])
+CIRCUIT_REJECTED = Counter("seatz_circuit_rejected_total", "Calls short-circuited by an open breaker", ["name"])
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker for an upstream dependency.
+
+    closed:    calls go through; `failure_threshold` failures in a row open it
+    open:      calls are rejected without touching the network until
+               `reset_seconds` have passed
+    half-open: a single probe call is let through; success closes the
+               breaker, failure opens it for another `reset_seconds`
+
+    Callers record the outcome with record_success / record_failure and call
+    release() when the guarded call ends, in a finally block: a probe that
+    is cancelled records neither outcome, and would otherwise hold the
+    half-open slot forever.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    _STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = CIRCUIT_FAILURE_THRESHOLD,
+        reset_seconds: float = CIRCUIT_RESET_SECONDS,
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self._probe_in_flight = False
+        CIRCUIT_STATE.labels(name).set_function(lambda: self._STATE_VALUES[self.current_state])
+
+    @property
+    def current_state(self) -> str:
+        """State as of now, reporting half-open once an open breaker's timeout has passed"""
+        if self.state == self.OPEN and monotonic() - self.opened_at >= self.reset_seconds:
+            return self.HALF_OPEN
+        return self.state
+
+    def allow(self) -> bool:
+        """Whether a call may proceed; in half-open only one probe is allowed at a time"""
+        state = self.current_state
+        if state == self.CLOSED:
+            return True
+        if state == self.HALF_OPEN and not self._probe_in_flight:
+            self.state = self.HALF_OPEN
+            self._probe_in_flight = True
+            logger.info(f"Circuit {self.name} half-open, probing upstream")
+            return True
+        CIRCUIT_REJECTED.labels(self.name).inc()
+        return False
+
+    def record_success(self):
+        if self.state != self.CLOSED:
+            logger.info(f"Circuit {self.name} closed")
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self._probe_in_flight = False
+
+    def release(self):
+        """End of a guarded call; lets the next call probe if this one ended without an outcome"""
+        self._probe_in_flight = False
+
+    def record_failure(self):
+        self.consecutive_failures += 1
+        self._probe_in_flight = False
+        if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                logger.warning(
+                    f"Circuit {self.name} open after {self.consecutive_failures} consecutive failures, "
+                    f"retrying in {self.reset_seconds:.0f}s"
+                )
+            self.state = self.OPEN
+            self.opened_at = monotonic()
+
+    def to_dict(self) -> Dict[str, Any]:
+        state = self.current_state
+        return {
+            "state": state,
+            "consecutive_failures": self.consecutive_failures,
+            "retry_in_seconds": (
+                round(max(0.0, self.reset_seconds - (monotonic() - self.opened_at)), 1)
+                if state == self.OPEN else None
+            ),
+        }
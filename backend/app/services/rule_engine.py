@@ -0,0 +1,267 @@
+"""
+Alert rules compiled into bitsets over the sections of one feed snapshot.
+
+A rule targets one section or every section of a course code, optionally
+narrowed to sections taught by a faculty member and/or meeting only inside
+a weekly time window, and fires while one of those sections has at least
+`min_seats` open seats.
+
+The sections of a snapshot are numbered 0..n-1 and every set of sections
+is a Python int with bit i set for section i. Compiling a rule reduces its
+static conditions (section, code, faculty, days and times) to one such
+bitset, or to a single position for rules on one section, shared by every
+rule with the same conditions. Evaluation builds one "has at least N
+seats" bitset per distinct threshold and fires each group of identical
+rules with a single AND (or one lookup in the seat array), so a tick costs
+one pass over the sections per threshold plus one operation per distinct
+rule rather than per alert.
+"""
+from typing import List, Dict, Any, Optional, Iterable, Set, Tuple
+from app.services.occupancy_index import split_faculties
+from app.services.schedule_engine import WEEKDAYS, parse_time, schedule_mask, slot_mask
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def bitset(positions: Iterable[int], size: int) -> int:
+    """Int with the given bit positions set, built in one pass over a byte buffer"""
+    buffer = bytearray((size + 7) // 8)
+    for position in positions:
+        buffer[position >> 3] |= 1 << (position & 7)
+    return int.from_bytes(buffer, "little")
+
+
+def _stored_week_mask(schedule_data: Optional[Dict[str, Any]]) -> int:
+    """Week mask of a Course row's schedule_data, including the lab folded in by the sync"""
+    schedule_data = schedule_data or {}
+    lab_schedules = ((schedule_data.get("labSection") or {}).get("labSchedules") or {}).get("classSchedules")
+    return schedule_mask(schedule_data.get("classSchedules")) | schedule_mask(lab_schedules)
+
+
+class SectionTable:
+    """Column arrays over the sections of one snapshot, indexed by position"""
+
+    def __init__(self, rows: Iterable[Tuple[int, str, Optional[str], int, int, Dict[str, Any]]]):
+        """rows: (section_id, course_code, faculties, week mask, available seats, section details)"""
+        self.section_ids: List[int] = []
+        self.available_seats: List[int] = []
+        self.week_masks: List[int] = []
+        self.details: List[Dict[str, Any]] = []
+        self.position: Dict[int, int] = {}
+
+        # Positions by upper-cased course code and by faculty initials
+        self.by_code: Dict[str, List[int]] = {}
+        self.by_faculty: Dict[str, Set[int]] = {}
+        for section_id, course_code, faculties, week_mask, available_seats, details in rows:
+            position = len(self.section_ids)
+            self.section_ids.append(section_id)
+            self.available_seats.append(available_seats)
+            self.week_masks.append(week_mask)
+            self.details.append(details)
+            self.position[section_id] = position
+            self.by_code.setdefault((course_code or "").upper(), []).append(position)
+            for initials in split_faculties(faculties):
+                self.by_faculty.setdefault(initials, set()).add(position)
+
+    def __len__(self) -> int:
+        return len(self.section_ids)
+
+    @classmethod
+    def from_raw_courses(cls, raw_courses: Iterable[Dict[str, Any]]) -> "SectionTable":
+        # Lab rows are folded into their parent through labSchedules, as in ScheduleIndex
+        return cls(
+            (
+                raw_course["sectionId"],
+                raw_course.get("courseCode"),
+                raw_course.get("faculties"),
+                schedule_mask((raw_course.get("sectionSchedule") or {}).get("classSchedules"))
+                | schedule_mask(raw_course.get("labSchedules")),
+                raw_course.get("capacity", 0) - raw_course.get("consumedSeat", 0),
+                {
+                    "course_code": raw_course.get("courseCode"),
+                    "section_name": raw_course.get("sectionName"),
+                    "capacity": raw_course.get("capacity", 0),
+                    "room_name": raw_course.get("roomName"),
+                    "faculties": raw_course.get("faculties"),
+                    "schedule_data": raw_course.get("sectionSchedule"),
+                },
+            )
+            for raw_course in raw_courses
+            if raw_course and raw_course.get("sectionType") != "LAB" and raw_course.get("sectionId") is not None
+        )
+
+    @classmethod
+    def from_courses(cls, courses) -> "SectionTable":
+        """Build from Course rows, whose schedule_data holds the raw sectionSchedule"""
+        return cls(
+            (
+                course.section_id,
+                course.course_code,
+                course.faculties,
+                _stored_week_mask(course.schedule_data),
+                course.available_seats,
+                {
+                    "course_code": course.course_code,
+                    "section_name": course.section_name,
+                    "capacity": course.capacity,
+                    "room_name": course.room_name,
+                    "faculties": course.faculties,
+                    "schedule_data": course.schedule_data,
+                },
+            )
+            for course in courses
+            if course.section_type != "LAB"
+        )
+
+    def seats_at_least(self, threshold: int) -> int:
+        """Bitset of the sections with at least `threshold` available seats"""
+        return bitset(
+            (position for position, seats in enumerate(self.available_seats) if seats >= threshold), len(self)
+        )
+
+
+def window_mask(days: Optional[List[str]], start_after: Optional[str], end_before: Optional[str]) -> Optional[int]:
+    """Week slots a rule's sections must stay within, or None when the rule has no day/time condition"""
+    if not days and not start_after and not end_before:
+        return None
+    start = parse_time(start_after) if start_after else 0
+    end = parse_time(end_before) if end_before else 24 * 60
+    mask = 0
+    for day in days or WEEKDAYS:
+        mask |= slot_mask(day, start, end)
+    return mask
+
+
+class Rule:
+    """The evaluation-relevant columns of one alert"""
+
+    __slots__ = (
+        "alert_id", "user_id", "section_id", "course_code", "min_seats",
+        "days", "start_after", "end_before", "faculty",
+    )
+
+    def __init__(
+        self, alert_id, user_id, section_id=None, course_code=None, min_seats=1,
+        days=None, start_after=None, end_before=None, faculty=None,
+    ):
+        self.alert_id = alert_id
+        self.user_id = user_id
+        self.section_id = section_id
+        self.course_code = course_code
+        self.min_seats = max(min_seats or 1, 1)
+        self.days = days
+        self.start_after = start_after
+        self.end_before = end_before
+        self.faculty = faculty
+
+    def condition_key(self) -> tuple:
+        return (
+            self.section_id,
+            None if self.section_id is not None else (self.course_code or "").upper(),
+            tuple(sorted(day.upper() for day in self.days)) if self.days else None,
+            self.start_after,
+            self.end_before,
+            (self.faculty or "").strip().upper() or None,
+        )
+
+
+class CompiledRules:
+    """
+    Rules grouped by identical conditions. A group bound to a single
+    section keeps that section's position and is checked against the seat
+    array directly; any other group keeps the bitset of sections it may
+    fire on (plus their positions, to list the sections once it fires).
+    Valid for the SectionTable it was compiled against.
+    """
+
+    def __init__(self, table: SectionTable, rules: Iterable[Rule]):
+        self.table = table
+        # (position, min_seats) -> rules
+        self.section_groups: Dict[Tuple[int, int], List[Rule]] = {}
+        # (candidate bitset, min_seats) -> (candidate positions, rules)
+        self.set_groups: Dict[Tuple[int, int], Tuple[List[int], List[Rule]]] = {}
+        self.rule_count = 0
+        self.unmatchable = 0
+
+        candidates: Dict[tuple, Any] = {}
+        self._windows: Dict[tuple, bytearray] = {}
+        for rule in rules:
+            self.rule_count += 1
+            key = rule.condition_key()
+            candidate = candidates.get(key, candidates)
+            if candidate is candidates:
+                candidate = candidates[key] = self._compile(key)
+            if candidate is None:
+                self.unmatchable += 1
+            elif key[0] is not None:
+                self.section_groups.setdefault((candidate, rule.min_seats), []).append(rule)
+            else:
+                bits, positions = candidate
+                self.set_groups.setdefault((bits, rule.min_seats), (positions, []))[1].append(rule)
+
+    def _compile(self, key: tuple):
+        """
+        Candidate sections of a condition key: a position for section rules,
+        (bitset, positions) for code rules, None when nothing can match
+        """
+        section_id, course_code, days, start_after, end_before, faculty = key
+        table = self.table
+        inside = None
+        if days or start_after or end_before:
+            window_key = (days, start_after, end_before)
+            inside = self._windows.get(window_key)
+            if inside is None:
+                inside = self._windows[window_key] = self._inside_window(
+                    window_mask(list(days or []), start_after, end_before)
+                )
+        taught = table.by_faculty.get(faculty, set()) if faculty else None
+
+        if section_id is not None:
+            position = table.position.get(section_id)
+            if position is None:
+                return None
+            if taught is not None and position not in taught:
+                return None
+            if inside is not None and not inside[position]:
+                return None
+            return position
+
+        positions = [
+            position for position in table.by_code.get(course_code, [])
+            if (taught is None or position in taught) and (inside is None or inside[position])
+        ]
+        if not positions:
+            return None
+        return bitset(positions, len(table)), positions
+
+    def _inside_window(self, window: int) -> bytearray:
+        """Per position, 1 when the section has a schedule lying entirely inside the window"""
+        outside = ~window
+        return bytearray(
+            1 if week_mask and not week_mask & outside else 0
+            for week_mask in self.table.week_masks
+        )
+
+    def evaluate(self) -> List[Tuple[List[int], List[Rule]]]:
+        """(positions of the sections fired on, rules) for every group of rules that fires"""
+        seats = self.table.available_seats
+        fired = [
+            ([position], rules)
+            for (position, min_seats), rules in self.section_groups.items()
+            if seats[position] >= min_seats
+        ]
+
+        thresholds: Dict[int, int] = {}
+        for (bits, min_seats), (positions, rules) in self.set_groups.items():
+            open_bits = thresholds.get(min_seats)
+            if open_bits is None:
+                open_bits = thresholds[min_seats] = self.table.seats_at_least(min_seats)
+            if bits & open_bits:
+                fired.append(([position for position in positions if seats[position] >= min_seats], rules))
+        return fired
+
+    def best_section(self, hit: List[int]) -> int:
+        """Position of the fired section with the most open seats"""
+        seats = self.table.available_seats
+        return max(hit, key=lambda position: seats[position])
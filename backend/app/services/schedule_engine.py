@@ -0,0 +1,193 @@
+from typing import List, Dict, Any, Optional, Iterable, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+# The week is a fixed-width bitmask: 7 days x 288 five-minute slots.
+# Every start/end time in the BRACU feed falls on a five-minute boundary.
+SLOT_MINUTES = 5
+SLOTS_PER_DAY = 24 * 60 // SLOT_MINUTES
+WEEKDAYS = ["SATURDAY", "SUNDAY", "MONDAY", "TUESDAY", "WEDNESDAY", "THURSDAY", "FRIDAY"]
+DAY_INDEX = {day: index for index, day in enumerate(WEEKDAYS)}
+
+
+def parse_time(value: Optional[str]) -> Optional[int]:
+    """Convert "HH:MM[:SS]" into minutes since midnight"""
+    if not value:
+        return None
+    try:
+        parts = value.split(":")
+        return int(parts[0]) * 60 + int(parts[1])
+    except (ValueError, IndexError):
+        return None
+
+
+def slot_mask(day: Optional[str], start_minutes: Optional[int], end_minutes: Optional[int]) -> int:
+    """Bitmask covering [start, end) on the given weekday, or 0 if unparseable"""
+    day_index = DAY_INDEX.get((day or "").upper())
+    if day_index is None or start_minutes is None or end_minutes is None or end_minutes <= start_minutes:
+        return 0
+    first_slot = start_minutes // SLOT_MINUTES
+    # Round the end up so a partial slot still counts as occupied
+    last_slot = min(-(-end_minutes // SLOT_MINUTES), SLOTS_PER_DAY)
+    width = last_slot - first_slot
+    return ((1 << width) - 1) << (day_index * SLOTS_PER_DAY + first_slot)
+
+
+def schedule_mask(schedules: Optional[Iterable[Dict[str, Any]]]) -> int:
+    """Union of the slots of raw feed schedules ({"day", "startTime", "endTime"})"""
+    mask = 0
+    for schedule in schedules or []:
+        if schedule:
+            mask |= slot_mask(
+                schedule.get("day"),
+                parse_time(schedule.get("startTime")),
+                parse_time(schedule.get("endTime")),
+            )
+    return mask
+
+
+def _transform_schedules(schedules: Optional[Iterable[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    return [
+        {
+            "day": schedule.get("day"),
+            "start_time": schedule.get("startTime"),
+            "end_time": schedule.get("endTime"),
+        }
+        for schedule in schedules or []
+        if schedule
+    ]
+
+
+class SectionTimes:
+    """Weekly time footprint of one section (theory classes plus its lab)"""
+
+    __slots__ = (
+        "section_id", "course_code", "section_name", "available_seats",
+        "faculties", "room_name", "class_mask", "lab_mask", "mask",
+        "class_schedules", "lab_schedules",
+    )
+
+    def __init__(self, raw_course: Dict[str, Any]):
+        schedule = raw_course.get("sectionSchedule") or {}
+        class_schedules = schedule.get("classSchedules") or []
+        lab_schedules = raw_course.get("labSchedules") or []
+
+        self.section_id = raw_course.get("sectionId")
+        self.course_code = (raw_course.get("courseCode") or "").upper()
+        self.section_name = raw_course.get("sectionName")
+        self.available_seats = raw_course.get("capacity", 0) - raw_course.get("consumedSeat", 0)
+        self.faculties = raw_course.get("faculties")
+        self.room_name = raw_course.get("roomName")
+        self.class_mask = schedule_mask(class_schedules)
+        self.lab_mask = schedule_mask(lab_schedules)
+        self.mask = self.class_mask | self.lab_mask
+        self.class_schedules = class_schedules
+        self.lab_schedules = lab_schedules
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "section_id": self.section_id,
+            "course_code": self.course_code,
+            "section_name": self.section_name,
+            "available_seats": self.available_seats,
+            "faculties": self.faculties,
+            "room_name": self.room_name,
+            "class_schedules": _transform_schedules(self.class_schedules),
+            "lab_schedules": _transform_schedules(self.lab_schedules),
+        }
+
+
+class ScheduleIndex:
+    """
+    Per-snapshot schedule masks for every section.
+    Built once from the raw feed; conflict checks are then a handful of
+    integer AND operations instead of comparing time strings.
+    """
+
+    def __init__(self, sections: Iterable[SectionTimes]):
+        self.sections: Dict[int, SectionTimes] = {}
+        self.by_course: Dict[str, List[SectionTimes]] = {}
+        for section in sections:
+            self.sections[section.section_id] = section
+            self.by_course.setdefault(section.course_code, []).append(section)
+
+    @classmethod
+    def from_raw_courses(cls, raw_courses: Iterable[Dict[str, Any]]) -> "ScheduleIndex":
+        # Lab rows are folded into their parent through labSchedules
+        return cls(
+            SectionTimes(raw_course)
+            for raw_course in raw_courses
+            if raw_course and raw_course.get("sectionType") != "LAB" and raw_course.get("sectionId") is not None
+        )
+
+    def conflicts(self, section_ids: Iterable[int]) -> List[Tuple[int, int]]:
+        """Return every pair of the given sections whose weekly slots overlap"""
+        sections = [
+            self.sections[section_id] for section_id in dict.fromkeys(section_ids) if section_id in self.sections
+        ]
+        pairs = []
+        occupied = 0
+        for index, section in enumerate(sections):
+            # Only fall back to pairwise checks when the running union overlaps
+            if occupied & section.mask:
+                for earlier in sections[:index]:
+                    if earlier.mask & section.mask:
+                        pairs.append((earlier.section_id, section.section_id))
+            occupied |= section.mask
+        return pairs
+
+    def build_routines(
+        self,
+        course_codes: Iterable[str],
+        open_seats_only: bool = False,
+        max_results: int = 50,
+    ) -> Dict[str, Any]:
+        """
+        Enumerate conflict-free section combinations, one section per course code.
+        Courses are expanded fewest-candidates first, and after every choice each
+        remaining course must still have a compatible section (forward checking),
+        so dead branches are cut before they are explored.
+        """
+        codes = list(dict.fromkeys(code.upper() for code in course_codes if code))
+        candidates = {}
+        missing = []
+        for code in codes:
+            sections = self.by_course.get(code, [])
+            if open_seats_only:
+                sections = [section for section in sections if section.available_seats > 0]
+            if not sections:
+                missing.append(code)
+            candidates[code] = sections
+
+        routines: List[List[SectionTimes]] = []
+        result = {"routines": routines, "missing_courses": missing, "truncated": False}
+        if missing or not codes:
+            return result
+
+        order = sorted(codes, key=lambda code: len(candidates[code]))
+        ordered_candidates = [candidates[code] for code in order]
+        chosen: List[SectionTimes] = []
+
+        def search(depth: int, occupied: int) -> bool:
+            if depth == len(ordered_candidates):
+                routines.append(list(chosen))
+                return len(routines) < max_results
+            for section in ordered_candidates[depth]:
+                if occupied & section.mask:
+                    continue
+                combined = occupied | section.mask
+                if not all(
+                    any(not (combined & other.mask) for other in remaining)
+                    for remaining in ordered_candidates[depth + 1:]
+                ):
+                    continue
+                chosen.append(section)
+                keep_going = search(depth + 1, combined)
+                chosen.pop()
+                if not keep_going:
+                    return False
+            return True
+
+        result["truncated"] = not search(0, 0)
+        return result
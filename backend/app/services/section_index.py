@@ -0,0 +1,53 @@
+from typing import List, Dict, Any, Optional, Iterable
+
+
+class SectionIndex:
+    """
+    Hash indexes over the raw sections of one feed download.
+    Every key maps straight to the raw section dicts, so a lookup by section
+    id, course code, lab section, lab course code or semester is a single
+    dict access instead of a scan of the feed.
+    """
+
+    def __init__(self, raw_courses: Iterable[Dict[str, Any]]):
+        self.by_section_id: Dict[int, Dict[str, Any]] = {}
+        self.by_course_code: Dict[str, List[Dict[str, Any]]] = {}
+        # Lab keys point at the theory section the lab belongs to
+        self.by_lab_section_id: Dict[int, Dict[str, Any]] = {}
+        self.by_lab_course_code: Dict[str, List[Dict[str, Any]]] = {}
+        self.by_semester: Dict[int, List[Dict[str, Any]]] = {}
+
+        for raw_course in raw_courses:
+            if not raw_course:
+                continue
+            section_id = raw_course.get("sectionId")
+            if section_id is not None:
+                self.by_section_id[section_id] = raw_course
+            course_code = (raw_course.get("courseCode") or "").upper()
+            if course_code:
+                self.by_course_code.setdefault(course_code, []).append(raw_course)
+            lab_section_id = raw_course.get("labSectionId")
+            if lab_section_id is not None:
+                self.by_lab_section_id[lab_section_id] = raw_course
+            lab_course_code = (raw_course.get("labCourseCode") or "").upper()
+            if lab_course_code:
+                self.by_lab_course_code.setdefault(lab_course_code, []).append(raw_course)
+            semester = raw_course.get("semesterSessionId")
+            if semester is not None:
+                self.by_semester.setdefault(semester, []).append(raw_course)
+
+    @classmethod
+    def from_raw_courses(cls, raw_courses: Iterable[Dict[str, Any]]) -> "SectionIndex":
+        return cls(raw_courses)
+
+    def section(self, section_id: int) -> Optional[Dict[str, Any]]:
+        """The section with this id, or the theory section whose lab has it"""
+        return self.by_section_id.get(section_id) or self.by_lab_section_id.get(section_id)
+
+    def sections_for_code(self, course_code: str) -> List[Dict[str, Any]]:
+        """Every section of a course code; a lab code (CSE110L) gives the sections with that lab"""
+        code = course_code.upper()
+        return self.by_course_code.get(code) or self.by_lab_course_code.get(code, [])
+
+    def sections_in_semester(self, semester_session_id: int) -> List[Dict[str, Any]]:
+        return self.by_semester.get(semester_session_id, [])
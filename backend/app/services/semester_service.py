@@ -0,0 +1,149 @@
+"""
+Semester scoping and archival of past sessions.
+
+The hot `courses` table holds the sections of the active semester only.
+When the feed moves to a new semester, the course sync moves every older
+semester to `courses_archive` in bulk (one INSERT ... SELECT and one DELETE
+per semester) before it syncs the new sections, so the table the routers
+and the notifier scan stays the size of one semester.
+
+Alerts on archived sections cannot fire again. Inactive ones are deleted
+(unless ARCHIVE_PRUNE_INACTIVE_ALERTS=false); active ones are frozen:
+deactivated, detached from the section (course_id is cleared, the feed
+section id kept in archived_section_id and the archive row's id in
+archived_course_id) and left with the section's course code, so
+re-activating one watches that course in the new semester.
+"""
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Optional, Tuple
+from sqlalchemy import func, insert, select, update
+from sqlalchemy.orm import Session
+from app.metrics import ALERTS_ARCHIVED, SECTIONS_ARCHIVED
+from app.models.alert import Alert, FROZEN
+from app.models.course import Course, CourseArchive
+from app.services.class_slots import delete_class_slots
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+# Pin the active semester instead of following the newest one in the database
+ACTIVE_SEMESTER_SESSION_ID = os.getenv("ACTIVE_SEMESTER_SESSION_ID")
+ARCHIVE_ON_SYNC = os.getenv("ARCHIVE_ON_SYNC", "true").lower() == "true"
+ARCHIVE_PRUNE_INACTIVE_ALERTS = os.getenv("ARCHIVE_PRUNE_INACTIVE_ALERTS", "true").lower() == "true"
+
+
+def active_semester_id(db: Session) -> Optional[int]:
+    """The semester queries default to: the pinned one, else the newest synced"""
+    if ACTIVE_SEMESTER_SESSION_ID:
+        return int(ACTIVE_SEMESTER_SESSION_ID)
+    # An index-only lookup on ix_courses_semester_code
+    return db.query(func.max(Course.semester_session_id)).scalar()
+
+
+def course_model(db: Session, semester_session_id: Optional[int] = None) -> Tuple[type, Optional[int]]:
+    """
+    (model, semester) to query for a semester's sections: Course for the
+    active semester (the default) or one not archived yet, else CourseArchive
+    """
+    active = active_semester_id(db)
+    if semester_session_id is None or semester_session_id == active:
+        return Course, active
+    if db.query(Course.id).filter(Course.semester_session_id == semester_session_id).first():
+        return Course, semester_session_id
+    return CourseArchive, semester_session_id
+
+
+def _archive_semester(db: Session, semester_session_id: int, now: datetime) -> Dict[str, int]:
+    """Move one semester's sections to the archive, freezing or pruning their alerts first"""
+    section_ids = select(Course.id).where(Course.semester_session_id == semester_session_id)
+    on_archived = Alert.course_id.in_(section_ids)
+
+    pruned = 0
+    if ARCHIVE_PRUNE_INACTIVE_ALERTS:
+        pruned = db.query(Alert).filter(on_archived, Alert.is_active == False).delete(
+            synchronize_session=False
+        )
+
+    # Archive rows get their own ids; courses.id is kept as original_id
+    columns = [column.name for column in Course.__table__.columns if column.name != "id"]
+    db.execute(
+        insert(CourseArchive).from_select(
+            ["original_id", *columns],
+            select(Course.id, *(Course.__table__.c[name] for name in columns)).where(
+                Course.semester_session_id == semester_session_id
+            ),
+        )
+    )
+
+    # SET expressions see the row before the update, so the subqueries still
+    # find the section through the old course_id
+    section = select(Course).where(Course.id == Alert.course_id)
+    archived = select(func.max(CourseArchive.id)).where(
+        CourseArchive.semester_session_id == semester_session_id,
+        CourseArchive.original_id == Alert.course_id,
+    )
+    frozen = db.execute(
+        update(Alert).where(on_archived).values(
+            course_code=section.with_only_columns(Course.course_code).scalar_subquery(),
+            archived_section_id=section.with_only_columns(Course.section_id).scalar_subquery(),
+            archived_course_id=archived.scalar_subquery(),
+            course_id=None,
+            is_active=False,
+            state=FROZEN,
+            state_changed_at=now,
+        ).execution_options(synchronize_session=False)
+    ).rowcount
+
+    # Slots reference courses.id; archived sections keep only their schedule_data
+    delete_class_slots(db, semester_session_id)
+
+    sections = db.query(Course).filter(Course.semester_session_id == semester_session_id).delete(
+        synchronize_session=False
+    )
+    return {"sections": sections, "alerts_frozen": frozen, "alerts_pruned": pruned}
+
+
+def archive_semesters_before(db: Session, semester_session_id: int) -> Dict[str, int]:
+    """
+    Archive every semester older than `semester_session_id`, one transaction
+    per semester. Returns totals of sections archived and alerts frozen/pruned.
+    """
+    totals = {"semesters": 0, "sections": 0, "alerts_frozen": 0, "alerts_pruned": 0}
+    old_semesters = [
+        semester for (semester,) in db.query(Course.semester_session_id).filter(
+            Course.semester_session_id < semester_session_id
+        ).distinct().order_by(Course.semester_session_id)
+    ]
+    now = datetime.now(timezone.utc)
+    for semester in old_semesters:
+        try:
+            result = _archive_semester(db, semester, now)
+            db.commit()
+        except Exception:
+            db.rollback()
+            logger.exception(f"Archiving semester {semester} failed")
+            raise
+        logger.info(f"Archived semester {semester}: {result}")
+        totals["semesters"] += 1
+        for key, value in result.items():
+            totals[key] += value
+
+    SECTIONS_ARCHIVED.inc(totals["sections"])
+    ALERTS_ARCHIVED.labels("frozen").inc(totals["alerts_frozen"])
+    ALERTS_ARCHIVED.labels("pruned").inc(totals["alerts_pruned"])
+    return totals
+
+
+def archive_superseded(db: Session, feed_semesters: Iterable[int]) -> Optional[Dict[str, int]]:
+    """
+    Archive semesters older than every semester in the feed, when there are
+    any; None when the hot table is already current
+    """
+    feed_semesters = set(feed_semesters)
+    if not ARCHIVE_ON_SYNC or not feed_semesters:
+        return None
+    oldest = min(feed_semesters)
+    if not db.query(Course.id).filter(Course.semester_session_id < oldest).first():
+        return None
+    return archive_semesters_before(db, oldest)
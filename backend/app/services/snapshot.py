@@ -0,0 +1,163 @@
+from datetime import datetime, timezone
+from functools import cached_property
+from typing import List, Dict, Any, Optional, Tuple
+import logging
+import marshal
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import zlib
+from app.services.schedule_engine import ScheduleIndex
+from app.services.exam_index import ExamIndex
+from app.services.occupancy_index import OccupancyIndex
+from app.services.section_index import SectionIndex
+from app.services.rule_engine import SectionTable
+
+logger = logging.getLogger(__name__)
+
+
+class CourseSnapshot:
+    """
+    One download of the upstream feed plus the indexes derived from it.
+    Snapshots are never mutated; each index is built on first use and
+    shared by every request that sees the same snapshot version.
+    """
+
+    def __init__(self, raw_courses: List[Dict[str, Any]], version: int, fetched_at: Optional[datetime] = None):
+        self.raw_courses = raw_courses
+        self.version = version
+        self.fetched_at = fetched_at or datetime.now(timezone.utc)
+
+    @property
+    def cache_key(self) -> str:
+        """Identifies this snapshot in shared caches, where versions of different nodes can collide"""
+        return f"{self.version}-{int(self.fetched_at.timestamp() * 1000)}"
+
+    @property
+    def age_seconds(self) -> float:
+        return (datetime.now(timezone.utc) - self.fetched_at).total_seconds()
+
+    @cached_property
+    def schedule_index(self) -> ScheduleIndex:
+        return ScheduleIndex.from_raw_courses(self.raw_courses)
+
+    @cached_property
+    def exam_index(self) -> ExamIndex:
+        return ExamIndex.from_raw_courses(self.raw_courses)
+
+    @cached_property
+    def occupancy_index(self) -> OccupancyIndex:
+        return OccupancyIndex.from_raw_courses(self.raw_courses)
+
+    @cached_property
+    def section_index(self) -> SectionIndex:
+        return SectionIndex.from_raw_courses(self.raw_courses)
+
+    @cached_property
+    def section_table(self) -> SectionTable:
+        return SectionTable.from_raw_courses(self.raw_courses)
+
+
+class SnapshotFile:
+    """
+    A snapshot on local disk: shared by the workers of one host (the leader
+    writes, followers read) and kept across restarts for a warm start.
+
+    Layout: header (magic, marshal format, Python version, snapshot version,
+    fetched_at, payload length, CRC32 of the payload) followed by the feed
+    marshalled, which is about half the size of the JSON and the fastest
+    stdlib format to load. marshal's format may change between Python
+    versions, so a file written by another version is ignored.
+
+    The writer writes a complete new file and renames it over the old one,
+    so readers never see a partial write; a reader keeps its mapping until
+    the file is replaced and reads only the header to decide whether there
+    is anything new.
+
+    The mapping saves the read into a buffer, not the copy into objects:
+    marshal cannot be read in place, so every follower unmarshals the
+    payload into its own copy of the feed (tens of milliseconds per new
+    version). That is still far cheaper than each worker downloading and
+    parsing the feed, but it is blocking work: call read() from a thread.
+    """
+
+    MAGIC = b"SEATZSN2"
+    HEADER = struct.Struct("<8sHHQdQI")
+    PYTHON_VERSION = sys.version_info[0] * 100 + sys.version_info[1]
+
+    def __init__(self, path: str):
+        self.path = path
+        self._mmap: Optional[mmap.mmap] = None
+        self._inode: Optional[int] = None
+
+    def write(self, snapshot: CourseSnapshot):
+        payload = marshal.dumps(snapshot.raw_courses)
+        header = self.HEADER.pack(
+            self.MAGIC, marshal.version, self.PYTHON_VERSION, snapshot.version,
+            snapshot.fetched_at.timestamp(), len(payload), zlib.crc32(payload),
+        )
+        directory = os.path.dirname(self.path) or "."
+        os.makedirs(directory, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".snapshot-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(header)
+                f.write(payload)
+            os.replace(temp_path, self.path)
+        except Exception:
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+            raise
+
+    def _attach(self) -> bool:
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return False
+        if stat.st_ino == self._inode and self._mmap is not None:
+            return True
+        self.close()
+        with open(self.path, "rb") as f:
+            if os.fstat(f.fileno()).st_size < self.HEADER.size:
+                return False
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self._inode = os.fstat(f.fileno()).st_ino
+        return True
+
+    def _header(self):
+        """(version, fetched_at, payload length, crc) if the file is readable by this process"""
+        if not self._attach():
+            return None
+        magic, marshal_version, python_version, version, fetched_at, length, crc = self.HEADER.unpack_from(
+            self._mmap, 0
+        )
+        if magic != self.MAGIC or marshal_version != marshal.version or python_version != self.PYTHON_VERSION:
+            return None
+        return version, datetime.fromtimestamp(fetched_at, tz=timezone.utc), length, crc
+
+    def header(self) -> Optional[Tuple[int, datetime]]:
+        """(version, fetched_at) of the stored snapshot, or None"""
+        header = self._header()
+        return header[:2] if header else None
+
+    def read(self, newer_than: int = 0) -> Optional[CourseSnapshot]:
+        """The stored snapshot if its version is above `newer_than` (a private copy; blocking)"""
+        header = self._header()
+        if header is None:
+            return None
+        version, fetched_at, length, crc = header
+        if version <= newer_than:
+            return None
+        payload = self._mmap[self.HEADER.size:self.HEADER.size + length]
+        if len(payload) != length or zlib.crc32(payload) != crc:
+            logger.warning(f"Ignoring corrupt snapshot file {self.path}")
+            return None
+        return CourseSnapshot(marshal.loads(payload), version, fetched_at)
+
+    def close(self):
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+            self._inode = None
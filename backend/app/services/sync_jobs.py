@@ -0,0 +1,365 @@
+"""
+Course sync jobs.
+
+Every course sync (the manual trigger, sync-now and the scheduled job) runs
+through one SyncJobManager, which:
+
+- gives each job its own database session, so a job outlives the request
+  that started it;
+- runs at most one job at a time: a trigger while a job is running on this
+  worker, or a recent one on another worker, joins that job instead of
+  starting a second full sync over the same rows. A job is claimed by
+  inserting its running row, which the uq_sync_runs_running partial index
+  allows only once, so two workers starting together cannot both win;
+- records each job in `sync_runs` (trigger, status, phase timings, row
+  counts, error) when it starts and when it finishes.
+
+Live progress (phase, sections processed) is kept in memory by the worker
+running the job and served from there; other workers serve the sync_runs
+row. The sync holds the single SQLite writer connection while it upserts,
+so progress is not written to the database mid-run. Cancellation is
+checked between sections: from memory on the running worker, and from the
+row's cancel_requested flag every CANCEL_CHECK_EVERY sections, so a cancel
+request can land on any worker.
+"""
+import asyncio
+import os
+import uuid
+from datetime import datetime, timedelta, timezone
+from time import perf_counter
+from typing import Any, Dict, List, Optional, Tuple
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.database import IS_SQLITE, ReadSessionLocal, SessionLocal, engine, read_engine
+from app.metrics import SYNC_RUNS, SYNC_TRIGGERS_COALESCED
+from app.models.sync_run import SyncRun, CANCELLED, FAILED, RUNNING, SUCCEEDED
+import logging
+
+logger = logging.getLogger(__name__)
+
+# A running job older than this is assumed to have died with its worker
+SYNC_JOB_STALE_MINUTES = float(os.getenv("SYNC_JOB_STALE_MINUTES", "30"))
+# Finished runs kept in sync_runs
+SYNC_RUNS_KEEP = int(os.getenv("SYNC_RUNS_KEEP", "500"))
+
+# Sections between checks of the cancel_requested flag in the database
+CANCEL_CHECK_EVERY = 250
+# Tries at claiming a run that another worker keeps claiming first
+CLAIM_ATTEMPTS = 3
+
+
+class SyncCancelled(Exception):
+    """Raised inside a sync when its job was cancelled"""
+
+
+class SyncJob:
+    """One sync run in this worker; sync_courses_to_db reports its progress here"""
+
+    def __init__(self, trigger: str):
+        self.id = uuid.uuid4().hex
+        self.trigger = trigger
+        self.status = RUNNING
+        self.phase: Optional[str] = None
+        self.started_at = datetime.now(timezone.utc)
+        self.finished_at: Optional[datetime] = None
+        self.phase_seconds: Dict[str, float] = {}
+        self.sections_total: Optional[int] = None
+        self.processed = 0
+        self.stats: Dict[str, int] = {}
+        self.error: Optional[str] = None
+        self.cancel_requested = False
+        self.task: Optional[asyncio.Task] = None
+        self._phase_start = perf_counter()
+
+    # Progress hooks
+
+    def enter_phase(self, phase: str):
+        self._close_phase()
+        self.phase = phase
+        self._phase_start = perf_counter()
+
+    def _close_phase(self):
+        if self.phase is not None:
+            self.phase_seconds[self.phase] = round(perf_counter() - self._phase_start, 3)
+
+    def set_total(self, sections_total: int):
+        self.sections_total = sections_total
+
+    def advance(self):
+        """Count one section; raises SyncCancelled once the job is cancelled"""
+        if self.processed % CANCEL_CHECK_EVERY == 0 and not self.cancel_requested:
+            self.cancel_requested = _cancel_requested(self.id)
+        if self.cancel_requested:
+            raise SyncCancelled()
+        self.processed += 1
+
+    def fail(self, error: str):
+        self.error = error
+
+    # Reporting
+
+    def to_dict(self) -> Dict[str, Any]:
+        return _describe(
+            self.id, self.trigger, self.status, self.phase, self.cancel_requested, self.started_at,
+            self.finished_at, self.phase_seconds, self.sections_total, self.processed, self.stats, self.error,
+        )
+
+
+def _describe(
+    job_id, trigger, status, phase, cancel_requested, started_at, finished_at, phase_seconds,
+    sections_total, processed, stats, error,
+) -> Dict[str, Any]:
+    elapsed = ((finished_at or datetime.now(timezone.utc)) - started_at).total_seconds()
+    return {
+        "job_id": job_id,
+        "trigger": trigger,
+        "status": status,
+        "phase": phase,
+        "cancel_requested": cancel_requested,
+        "started_at": started_at,
+        "finished_at": finished_at,
+        "elapsed_seconds": round(elapsed, 3),
+        "phase_seconds": phase_seconds or {},
+        "sections_total": sections_total,
+        "processed": processed or 0,
+        "progress": round(processed / sections_total, 4) if sections_total and processed else 0.0,
+        "added": stats.get("added", 0),
+        "updated": stats.get("updated", 0),
+        "failed": stats.get("failed", 0),
+        "archived": stats.get("archived", 0),
+        "error": error,
+    }
+
+
+def _aware(value: Optional[datetime]) -> Optional[datetime]:
+    # SQLite returns naive datetimes for timezone-aware columns
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def _row_dict(run: SyncRun) -> Dict[str, Any]:
+    stats = {"added": run.added, "updated": run.updated, "failed": run.failed, "archived": run.archived}
+    return _describe(
+        run.id, run.trigger, run.status, run.phase, run.cancel_requested, _aware(run.started_at),
+        _aware(run.finished_at), run.phase_seconds, run.sections_total, run.processed,
+        {key: value or 0 for key, value in stats.items()}, run.error,
+    )
+
+
+def _cancel_requested(job_id: str) -> bool:
+    # The read pool, so the check never waits on the sync's own writer
+    # connection; an in-memory SQLite database has no separate read pool and
+    # only takes cancel requests from its own worker
+    if IS_SQLITE and read_engine is engine:
+        return False
+    db = ReadSessionLocal()
+    try:
+        return bool(db.query(SyncRun.cancel_requested).filter(SyncRun.id == job_id).scalar())
+    finally:
+        db.close()
+
+
+class SyncJobManager:
+    def __init__(self):
+        self._current: Optional[SyncJob] = None
+
+    @property
+    def current(self) -> Optional[SyncJob]:
+        """The job running on this worker, if any"""
+        if self._current is not None and self._current.status == RUNNING:
+            return self._current
+        return None
+
+    async def start(self, trigger: str) -> Tuple[Dict[str, Any], bool]:
+        """
+        Start a sync job, or join the one already running.
+        Returns (job, whether a new job was started).
+        """
+        current = self.current
+        if current is not None:
+            SYNC_TRIGGERS_COALESCED.inc()
+            return current.to_dict(), False
+
+        job = self._current = SyncJob(trigger)
+        try:
+            for _ in range(CLAIM_ATTEMPTS):
+                elsewhere = self._running_elsewhere()
+                if elsewhere is not None:
+                    self._current = None
+                    SYNC_TRIGGERS_COALESCED.inc()
+                    return elsewhere, False
+                # Another worker may claim the run between the check and this insert
+                if self._record_start(job):
+                    break
+            else:
+                raise RuntimeError("Could not claim the sync run")
+        except Exception:
+            self._current = None
+            raise
+
+        job.task = asyncio.create_task(self._run(job))
+        logger.info(f"Sync job {job.id} started ({trigger})")
+        return job.to_dict(), True
+
+    async def run(self, trigger: str) -> Tuple[Dict[str, Any], bool]:
+        """
+        Start (or join) a sync job and wait for it when it runs on this worker.
+        Returns (job, whether it finished); a job running on another worker
+        is returned still running.
+        """
+        job, _ = await self.start(trigger)
+        current = self.current
+        if current is None or current.id != job["job_id"]:
+            return job, job["status"] != RUNNING
+        await asyncio.shield(current.task)
+        return current.to_dict(), True
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        if self._current is not None and self._current.id == job_id:
+            return self._current.to_dict()
+        db = ReadSessionLocal()
+        try:
+            run = db.query(SyncRun).filter(SyncRun.id == job_id).first()
+            return _row_dict(run) if run else None
+        finally:
+            db.close()
+
+    def recent(self, db: Session, limit: int = 20) -> List[Dict[str, Any]]:
+        runs = db.query(SyncRun).order_by(SyncRun.started_at.desc()).limit(limit).all()
+        jobs = [_row_dict(run) for run in runs]
+        current = self.current
+        # Live progress for the job running here
+        return [current.to_dict() if current and job["job_id"] == current.id else job for job in jobs]
+
+    def last_finished(self, db: Session, status: str = SUCCEEDED) -> Optional[Dict[str, Any]]:
+        run = db.query(SyncRun).filter(SyncRun.status == status).order_by(
+            SyncRun.finished_at.desc()
+        ).first()
+        return _row_dict(run) if run else None
+
+    def running(self, db: Session) -> Optional[Dict[str, Any]]:
+        """The running job, live if on this worker, else as recorded by its worker"""
+        current = self.current
+        if current is not None:
+            return current.to_dict()
+        run = db.query(SyncRun).filter(SyncRun.status == RUNNING).order_by(SyncRun.started_at.desc()).first()
+        return _row_dict(run) if run else None
+
+    def cancel(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Ask a running job to stop at its next section. Returns the job, or None
+        if there is no such job. Finished jobs are returned unchanged.
+        """
+        current = self.current
+        if current is not None and current.id == job_id:
+            current.cancel_requested = True
+            return current.to_dict()
+        db = SessionLocal()
+        try:
+            run = db.query(SyncRun).filter(SyncRun.id == job_id).first()
+            if run is None:
+                return None
+            if run.status == RUNNING and not run.cancel_requested:
+                run.cancel_requested = True
+                db.commit()
+            return _row_dict(run)
+        finally:
+            db.close()
+
+    # Internals
+
+    def _running_elsewhere(self) -> Optional[Dict[str, Any]]:
+        """A recent running job of another worker; older ones are marked failed"""
+        db = SessionLocal()
+        try:
+            running = db.query(SyncRun).filter(SyncRun.status == RUNNING).all()
+            stale_before = datetime.now(timezone.utc) - timedelta(minutes=SYNC_JOB_STALE_MINUTES)
+            live = None
+            for run in running:
+                if _aware(run.started_at) < stale_before:
+                    run.status = FAILED
+                    run.finished_at = datetime.now(timezone.utc)
+                    run.error = "Abandoned: no result within SYNC_JOB_STALE_MINUTES"
+                    logger.warning(f"Sync job {run.id} abandoned by worker {run.worker_pid}")
+                else:
+                    live = _row_dict(run)
+            db.commit()
+            return live
+        finally:
+            db.close()
+
+    def _record_start(self, job: SyncJob) -> bool:
+        """Insert the job's running row; False if another job holds uq_sync_runs_running"""
+        db = SessionLocal()
+        try:
+            db.add(SyncRun(
+                id=job.id, trigger=job.trigger, status=RUNNING, worker_pid=os.getpid(),
+                started_at=job.started_at, processed=0,
+            ))
+            db.commit()
+            return True
+        except IntegrityError:
+            db.rollback()
+            return False
+        finally:
+            db.close()
+
+    def _record_finish(self, job: SyncJob, status: str):
+        db = SessionLocal()
+        try:
+            db.query(SyncRun).filter(SyncRun.id == job.id).update({
+                SyncRun.status: status,
+                SyncRun.phase: job.phase,
+                SyncRun.finished_at: job.finished_at,
+                SyncRun.phase_seconds: job.phase_seconds,
+                SyncRun.sections_total: job.sections_total,
+                SyncRun.processed: job.processed,
+                SyncRun.added: job.stats.get("added", 0),
+                SyncRun.updated: job.stats.get("updated", 0),
+                SyncRun.failed: job.stats.get("failed", 0),
+                SyncRun.archived: job.stats.get("archived", 0),
+                SyncRun.error: job.error,
+            }, synchronize_session=False)
+            # Keep the newest SYNC_RUNS_KEEP runs
+            cutoff = db.query(SyncRun.started_at).order_by(SyncRun.started_at.desc()).offset(
+                SYNC_RUNS_KEEP
+            ).limit(1).scalar()
+            if cutoff is not None:
+                db.query(SyncRun).filter(SyncRun.started_at <= cutoff, SyncRun.status != RUNNING).delete(
+                    synchronize_session=False
+                )
+            db.commit()
+        finally:
+            db.close()
+
+    async def _run(self, job: SyncJob):
+        from app.services.bracu_service import bracu_service
+
+        db = SessionLocal()
+        try:
+            job.stats = await bracu_service.sync_courses_to_db(db, progress=job)
+            status = FAILED if job.error else SUCCEEDED
+        except SyncCancelled:
+            status = CANCELLED
+            logger.info(f"Sync job {job.id} cancelled after {job.processed} sections")
+        except Exception as e:
+            status = FAILED
+            job.error = f"{type(e).__name__}: {e}"
+            logger.error(f"Sync job {job.id} failed: {e}")
+        finally:
+            db.close()
+            job._close_phase()
+            job.finished_at = datetime.now(timezone.utc)
+
+        try:
+            self._record_finish(job, status)
+        except Exception as e:
+            logger.error(f"Could not record sync job {job.id}: {e}")
+        # Only now can a new trigger start another job
+        job.status = status
+        SYNC_RUNS.labels(job.trigger, status).inc()
+        logger.info(f"Sync job {job.id} {status}: {job.stats}")
+
+# Global job manager instance
+sync_jobs = SyncJobManager()
@@ -0,0 +1,311 @@
+"""
+Webhook delivery of seat events.
+
+Every notification run groups its events by destination (URL and secret)
+and POSTs each group as one batch:
+
+    POST <webhook_url>
+    Content-Type: application/json
+    X-SeatZ-Delivery: <batch id, unchanged across retries>
+    X-SeatZ-Timestamp: <unix seconds of this attempt>
+    X-SeatZ-Signature: sha256=<hex HMAC-SHA256 of "<timestamp>.<body>">
+
+    {"delivery_id": "...", "sent_at": "...", "events": [{"type": "seat_available", ...}]}
+
+The signature is keyed by the user's webhook secret and only sent when one
+is set. Receivers should recompute it over the raw body and reject stale
+timestamps; tools/webhook_receiver.py does both.
+
+Batches go out concurrently over one pooled HTTP client, at most
+WEBHOOK_PER_DESTINATION_CONCURRENCY at a time per webhook URL and
+WEBHOOK_MAX_CONNECTIONS overall. Timeouts, connection errors, 408, 429 and
+5xx responses are retried with jittered exponential backoff (honouring
+Retry-After); other 4xx responses fail the batch immediately. A run stops
+waiting after WEBHOOK_DELIVERY_DEADLINE_SECONDS; batches still retrying
+then are cancelled and count as failed.
+
+Webhook URLs are user input, so the host must resolve to public addresses
+only: loopback, private, link-local (cloud metadata endpoints), shared and
+reserved ranges are rejected when a URL is set and again before every
+delivery, and the request is sent to the address that was checked (a DNS
+answer that changes in between cannot redirect it). Redirects are not
+followed. WEBHOOK_ALLOW_PRIVATE_HOSTS=true lifts the address check for
+local development.
+"""
+import asyncio
+import hashlib
+import hmac
+import ipaddress
+import json
+import os
+import random
+import socket
+import time
+import uuid
+from datetime import datetime, timezone
+from urllib.parse import urlsplit, urlunsplit
+from time import perf_counter
+from typing import List, Dict, Any, Optional, Tuple, Union
+import httpx
+import logging
+from app.metrics import WEBHOOK_DELIVERIES, WEBHOOK_DELIVERY_DURATION, WEBHOOK_EVENTS, WEBHOOK_RETRIES
+
+logger = logging.getLogger(__name__)
+
+SIGNATURE_HEADER = "X-SeatZ-Signature"
+TIMESTAMP_HEADER = "X-SeatZ-Timestamp"
+DELIVERY_HEADER = "X-SeatZ-Delivery"
+
+RETRYABLE_STATUSES = {408, 429}
+
+IPAddress = Union[ipaddress.IPv4Address, ipaddress.IPv6Address]
+
+# Metadata endpoints outside the ranges is_global already excludes
+METADATA_ADDRESSES = {ipaddress.ip_address("fd00:ec2::254")}
+
+
+class UnsafeWebhookURL(ValueError):
+    """A webhook URL that is malformed, does not resolve or points at a non-public address"""
+
+
+def _is_public(address: IPAddress) -> bool:
+    if address.version == 6 and address.ipv4_mapped:
+        address = address.ipv4_mapped
+    return address.is_global and not address.is_multicast and address not in METADATA_ADDRESSES
+
+
+async def resolve_webhook_url(url: str, allow_private: bool = False) -> IPAddress:
+    """
+    The address to deliver a webhook URL to. Raises UnsafeWebhookURL unless
+    every address its host resolves to is public (or `allow_private`).
+    """
+    parts = urlsplit(url)
+    try:
+        port = parts.port or (443 if parts.scheme == "https" else 80)
+    except ValueError:
+        raise UnsafeWebhookURL("Invalid port")
+    if parts.scheme not in ("http", "https") or not parts.hostname:
+        raise UnsafeWebhookURL("Webhook URL must be http(s)://host/...")
+    try:
+        infos = await asyncio.get_running_loop().getaddrinfo(parts.hostname, port, type=socket.SOCK_STREAM)
+    except (socket.gaierror, UnicodeError):
+        raise UnsafeWebhookURL(f"Cannot resolve {parts.hostname}")
+    # Drop IPv6 zone ids ("fe80::1%eth0")
+    addresses = [ipaddress.ip_address(info[4][0].split("%")[0]) for info in infos]
+    if not addresses:
+        raise UnsafeWebhookURL(f"Cannot resolve {parts.hostname}")
+    if not allow_private:
+        blocked = [address for address in addresses if not _is_public(address)]
+        if blocked:
+            raise UnsafeWebhookURL(f"{parts.hostname} resolves to a non-public address ({blocked[0]})")
+    return addresses[0]
+
+
+def _pinned(url: str, address: IPAddress) -> Tuple[str, Dict[str, str], Dict[str, str]]:
+    """(URL with the host replaced by `address`, Host header, request extensions) for `url`"""
+    parts = urlsplit(url)
+    host = f"[{address}]" if address.version == 6 else str(address)
+    netloc = f"{host}:{parts.port}" if parts.port else host
+    host_header = f"{parts.hostname}:{parts.port}" if parts.port else parts.hostname
+    # TLS still verifies the certificate against the original host name
+    extensions = {"sni_hostname": parts.hostname} if parts.scheme == "https" else {}
+    return urlunsplit(parts._replace(netloc=netloc)), {"Host": host_header}, extensions
+
+
+def sign(secret: str, timestamp: str, body: bytes) -> str:
+    """Signature header value for a body sent at `timestamp`"""
+    digest = hmac.new(secret.encode(), timestamp.encode() + b"." + body, hashlib.sha256).hexdigest()
+    return f"sha256={digest}"
+
+
+def verify(secret: str, timestamp: str, body: bytes, signature: str) -> bool:
+    return hmac.compare_digest(sign(secret, timestamp, body), signature or "")
+
+
+def seat_event(alert_id: int, course_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Webhook event for an alert that fired on a section"""
+    return {
+        "type": "seat_available",
+        "alert_id": alert_id,
+        "section_id": course_data.get("section_id"),
+        "course_code": course_data.get("course_code"),
+        "section_name": course_data.get("section_name"),
+        "available_seats": course_data.get("available_seats"),
+        "capacity": course_data.get("capacity"),
+        "room_name": course_data.get("room_name"),
+        "faculties": course_data.get("faculties"),
+    }
+
+
+class WebhookService:
+    def __init__(self):
+        self.timeout = float(os.getenv("WEBHOOK_TIMEOUT_SECONDS", "10"))
+        self.max_attempts = max(int(os.getenv("WEBHOOK_MAX_ATTEMPTS", "4")), 1)
+        self.retry_base_seconds = float(os.getenv("WEBHOOK_RETRY_BASE_SECONDS", "1"))
+        self.retry_max_seconds = float(os.getenv("WEBHOOK_RETRY_MAX_SECONDS", "30"))
+        self.max_connections = int(os.getenv("WEBHOOK_MAX_CONNECTIONS", "100"))
+        self.per_destination_concurrency = int(os.getenv("WEBHOOK_PER_DESTINATION_CONCURRENCY", "4"))
+        self.batch_max_events = int(os.getenv("WEBHOOK_BATCH_MAX_EVENTS", "100"))
+        self.delivery_deadline_seconds = float(os.getenv("WEBHOOK_DELIVERY_DEADLINE_SECONDS", "20"))
+        self.allow_private_hosts = os.getenv("WEBHOOK_ALLOW_PRIVATE_HOSTS", "false").lower() == "true"
+
+        # The client and semaphores belong to the event loop that created them
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._client: Optional[httpx.AsyncClient] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._destination_slots: Dict[str, asyncio.Semaphore] = {}
+
+    def _ensure_client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._loop is not loop:
+            self._loop = loop
+            self._client = httpx.AsyncClient(
+                # Waiting for a pool slot is bounded by the semaphores, not the timeout
+                timeout=httpx.Timeout(self.timeout, pool=None),
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                ),
+                headers={"User-Agent": "SeatZ-Webhooks/1.0"},
+            )
+            self._slots = asyncio.Semaphore(self.max_connections)
+            self._destination_slots = {}
+        return self._client
+
+    def _destination_slot(self, url: str) -> asyncio.Semaphore:
+        slot = self._destination_slots.get(url)
+        if slot is None:
+            slot = self._destination_slots[url] = asyncio.Semaphore(self.per_destination_concurrency)
+        return slot
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def check_url(self, url: str):
+        """Raise UnsafeWebhookURL if `url` may not receive webhooks"""
+        await resolve_webhook_url(url, self.allow_private_hosts)
+
+    def _backoff(self, attempt: int, retry_after: Optional[str]) -> float:
+        if retry_after and retry_after.isdigit():
+            return min(float(retry_after), self.retry_max_seconds)
+        # Full jitter keeps retries from a failing destination from synchronising
+        return random.uniform(0, min(self.retry_base_seconds * 2 ** (attempt - 1), self.retry_max_seconds))
+
+    async def post(self, url: str, secret: Optional[str], events: List[Dict[str, Any]]) -> Tuple[bool, Optional[int]]:
+        """
+        POST one batch of events, retrying transient failures.
+        Returns (delivered, last HTTP status or None if no response).
+        """
+        client = self._ensure_client()
+        try:
+            address = await resolve_webhook_url(url, self.allow_private_hosts)
+        except UnsafeWebhookURL as e:
+            logger.warning(f"Webhook {url} refused: {e}")
+            return False, None
+        target, host_header, extensions = _pinned(url, address)
+        delivery_id = uuid.uuid4().hex
+        body = json.dumps({
+            "delivery_id": delivery_id,
+            "sent_at": datetime.now(timezone.utc).isoformat(),
+            "events": events,
+        }).encode()
+
+        status = None
+        async with self._destination_slot(url):
+            for attempt in range(1, self.max_attempts + 1):
+                timestamp = str(int(time.time()))
+                headers = {
+                    **host_header,
+                    "Content-Type": "application/json",
+                    DELIVERY_HEADER: delivery_id,
+                    TIMESTAMP_HEADER: timestamp,
+                }
+                if secret:
+                    headers[SIGNATURE_HEADER] = sign(secret, timestamp, body)
+
+                retry_after = None
+                start = perf_counter()
+                try:
+                    async with self._slots:
+                        response = await client.post(target, content=body, headers=headers, extensions=extensions)
+                    status = response.status_code
+                    if response.is_success:
+                        return True, status
+                    if status < 500 and status not in RETRYABLE_STATUSES:
+                        logger.warning(f"Webhook {url} rejected delivery {delivery_id} with HTTP {status}")
+                        return False, status
+                    retry_after = response.headers.get("Retry-After")
+                    error = f"HTTP {status}"
+                except httpx.HTTPError as e:
+                    error = f"{type(e).__name__}: {e}"
+                finally:
+                    WEBHOOK_DELIVERY_DURATION.observe(perf_counter() - start)
+
+                if attempt == self.max_attempts:
+                    logger.warning(f"Webhook {url} failed after {attempt} attempts: {error}")
+                    break
+                WEBHOOK_RETRIES.inc()
+                # The destination's slot stays held, so a failing endpoint gets no extra concurrency
+                await asyncio.sleep(self._backoff(attempt, retry_after))
+        return False, status
+
+    async def deliver(self, deliveries: List[Dict[str, Any]]) -> Dict[str, int]:
+        """
+        Send events, one batched POST per destination (split every
+        WEBHOOK_BATCH_MAX_EVENTS events).
+        deliveries: {"url", "secret", "event"} dicts.
+        Returns event and request counts and, under "delivered", the
+        positions in `deliveries` of the events that were delivered.
+        """
+        results = {"sent": 0, "failed": 0, "requests": 0, "delivered": []}
+        if not deliveries:
+            return results
+
+        # destination -> positions of its events in `deliveries`
+        batches: Dict[Tuple[str, Optional[str]], List[int]] = {}
+        for position, delivery in enumerate(deliveries):
+            batches.setdefault((delivery["url"], delivery.get("secret")), []).append(position)
+
+        posts = []
+        for (url, secret), positions in batches.items():
+            for start in range(0, len(positions), self.batch_max_events):
+                posts.append((url, secret, positions[start:start + self.batch_max_events]))
+
+        tasks = [
+            asyncio.ensure_future(
+                self.post(url, secret, [deliveries[position]["event"] for position in positions])
+            )
+            for url, secret, positions in posts
+        ]
+        # One dead endpoint retrying must not hold up the notification run
+        _, pending = await asyncio.wait(tasks, timeout=self.delivery_deadline_seconds)
+        for task in pending:
+            task.cancel()
+        outcomes = await asyncio.gather(*tasks, return_exceptions=True)
+        for (url, _, positions), outcome in zip(posts, outcomes):
+            if isinstance(outcome, asyncio.CancelledError):
+                logger.warning(f"Webhook delivery to {url} missed the {self.delivery_deadline_seconds}s deadline")
+                delivered = False
+            elif isinstance(outcome, BaseException):
+                logger.error(f"Webhook delivery to {url} crashed: {outcome}")
+                delivered = False
+            else:
+                delivered = outcome[0]
+            result = "delivered" if delivered else "failed"
+            WEBHOOK_DELIVERIES.labels(result).inc()
+            WEBHOOK_EVENTS.labels(result).inc(len(positions))
+            results["sent" if delivered else "failed"] += len(positions)
+            if delivered:
+                results["delivered"].extend(positions)
+        results["requests"] = len(posts)
+
+        logger.info(
+            f"Webhook deliveries completed: {results['sent']} sent, {results['failed']} failed "
+            f"in {results['requests']} requests"
+        )
+        return results
+
+# Global service instance
+webhook_service = WebhookService()
@@ -0,0 +1 @@
+"""Offline performance benchmarks for the SeatZ backend (see README.md)"""
@@ -0,0 +1,552 @@
+"""
+Benchmark cases. Each case receives a BenchmarkEnv for one feed scale and
+returns a Measurement: the callable to time, an optional untimed reset that
+runs before every repetition, and the number of logical operations per run.
+"""
+import asyncio
+import os
+from typing import Callable, Dict, Any, Optional, List
+
+from benchmarks.fixtures import seed_alerts, synthetic_rules
+
+CASES: Dict[str, Dict[str, Any]] = {}
+
+SEARCH_QUERIES = ["CSE", "CSE110", "mat", "ENG1", "XYZ999"]
+EMAIL_RENDER_COUNT = 1000
+WEBHOOK_EVENT_COUNT = 2000
+WEBHOOK_DESTINATIONS = 200
+
+
+class Measurement:
+    def __init__(self, run: Callable, ops: int, reset: Optional[Callable] = None):
+        self.run = run
+        self.ops = ops
+        self.reset = reset
+
+
+class BenchmarkEnv:
+    """State shared by the cases of one scale (one process, one database)"""
+
+    def __init__(self, rows: List[Dict[str, Any]], alert_count: int):
+        self.rows = rows
+        self.alert_count = alert_count
+        self.loop = asyncio.new_event_loop()
+        self._synced = False
+        self._alerts_seeded = False
+        self._simulator = None
+        self._receiver = None
+
+    def run_async(self, coroutine):
+        return self.loop.run_until_complete(coroutine)
+
+    def realtime_service(self):
+        """A RealtimeService whose upstream fetch returns the fixture rows"""
+        from app.services.realtime_service import RealtimeService
+
+        service = RealtimeService()
+        rows = self.rows
+
+        async def fetch_realtime_courses():
+            return rows
+
+        service.fetch_realtime_courses = fetch_realtime_courses
+        return service
+
+    def bracu_service(self):
+        from app.services.bracu_service import BracuConnectService
+
+        service = BracuConnectService()
+        rows = self.rows
+
+        async def fetch_course_data():
+            return rows
+
+        service.fetch_course_data = fetch_course_data
+        return service
+
+    def upstream_simulator(self):
+        """A local upstream serving the fixture rows, stopped at interpreter exit"""
+        if self._simulator is None:
+            import atexit
+            from tools.upstream_simulator import UpstreamSimulator
+
+            self._simulator = UpstreamSimulator(sections=self.rows).start()
+            atexit.register(self._simulator.stop)
+        return self._simulator
+
+    def webhook_receiver(self):
+        """A local webhook receiver, stopped at interpreter exit"""
+        if self._receiver is None:
+            import atexit
+            from tools.webhook_receiver import WebhookReceiver
+
+            self._receiver = WebhookReceiver(secret="benchmark-webhook-secret").start()
+            atexit.register(self._receiver.stop)
+        return self._receiver
+
+    def session(self):
+        from app.database import SessionLocal
+        return SessionLocal()
+
+    def ensure_synced(self):
+        if not self._synced:
+            from app.database import create_tables
+            create_tables()
+            db = self.session()
+            try:
+                self.run_async(self.bracu_service().sync_courses_to_db(db))
+            finally:
+                db.close()
+            self._synced = True
+
+    def ensure_alerts(self):
+        self.ensure_synced()
+        if not self._alerts_seeded:
+            db = self.session()
+            try:
+                seed_alerts(db, self.alert_count)
+            finally:
+                db.close()
+            self._alerts_seeded = True
+
+
+def benchmark(name: str, uses_db: bool = False):
+    def register(factory):
+        CASES[name] = {"factory": factory, "uses_db": uses_db}
+        return factory
+    return register
+
+
+@benchmark("realtime.transform_course_data")
+def transform_course_data(env: BenchmarkEnv) -> Measurement:
+    service = env.realtime_service()
+    rows = env.rows
+
+    def run():
+        for raw_course in rows:
+            service.transform_course_data(raw_course)
+
+    return Measurement(run, ops=len(rows))
+
+
+@benchmark("realtime.get_courses")
+def realtime_get_courses(env: BenchmarkEnv) -> Measurement:
+    service = env.realtime_service()
+    return Measurement(lambda: env.run_async(service.get_courses()), ops=len(env.rows))
+
+
+@benchmark("upstream.fetch_realtime_courses")
+def upstream_fetch(env: BenchmarkEnv) -> Measurement:
+    """HTTP download and JSON parse of the feed from the local upstream simulator"""
+    from app.services.realtime_service import RealtimeService
+
+    simulator = env.upstream_simulator()
+    service = RealtimeService()
+    service.base_url = simulator.feed_url
+    return Measurement(lambda: env.run_async(service.fetch_realtime_courses()), ops=len(env.rows))
+
+
+@benchmark("realtime.search_courses")
+def realtime_search(env: BenchmarkEnv) -> Measurement:
+    service = env.realtime_service()
+
+    def run():
+        for query in SEARCH_QUERIES:
+            env.run_async(service.search_courses(query))
+
+    return Measurement(run, ops=len(SEARCH_QUERIES))
+
+
+@benchmark("realtime.stats")
+def realtime_stats(env: BenchmarkEnv) -> Measurement:
+    from fastapi import Response
+    from app.cache import cache
+    from app.routers import realtime as realtime_router
+
+    service = env.realtime_service()
+
+    def run():
+        original = realtime_router.realtime_service
+        realtime_router.realtime_service = service
+        try:
+            env.run_async(realtime_router.get_realtime_stats(Response()))
+        finally:
+            realtime_router.realtime_service = original
+
+    # Measure the computation, not a hit in the per-snapshot stats cache
+    return Measurement(run, ops=1, reset=lambda: env.run_async(cache.clear("realtime_stats")))
+
+
+@benchmark("snapshot.build_indexes")
+def snapshot_indexes(env: BenchmarkEnv) -> Measurement:
+    from app.services.snapshot import CourseSnapshot
+
+    def run():
+        snapshot = CourseSnapshot(env.rows, version=1)
+        snapshot.schedule_index
+        snapshot.exam_index
+        snapshot.occupancy_index
+        snapshot.section_index
+
+    return Measurement(run, ops=len(env.rows))
+
+
+@benchmark("snapshot.file_load")
+def snapshot_file_load(env: BenchmarkEnv) -> Measurement:
+    """Loading the persisted snapshot file, as a warm start does"""
+    import atexit
+    import shutil
+    import tempfile
+    from app.services.snapshot import CourseSnapshot, SnapshotFile
+
+    directory = tempfile.mkdtemp(prefix="seatz-bench-")
+    atexit.register(shutil.rmtree, directory, True)
+    path = os.path.join(directory, "snapshot.bin")
+    SnapshotFile(path).write(CourseSnapshot(env.rows, version=1))
+
+    def run():
+        snapshot_file = SnapshotFile(path)
+        try:
+            assert snapshot_file.read() is not None
+        finally:
+            snapshot_file.close()
+
+    return Measurement(run, ops=len(env.rows))
+
+
+@benchmark("realtime.sections_by_code")
+def realtime_sections_by_code(env: BenchmarkEnv) -> Measurement:
+    service = env.realtime_service()
+    codes = sorted({row["courseCode"] for row in env.rows})[:50]
+
+    def run():
+        for code in codes:
+            env.run_async(service.get_sections_by_code(code))
+
+    return Measurement(run, ops=len(codes))
+
+
+@benchmark("email.render_seat_available")
+def email_render(env: BenchmarkEnv) -> Measurement:
+    from app.services.email_service import EmailService
+
+    service = EmailService()
+    courses = [
+        {
+            "course_code": raw.get("courseCode"),
+            "section_name": raw.get("sectionName"),
+            "available_seats": 1,
+            "capacity": raw.get("capacity"),
+            "room_name": raw.get("roomName"),
+            "faculties": raw.get("faculties"),
+            "schedule_data": raw.get("sectionSchedule"),
+        }
+        for raw in env.rows[:EMAIL_RENDER_COUNT]
+    ]
+
+    def run():
+        for index, course_data in enumerate(courses):
+            service.create_seat_available_email(f"student{index}@example.com", course_data)
+
+    return Measurement(run, ops=len(courses))
+
+
+@benchmark("webhooks.deliver")
+def webhooks_deliver(env: BenchmarkEnv) -> Measurement:
+    """Signed, batched delivery of seat events to the local webhook receiver"""
+    from app.services.webhook_service import WebhookService, seat_event
+
+    receiver = env.webhook_receiver()
+    service = WebhookService()
+    # The receiver listens on localhost
+    service.allow_private_hosts = True
+    deliveries = [
+        {
+            "url": f"{receiver.url}/{index % WEBHOOK_DESTINATIONS}",
+            "secret": receiver.secret,
+            "event": seat_event(index, {
+                "section_id": raw.get("sectionId"),
+                "course_code": raw.get("courseCode"),
+                "section_name": raw.get("sectionName"),
+                "available_seats": 1,
+                "capacity": raw.get("capacity"),
+            }),
+        }
+        for index, raw in enumerate(env.rows[:WEBHOOK_EVENT_COUNT])
+    ]
+    return Measurement(lambda: env.run_async(service.deliver(deliveries)), ops=len(deliveries))
+
+
+@benchmark("ingest.process_course_data", uses_db=True)
+def process_course_data(env: BenchmarkEnv) -> Measurement:
+    env.ensure_synced()
+    service = env.bracu_service()
+    db = env.session()
+
+    def run():
+        try:
+            for raw_course in env.rows:
+                service.process_course_data(raw_course, db)
+        finally:
+            db.rollback()
+
+    return Measurement(run, ops=len(env.rows))
+
+
+@benchmark("ingest.sync_courses_to_db", uses_db=True)
+def sync_courses_to_db(env: BenchmarkEnv) -> Measurement:
+    env.ensure_synced()
+    service = env.bracu_service()
+
+    def run():
+        db = env.session()
+        try:
+            env.run_async(service.sync_courses_to_db(db))
+        finally:
+            db.close()
+
+    return Measurement(run, ops=len(env.rows))
+
+
+@benchmark("courses.stats_overview", uses_db=True)
+def course_stats(env: BenchmarkEnv) -> Measurement:
+    from app.cache import cache
+    from app.routers.courses import get_course_stats
+
+    env.ensure_synced()
+
+    def run():
+        db = env.session()
+        try:
+            env.run_async(get_course_stats(semester_session_id=None, db=db))
+        finally:
+            db.close()
+
+    return Measurement(run, ops=1, reset=lambda: env.run_async(cache.clear("course_stats")))
+
+
+def _api_client():
+    # No context manager: the app's lifespan (migrations, leader election) is not run
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    return TestClient(app)
+
+
+@benchmark("api.courses_list", uses_db=True)
+def api_courses_list(env: BenchmarkEnv) -> Measurement:
+    """GET /api/courses/?limit=1000 through the app, serialization included"""
+    env.ensure_synced()
+    client = _api_client()
+
+    def run():
+        response = client.get("/api/courses/", params={"limit": 1000})
+        assert response.status_code == 200
+
+    return Measurement(run, ops=1)
+
+
+@benchmark("api.courses_slot_filter", uses_db=True)
+def api_courses_slot_filter(env: BenchmarkEnv) -> Measurement:
+    """GET /api/courses/ for open sections meeting on Sunday after 14:00, and for sections without Saturday labs"""
+    env.ensure_synced()
+    client = _api_client()
+    queries = [
+        {"days": "SUNDAY", "start_after": "14:00", "available_only": True, "limit": 1000},
+        {"exclude_days": "SATURDAY", "slot_kind": "LAB", "limit": 1000},
+    ]
+
+    def run():
+        for params in queries:
+            response = client.get("/api/courses/", params=params)
+            assert response.status_code == 200
+
+    return Measurement(run, ops=len(queries))
+
+
+@benchmark("api.alerts_bulk_create", uses_db=True)
+def api_alerts_bulk_create(env: BenchmarkEnv) -> Measurement:
+    """POST /api/alerts/bulk: a new user by email and 100 section alerts in one request"""
+    from app.models.alert import Alert
+    from app.models.course import Course
+    from app.models.user import User
+
+    env.ensure_synced()
+    client = _api_client()
+    email = "bench-bulk@example.com"
+    db = env.session()
+    try:
+        course_ids = [course_id for (course_id,) in db.query(Course.id).order_by(Course.id).limit(100)]
+    finally:
+        db.close()
+    body = {"email": email, "alerts": [{"course_id": course_id} for course_id in course_ids]}
+
+    def reset():
+        db = env.session()
+        try:
+            user_ids = db.query(User.id).filter(User.email == email).scalar_subquery()
+            db.query(Alert).filter(Alert.user_id.in_(user_ids)).delete(synchronize_session=False)
+            db.query(User).filter(User.email == email).delete(synchronize_session=False)
+            db.commit()
+        finally:
+            db.close()
+
+    def run():
+        response = client.post("/api/alerts/bulk", json=body)
+        assert response.status_code == 200 and len(response.json()["data"]["created"]) == len(course_ids)
+
+    return Measurement(run, ops=len(course_ids), reset=reset)
+
+
+@benchmark("api.realtime_search")
+def api_realtime_search(env: BenchmarkEnv) -> Measurement:
+    """GET /api/realtime/search for the search queries through the app"""
+    from app.routers import realtime as realtime_router
+
+    client = _api_client()
+    service = env.realtime_service()
+
+    def run():
+        original = realtime_router.realtime_service
+        realtime_router.realtime_service = service
+        try:
+            for query in SEARCH_QUERIES:
+                response = client.get("/api/realtime/search", params={"q": query})
+                assert response.status_code == 200
+        finally:
+            realtime_router.realtime_service = original
+
+    return Measurement(run, ops=len(SEARCH_QUERIES))
+
+
+def _seat_changes(rows: List[Dict[str, Any]], every: int = 50) -> List[Dict[str, Any]]:
+    """A copy of the feed with one seat taken in every `every`-th section"""
+    return [
+        {**row, "consumedSeat": (row.get("consumedSeat") or 0) + 1} if position % every == 0 else row
+        for position, row in enumerate(rows)
+    ]
+
+
+@benchmark("snapshot.record_changes")
+def snapshot_record_changes(env: BenchmarkEnv) -> Measurement:
+    """Diffing a new snapshot against the last one, as every snapshot install does"""
+    from app.services.change_log import ChangeLog
+
+    changed_rows = _seat_changes(env.rows)
+    change_log = ChangeLog()
+    change_log.record(1, env.rows)
+    versions = iter(range(2, 10 ** 9))
+
+    def run():
+        change_log.record(next(versions), changed_rows)
+
+    return Measurement(run, ops=len(env.rows))
+
+
+@benchmark("api.realtime_changes")
+def api_realtime_changes(env: BenchmarkEnv) -> Measurement:
+    """GET /api/realtime/changes for a 2% seat change through the app, response cache cleared"""
+    from app.cache import cache
+    from app.routers import realtime as realtime_router
+    from app.services.snapshot import CourseSnapshot
+
+    client = _api_client()
+    service = env.realtime_service()
+    first = CourseSnapshot(env.rows, version=1)
+    service._install(first)
+    service._install(CourseSnapshot(_seat_changes(env.rows), version=2))
+
+    def run():
+        asyncio.run(cache.clear("responses"))
+        original = realtime_router.realtime_service
+        realtime_router.realtime_service = service
+        try:
+            response = client.get("/api/realtime/changes", params={"since": first.cache_key})
+            assert response.status_code == 200
+        finally:
+            realtime_router.realtime_service = original
+
+    return Measurement(run, ops=1)
+
+
+def _notify_case(env: BenchmarkEnv, due_every: int) -> Measurement:
+    """
+    A notification run after resetting every alert to watching; one alert in
+    `due_every` is due, the others were notified within their interval
+    """
+    from datetime import datetime, timezone
+    from sqlalchemy import update
+    from app.models.alert import Alert, WATCHING
+    from app.routers.alerts import check_and_send_notifications
+    from app.services import notification_service
+    from app.services.email_service import email_service
+
+    env.ensure_alerts()
+
+    async def send_batch_alerts(alerts):
+        # No SMTP: measure selection and bookkeeping only
+        return {"sent": len(alerts), "failed": 0, "delivered": list(range(len(alerts)))}
+
+    def reset():
+        db = env.session()
+        try:
+            db.execute(update(Alert).values(
+                last_notification_sent=None, notification_count=0,
+                state=WATCHING, state_changed_at=None, last_notified_seats=None,
+            ))
+            if due_every > 1:
+                db.execute(update(Alert).where(Alert.id % due_every != 0).values(
+                    last_notification_sent=datetime.now(timezone.utc),
+                ))
+            db.commit()
+        finally:
+            db.close()
+
+    service = env.realtime_service()
+
+    def run():
+        original = email_service.send_batch_alerts
+        original_service = notification_service.realtime_service
+        email_service.send_batch_alerts = send_batch_alerts
+        notification_service.realtime_service = service
+        db = env.session()
+        try:
+            env.run_async(check_and_send_notifications(db))
+        finally:
+            db.close()
+            email_service.send_batch_alerts = original
+            notification_service.realtime_service = original_service
+
+    return Measurement(run, ops=env.alert_count, reset=reset)
+
+
+@benchmark("alerts.check_and_send_notifications", uses_db=True)
+def check_and_notify(env: BenchmarkEnv) -> Measurement:
+    return _notify_case(env, due_every=1)
+
+
+@benchmark("alerts.notify_few_due", uses_db=True)
+def notify_few_due(env: BenchmarkEnv) -> Measurement:
+    return _notify_case(env, due_every=10)
+
+
+@benchmark("alerts.evaluate_rules")
+def evaluate_rules(env: BenchmarkEnv) -> Measurement:
+    from app.services.rule_engine import CompiledRules
+    from app.services.snapshot import CourseSnapshot
+
+    table = CourseSnapshot(env.rows, version=1).section_table
+    compiled = CompiledRules(table, synthetic_rules(env.rows, env.alert_count))
+
+    # One tick: compiled rules against the snapshot's seat arrays
+    return Measurement(compiled.evaluate, ops=env.alert_count)
+
+
+@benchmark("alerts.compile_rules")
+def compile_rules(env: BenchmarkEnv) -> Measurement:
+    from app.services.rule_engine import CompiledRules
+    from app.services.snapshot import CourseSnapshot
+
+    table = CourseSnapshot(env.rows, version=1).section_table
+    rules = synthetic_rules(env.rows, env.alert_count)
+    return Measurement(lambda: CompiledRules(table, rules), ops=env.alert_count)
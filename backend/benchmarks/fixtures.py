@@ -0,0 +1,117 @@
+"""
+Benchmark inputs: the checked-in connect.json feed, synthetic scale-ups of
+it, and synthetic users/alerts for the notification path.
+"""
+import json
+import os
+import random
+from typing import List, Dict, Any
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_FEED = os.path.join(os.path.dirname(BACKEND_DIR), "connect.json")
+
+# Section ids of scaled copies are offset by this much per copy
+SECTION_ID_STRIDE = 10_000_000
+
+
+def load_feed(path: str = DEFAULT_FEED) -> List[Dict[str, Any]]:
+    with open(path) as f:
+        data = json.load(f)
+    # Same two shapes the services accept
+    if isinstance(data, dict):
+        data = data.get("data") or []
+    return data
+
+
+def scale_feed(rows: List[Dict[str, Any]], factor: int, seed: int = 0) -> List[Dict[str, Any]]:
+    """
+    Replicate the feed `factor` times. Copies get unique section ids (and
+    lab section ids) and jittered seat counts; course codes are kept, so
+    each code simply has `factor` times as many sections.
+    """
+    if factor <= 1:
+        return rows
+    rng = random.Random(seed)
+    scaled = list(rows)
+    for copy in range(1, factor):
+        offset = copy * SECTION_ID_STRIDE
+        for raw in rows:
+            row = dict(raw)
+            row["sectionId"] = raw["sectionId"] + offset
+            if raw.get("labSectionId"):
+                row["labSectionId"] = raw["labSectionId"] + offset
+            capacity = raw.get("capacity") or 0
+            row["consumedSeat"] = rng.randint(max(0, capacity - 3), capacity) if capacity else 0
+            scaled.append(row)
+    return scaled
+
+
+def seed_alerts(db, alert_count: int, alerts_per_user: int = 10, seed: int = 0) -> int:
+    """
+    Insert synthetic users and `alert_count` active alerts spread over the
+    synced non-lab courses. Returns the number of alerts created.
+    """
+    from sqlalchemy import insert
+    from app.models.alert import Alert
+    from app.models.course import Course
+    from app.models.user import User
+
+    course_ids = [row[0] for row in db.query(Course.id).filter(Course.section_type != "LAB").all()]
+    if not course_ids:
+        raise RuntimeError("Sync courses before seeding alerts")
+    alerts_per_user = min(alerts_per_user, len(course_ids))
+
+    rng = random.Random(seed)
+    user_count = -(-alert_count // alerts_per_user)
+    db.execute(insert(User), [
+        {"email": f"bench{index}@example.com", "is_active": True,
+         "is_verified": True, "email_notifications_enabled": True}
+        for index in range(user_count)
+    ])
+    user_ids = [row[0] for row in db.query(User.id).order_by(User.id).all()][-user_count:]
+
+    alerts = []
+    for user_id in user_ids:
+        for course_id in rng.sample(course_ids, alerts_per_user):
+            if len(alerts) == alert_count:
+                break
+            alerts.append({
+                "user_id": user_id,
+                "course_id": course_id,
+                "notification_interval_minutes": 30,
+                "is_active": True,
+                "notification_count": 0,
+            })
+    for start in range(0, len(alerts), 10_000):
+        db.execute(insert(Alert), alerts[start:start + 10_000])
+    db.commit()
+    return len(alerts)
+
+
+def synthetic_rules(rows: List[Dict[str, Any]], count: int, seed: int = 0) -> list:
+    """
+    `count` alert rules over the feed: mostly single sections, some whole
+    course codes with seat thresholds, and some narrowed by days, times or
+    faculty.
+    """
+    from app.services.rule_engine import Rule
+    from app.services.schedule_engine import WEEKDAYS
+
+    sections = [row for row in rows if row.get("sectionType") != "LAB"]
+    codes = sorted({row["courseCode"] for row in sections})
+    faculties = sorted({row["faculties"] for row in sections if row.get("faculties")})
+    rng = random.Random(seed)
+    rules = []
+    for alert_id in range(1, count + 1):
+        kind = rng.random()
+        if kind < 0.7:
+            rules.append(Rule(alert_id, alert_id // 10, section_id=rng.choice(sections)["sectionId"]))
+        elif kind < 0.9:
+            rules.append(Rule(alert_id, alert_id // 10, course_code=rng.choice(codes), min_seats=rng.randint(1, 5)))
+        else:
+            rules.append(Rule(
+                alert_id, alert_id // 10, course_code=rng.choice(codes),
+                days=rng.sample(WEEKDAYS[:6], 3), start_after="08:00", end_before=rng.choice(["12:30", "15:30", "17:00"]),
+                faculty=rng.choice(faculties).split(",")[0].strip() if rng.random() < 0.5 else None,
+            ))
+    return rules
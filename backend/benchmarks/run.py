@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Run the offline benchmark suite and compare it against a baseline.
+
+Every scale runs in its own process with a fresh SQLite database, fed from
+connect.json (replicated for the 10x/100x scales). No network access and no
+SMTP: upstream fetches return the fixture and email sends are stubbed.
+
+Usage (from backend/):
+    python -m benchmarks.run                              # all cases, scales 1 10 100
+    python -m benchmarks.run --save-baseline              # record benchmarks/baseline.json
+    python -m benchmarks.run --threshold 0.15             # fail on >15% median regression
+    python -m benchmarks.run --cases realtime. --scales 1 # prefix filter
+"""
+import argparse
+import datetime
+import inspect
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.dirname(BENCHMARK_DIR)
+RESULTS_DIR = os.path.join(BENCHMARK_DIR, "results")
+DEFAULT_BASELINE = os.path.join(BENCHMARK_DIR, "baseline.json")
+
+
+def select_cases(cases, prefixes):
+    if not prefixes:
+        return list(cases)
+    return [name for name in cases if any(name.startswith(prefix) for prefix in prefixes)]
+
+
+def run_scale(args):
+    """Child process: run the selected cases at one scale, print JSON results"""
+    sys.path.insert(0, BACKEND_DIR)
+    from benchmarks.cases import CASES, BenchmarkEnv
+    from benchmarks.fixtures import load_feed, scale_feed
+
+    rows = scale_feed(load_feed(args.feed), args.scale)
+    env = BenchmarkEnv(rows, alert_count=args.alerts)
+    results = {}
+
+    for name in select_cases(CASES, args.cases):
+        case = CASES[name]
+        if case["uses_db"] and args.scale > args.max_db_scale:
+            continue
+        measurement = case["factory"](env)
+        timings = []
+        for _ in range(args.repeat):
+            if measurement.reset:
+                measurement.reset()
+            started = time.perf_counter()
+            outcome = measurement.run()
+            if inspect.isawaitable(outcome):
+                env.run_async(outcome)
+            timings.append(time.perf_counter() - started)
+
+        median = statistics.median(timings)
+        results[f"{name}@{args.scale}x"] = {
+            "case": name,
+            "scale": args.scale,
+            "sections": len(rows),
+            "repeat": len(timings),
+            "ops": measurement.ops,
+            "median_s": median,
+            "min_s": min(timings),
+            "max_s": max(timings),
+            "mean_s": statistics.fmean(timings),
+            "ops_per_s": measurement.ops / median if median > 0 else None,
+        }
+
+    print(json.dumps(results))
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=BACKEND_DIR, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline, threshold):
+    """Return (rows, regressions) comparing median times per benchmark key"""
+    rows = []
+    regressions = []
+    for key, current in sorted(results.items()):
+        previous = baseline.get("results", {}).get(key)
+        ratio = current["median_s"] / previous["median_s"] if previous and previous["median_s"] else None
+        status = ""
+        if ratio is not None:
+            if ratio > 1 + threshold:
+                status = "REGRESSION"
+                regressions.append(key)
+            elif ratio < 1 - threshold:
+                status = "improved"
+        rows.append((key, current, previous, ratio, status))
+    return rows, regressions
+
+
+def print_report(rows):
+    print(f"{'benchmark':<50} {'median':>10} {'baseline':>10} {'ratio':>7}  status")
+    for key, current, previous, ratio, status in rows:
+        baseline_ms = f"{previous['median_s'] * 1000:9.2f}ms" if previous else f"{'-':>11}"
+        ratio_text = f"{ratio:6.2f}x" if ratio is not None else f"{'-':>7}"
+        print(f"{key:<50} {current['median_s'] * 1000:9.2f}ms {baseline_ms} {ratio_text}  {status}")
+
+
+def run_suite(args):
+    results = {}
+    for scale in args.scales:
+        with tempfile.TemporaryDirectory() as tmp:
+            env = dict(os.environ)
+            env["DATABASE_URL"] = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+            env.setdefault("PYTHONPATH", BACKEND_DIR)
+            command = [
+                sys.executable, "-m", "benchmarks.run", "--child",
+                "--scale", str(scale), "--feed", args.feed,
+                "--repeat", str(args.repeat), "--alerts", str(args.alerts),
+                "--max-db-scale", str(args.max_db_scale),
+            ]
+            if args.cases:
+                command += ["--cases", *args.cases]
+            print(f"Running scale {scale}x ...", file=sys.stderr)
+            proc = subprocess.run(command, cwd=BACKEND_DIR, env=env, capture_output=True, text=True)
+            if proc.returncode != 0:
+                sys.stderr.write(proc.stderr)
+                raise SystemExit(f"Benchmark process for scale {scale}x failed")
+            results.update(json.loads(proc.stdout.strip().splitlines()[-1]))
+
+    report = {
+        "meta": {
+            "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            "git_revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "scales": args.scales,
+            "alerts": args.alerts,
+            "repeat": args.repeat,
+        },
+        "results": results,
+    }
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"{datetime.datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+    )
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {output}", file=sys.stderr)
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline saved to {args.baseline}", file=sys.stderr)
+
+    baseline = {}
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    rows, regressions = compare(results, baseline, args.threshold)
+    print_report(rows)
+    if regressions:
+        print(f"\n{len(regressions)} benchmarks regressed by more than {args.threshold:.0%}: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+def main():
+    from benchmarks.fixtures import DEFAULT_FEED
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cases", nargs="+", help="only run cases whose name starts with one of these")
+    parser.add_argument("--scales", nargs="+", type=int, default=[1, 10, 100], help="feed replication factors")
+    parser.add_argument("--max-db-scale", type=int, default=10, help="skip database cases above this scale")
+    parser.add_argument("--alerts", type=int, default=100_000, help="synthetic alerts for the notify case")
+    parser.add_argument("--repeat", type=int, default=3, help="timed repetitions per case")
+    parser.add_argument("--feed", default=DEFAULT_FEED, help="path to connect.json")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="baseline results to compare against")
+    parser.add_argument("--save-baseline", action="store_true", help="store this run as the new baseline")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed median slowdown before failing")
+    parser.add_argument("--output", help="results file (default: benchmarks/results/<timestamp>.json)")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--scale", type=int, default=1, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_scale(args)
+        return 0
+    return run_suite(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
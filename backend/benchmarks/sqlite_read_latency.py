@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Benchmark read latency on the SQLite profile while a full sync is writing.
+
+Each journal mode runs in its own process against a fresh database file
+(app.database reads its configuration at import time). Reader threads issue
+the /api/courses list query through the read pool, first with the database
+idle and then while a full sync rewrites every section via the writer.
+
+Usage (from backend/):
+    python benchmarks/sqlite_read_latency.py
+    python benchmarks/sqlite_read_latency.py --modes WAL DELETE --scale 5 --readers 8
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_FIXTURE = os.path.join(os.path.dirname(BACKEND_DIR), "connect.json")
+
+
+def load_fixture(path, scale, seat_shift=0):
+    """Load connect.json and replicate it `scale` times with unique section ids"""
+    with open(path) as f:
+        base = json.load(f)
+    rows = []
+    for copy in range(scale):
+        for raw in base:
+            row = dict(raw)
+            row["sectionId"] = raw["sectionId"] + copy * 10_000_000
+            row["consumedSeat"] = max(0, raw["consumedSeat"] - seat_shift)
+            rows.append(row)
+    return rows
+
+
+def percentile(samples, pct):
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def summarize(samples):
+    return {
+        "count": len(samples),
+        "p50_ms": percentile(samples, 50),
+        "p95_ms": percentile(samples, 95),
+        "p99_ms": percentile(samples, 99),
+        "max_ms": max(samples) if samples else None,
+        "mean_ms": statistics.fmean(samples) if samples else None,
+    }
+
+
+def run_child(args):
+    """Run one journal mode; prints a JSON result line on stdout"""
+    sys.path.insert(0, BACKEND_DIR)
+    from app.database import SessionLocal, ReadSessionLocal, create_tables, engine
+    from app.models.course import Course
+    from app.services.bracu_service import BracuConnectService
+
+    class FixtureService(BracuConnectService):
+        def __init__(self, rows):
+            super().__init__()
+            self.rows = rows
+
+        async def fetch_course_data(self):
+            return self.rows
+
+    create_tables()
+    with engine.connect() as conn:
+        journal_mode = conn.exec_driver_sql("PRAGMA journal_mode").scalar()
+
+    # Seed so the timed sync takes the update path for every section
+    db = SessionLocal()
+    asyncio.run(FixtureService(load_fixture(args.fixture, args.scale)).sync_courses_to_db(db))
+    db.close()
+
+    stop = threading.Event()
+    phase = {"name": "idle"}
+    samples = {"idle": [], "sync": []}
+    errors = {"idle": 0, "sync": 0}
+
+    def reader():
+        session = ReadSessionLocal()
+        try:
+            while not stop.is_set():
+                name = phase["name"]
+                started = time.perf_counter()
+                try:
+                    session.query(Course).filter(Course.section_type != "LAB").offset(0).limit(100).all()
+                    session.rollback()
+                except Exception:
+                    session.rollback()
+                    errors[name] += 1
+                    continue
+                samples[name].append((time.perf_counter() - started) * 1000)
+        finally:
+            session.close()
+
+    threads = [threading.Thread(target=reader, daemon=True) for _ in range(args.readers)]
+    for thread in threads:
+        thread.start()
+    time.sleep(args.idle_seconds)
+
+    sync_rows = load_fixture(args.fixture, args.scale, seat_shift=1)
+    phase["name"] = "sync"
+    db = SessionLocal()
+    sync_started = time.perf_counter()
+    stats = asyncio.run(FixtureService(sync_rows).sync_courses_to_db(db))
+    sync_seconds = time.perf_counter() - sync_started
+    db.close()
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    print(json.dumps({
+        "journal_mode": journal_mode,
+        "sections": len(sync_rows),
+        "readers": args.readers,
+        "sync_seconds": sync_seconds,
+        "sync_stats": stats,
+        "idle": summarize(samples["idle"]),
+        "during_sync": summarize(samples["sync"]),
+        "read_errors": errors,
+    }))
+
+
+def run_parent(args):
+    results = []
+    for mode in args.modes:
+        with tempfile.TemporaryDirectory() as tmp:
+            env = dict(os.environ)
+            env["DATABASE_URL"] = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+            env["SQLITE_JOURNAL_MODE"] = mode
+            proc = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "--child",
+                 "--fixture", args.fixture, "--scale", str(args.scale),
+                 "--readers", str(args.readers), "--idle-seconds", str(args.idle_seconds)],
+                cwd=tmp, env=env, capture_output=True, text=True, check=True,
+            )
+            results.append(json.loads(proc.stdout.strip().splitlines()[-1]))
+
+    def fmt(value):
+        return f"{value:8.2f}" if value is not None else "     n/a"
+
+    print(f"{'mode':<8} {'phase':<12} {'reads':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8} {'errors':>6}")
+    for result in results:
+        for label, key in (("idle", "idle"), ("during sync", "during_sync")):
+            summary = result[key]
+            error_key = "idle" if key == "idle" else "sync"
+            print(f"{result['journal_mode']:<8} {label:<12} {summary['count']:>7} "
+                  f"{fmt(summary['p50_ms'])} {fmt(summary['p95_ms'])} {fmt(summary['p99_ms'])} "
+                  f"{fmt(summary['max_ms'])} {result['read_errors'][error_key]:>6}")
+        print(f"{result['journal_mode']:<8} sync of {result['sections']} sections took {result['sync_seconds']:.2f}s")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--modes", nargs="+", default=["WAL", "DELETE"], help="journal modes to compare")
+    parser.add_argument("--fixture", default=DEFAULT_FIXTURE, help="path to connect.json")
+    parser.add_argument("--scale", type=int, default=1, help="replicate the fixture N times")
+    parser.add_argument("--readers", type=int, default=4, help="concurrent reader threads")
+    parser.add_argument("--idle-seconds", type=float, default=1.0, help="idle phase duration")
+    parser.add_argument("--output", help="write raw results as JSON")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args)
+    else:
+        run_parent(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+"""
+Test fixtures.
+
+The app reads DATABASE_URL when app.database is imported, so the test
+database (a SQLite file in a temporary directory, migrated to head once per
+run) is configured here before any app module is imported.
+"""
+import os
+import shutil
+import tempfile
+
+_TMP_DIR = tempfile.mkdtemp(prefix="seatz-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_TMP_DIR, 'seatz.db')}"
+
+import pytest
+
+from app.database import SessionLocal, engine, run_migrations
+from app.models.base import Base
+
+
+@pytest.fixture(scope="session", autouse=True)
+def _database():
+    run_migrations()
+    yield
+    engine.dispose()
+    shutil.rmtree(_TMP_DIR, ignore_errors=True)
+
+
+@pytest.fixture
+def db():
+    """A session on the test database; every table is emptied afterwards"""
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.rollback()
+        for table in reversed(Base.metadata.sorted_tables):
+            session.execute(table.delete())
+        session.commit()
+        session.close()
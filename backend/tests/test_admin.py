@@ -0,0 +1,51 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.profiling import profiler
+from app.routers import admin
+
+TOKEN = "test-admin-token"
+
+
+@pytest.fixture
+def client():
+    # No context manager: the app's lifespan (migrations, leader election) is not run
+    return TestClient(app)
+
+
+@pytest.fixture(autouse=True)
+def _profiler_state():
+    header_enabled = profiler.header_enabled
+    yield
+    profiler.header_enabled = header_enabled
+    profiler.disarm()
+
+
+def test_admin_endpoints_are_disabled_without_a_token(client, monkeypatch):
+    monkeypatch.setattr(admin, "ADMIN_TOKEN", None)
+
+    response = client.post("/api/admin/profiling", json={"header_enabled": True})
+
+    assert response.status_code == 503
+    assert not profiler.header_enabled
+    assert client.get("/api/admin/profiles").status_code == 503
+    assert client.post("/api/admin/archive", json={"before_semester_session_id": 20253}).status_code == 503
+
+
+def test_admin_endpoints_reject_a_wrong_token(client, monkeypatch):
+    monkeypatch.setattr(admin, "ADMIN_TOKEN", TOKEN)
+
+    assert client.get("/api/admin/profiling").status_code == 403
+    assert client.get("/api/admin/profiling", headers={"X-Admin-Token": "nope"}).status_code == 403
+
+
+def test_admin_endpoints_accept_the_token(client, monkeypatch):
+    monkeypatch.setattr(admin, "ADMIN_TOKEN", TOKEN)
+
+    response = client.post(
+        "/api/admin/profiling", json={"header_enabled": True}, headers={"X-Admin-Token": TOKEN}
+    )
+
+    assert response.status_code == 200
+    assert profiler.header_enabled
@@ -0,0 +1,57 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.models.alert import Alert
+from app.models.course import Course
+from app.models.user import User
+
+
+@pytest.fixture
+def client():
+    # No context manager: the app's lifespan (migrations, leader election) is not run
+    return TestClient(app)
+
+
+@pytest.fixture
+def student(db):
+    user = User(email="student@example.com", full_name="student")
+    db.add(user)
+    db.add(Course(
+        section_id=1, course_id=1, section_name="1", course_code="CSE110",
+        capacity=30, consumed_seat=30, real_time_seat_count=0, semester_session_id=1,
+    ))
+    db.commit()
+    user_id = user.id
+    # Release the writer connection for the requests
+    db.close()
+    return user_id
+
+
+def test_duplicate_code_alert_is_rejected(client, db, student):
+    first = client.post("/api/alerts/", json={"user_id": student, "course_code": "cse110"})
+    second = client.post("/api/alerts/", json={"user_id": student, "course_code": " CSE110 "})
+
+    assert first.status_code == 200
+    assert second.status_code == 400
+    assert db.query(Alert).count() == 1
+
+
+def test_empty_time_window_is_rejected(client, student):
+    window = {"user_id": student, "course_code": "CSE110", "start_after": "14:00", "end_before": "14:00"}
+
+    assert client.post("/api/alerts/", json=window).status_code == 422
+    assert client.post("/api/alerts/bulk", json={
+        "user_id": student, "alerts": [{"course_code": "CSE110", "start_after": "15:00", "end_before": "09:00"}],
+    }).status_code == 422
+
+
+def test_update_cannot_empty_the_stored_window(client, student):
+    response = client.post("/api/alerts/", json={"user_id": student, "course_code": "CSE110", "end_before": "12:00"})
+    alert_id = response.json()["id"]
+
+    assert client.put(f"/api/alerts/{alert_id}", json={"start_after": "12:30"}).status_code == 400
+    assert client.put("/api/alerts/bulk", json={"alert_ids": [alert_id], "start_after": "13:00"}).status_code == 400
+    response = client.put(f"/api/alerts/{alert_id}", json={"start_after": "08:00"})
+    assert response.status_code == 200
+    assert (response.json()["start_after"], response.json()["end_before"]) == ("08:00", "12:00")
@@ -0,0 +1,101 @@
+from datetime import datetime, timedelta, timezone
+
+from app.services.change_log import ChangeLog, split_changes
+from app.services.realtime_service import RealtimeService
+from app.services.snapshot import CourseSnapshot
+
+FETCHED_AT = datetime(2025, 11, 1, 12, 0, tzinfo=timezone.utc)
+
+
+def _section(section_id, consumed=10, capacity=30):
+    return {
+        "sectionId": section_id, "courseCode": "CSE110", "sectionName": str(section_id),
+        "capacity": capacity, "consumedSeat": consumed,
+    }
+
+
+def _feed(*consumed):
+    return [_section(section_id, seats) for section_id, seats in enumerate(consumed, start=1)]
+
+
+def test_changed_since_collects_deltas():
+    log = ChangeLog()
+    log.record(1, _feed(10, 10, 10))
+    log.record(2, _feed(11, 10, 10))
+    log.record(3, _feed(11, 10, 12))
+
+    assert log.changed_since(1) == {1, 3}
+    assert log.changed_since(2) == {3}
+    assert log.changed_since(3) == set()
+    assert log.changed_since(1, until=2) == {1}
+
+
+def test_added_and_removed_sections_count_as_changes():
+    log = ChangeLog()
+    log.record(1, _feed(10, 10))
+    log.record(2, _feed(10, 10, 10)[1:])
+
+    changed = log.changed_since(1)
+    assert changed == {1, 3}
+    assert split_changes(changed, {3: _section(3)}) == ([_section(3)], [1])
+
+
+def test_unknown_or_evicted_versions_need_a_resync():
+    log = ChangeLog(max_versions=2)
+    for version in range(1, 5):
+        log.record(version, _feed(version))
+
+    assert log.oldest_version == 2
+    assert log.changed_since(1) is None
+    assert log.changed_since(2) == {1}
+    # From the future
+    assert log.changed_since(9) is None
+
+
+def test_version_going_backwards_resets():
+    log = ChangeLog()
+    log.record(5, _feed(10))
+    log.record(6, _feed(11))
+    log.record(2, _feed(12))
+
+    assert log.version == 2
+    assert log.changed_since(5) is None
+    assert log.changed_since(2) == set()
+
+
+def test_version_of_only_resolves_recorded_keys():
+    log = ChangeLog(max_versions=2)
+    snapshots = [
+        CourseSnapshot(_feed(version), version, FETCHED_AT + timedelta(seconds=version)) for version in (1, 2, 3, 4)
+    ]
+    for snapshot in snapshots:
+        log.record(snapshot.version, snapshot.raw_courses, snapshot.cache_key)
+
+    assert log.version_of(snapshots[3].cache_key) == 4
+    assert log.version_of(snapshots[1].cache_key) == 2
+    # Evicted with its delta
+    assert log.version_of(snapshots[0].cache_key) is None
+    # Same version, fetched at another time (another node's snapshot)
+    other = CourseSnapshot(_feed(3), 3, FETCHED_AT + timedelta(hours=1))
+    assert log.version_of(other.cache_key) is None
+    assert log.version_of("3") is None
+    assert log.version_of("garbage") is None
+
+
+def test_changes_since_a_cursor_from_another_node_resyncs():
+    service = RealtimeService()
+    first = CourseSnapshot(_feed(10, 10), 1, FETCHED_AT)
+    second = CourseSnapshot(_feed(11, 10), 2, FETCHED_AT + timedelta(seconds=60))
+    service._install(first)
+    service._install(second)
+
+    changes = service.changes_since(second, first.cache_key)
+    assert not changes["resync_required"]
+    assert changes["cursor"] == second.cache_key
+    assert [course["section_id"] for course in changes["courses"]] == [1]
+
+    # Another node numbered its snapshot of a different download 1 as well
+    foreign = CourseSnapshot(_feed(10, 10), 1, FETCHED_AT - timedelta(seconds=30))
+    changes = service.changes_since(second, foreign.cache_key)
+    assert changes["resync_required"]
+    assert changes["courses"] == [] and changes["cursor"] == second.cache_key
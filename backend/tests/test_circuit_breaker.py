@@ -0,0 +1,99 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from app.services.realtime_service import RealtimeService
+from app.services.resilience import CircuitBreaker
+
+
+def _open(breaker):
+    for _ in range(breaker.failure_threshold):
+        assert breaker.allow()
+        breaker.record_failure()
+        breaker.release()
+
+
+def test_opens_after_consecutive_failures():
+    breaker = CircuitBreaker("test", failure_threshold=3, reset_seconds=60)
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()
+    assert breaker.current_state == CircuitBreaker.CLOSED
+
+    _open(breaker)
+
+    assert breaker.current_state == CircuitBreaker.OPEN
+    assert not breaker.allow()
+    assert breaker.to_dict()["retry_in_seconds"] > 0
+
+
+def test_half_open_lets_one_probe_through():
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_seconds=0.01)
+    _open(breaker)
+    time.sleep(0.02)
+
+    assert breaker.current_state == CircuitBreaker.HALF_OPEN
+    assert breaker.allow()
+    assert not breaker.allow()
+
+    breaker.record_success()
+    assert breaker.current_state == CircuitBreaker.CLOSED
+    assert breaker.allow()
+
+
+def test_failed_probe_opens_again():
+    breaker = CircuitBreaker("test", failure_threshold=3, reset_seconds=0.01)
+    _open(breaker)
+    time.sleep(0.02)
+    assert breaker.allow()
+
+    breaker.record_failure()
+
+    assert breaker.state == CircuitBreaker.OPEN
+
+
+def test_released_probe_frees_the_slot():
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_seconds=0.01)
+    _open(breaker)
+    time.sleep(0.02)
+    assert breaker.allow()
+
+    breaker.release()
+
+    assert breaker.allow()
+
+
+class _HangingClient:
+    def __init__(self, *args, **kwargs):
+        pass
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def get(self, url):
+        await asyncio.sleep(3600)
+
+
+def test_cancelled_probe_does_not_wedge_the_breaker(monkeypatch):
+    monkeypatch.setattr(httpx, "AsyncClient", _HangingClient)
+    service = RealtimeService()
+    service.breaker = CircuitBreaker("test-realtime", failure_threshold=1, reset_seconds=0.01)
+    _open(service.breaker)
+    time.sleep(0.02)
+
+    async def probe_then_cancel():
+        task = asyncio.create_task(service.fetch_realtime_courses())
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(probe_then_cancel())
+
+    assert service.breaker.current_state == CircuitBreaker.HALF_OPEN
+    assert service.breaker.allow()
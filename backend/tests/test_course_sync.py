@@ -0,0 +1,60 @@
+import pytest
+
+from app.models.course import Course
+from app.services.bracu_service import BracuConnectService
+from app.services.sync_jobs import SyncCancelled, SyncJob
+
+
+def _raw(section_id, code, section_type="THEORY", consumed=10):
+    return {
+        "sectionId": section_id, "courseId": section_id, "sectionName": str(section_id), "courseCode": code,
+        "courseCredit": 3, "sectionType": section_type, "capacity": 30, "consumedSeat": consumed,
+        "semesterSessionId": 1, "sectionSchedule": {"classSchedules": []},
+    }
+
+
+def _feed(consumed=10):
+    return [
+        _raw(1, "CSE110", consumed=consumed),
+        _raw(2, "CSE110L", section_type="LAB", consumed=consumed),
+        _raw(3, "CSE220", consumed=consumed),
+        _raw(4, "CSE221", consumed=consumed),
+    ]
+
+
+class _CancelAfter(SyncJob):
+    """A job cancelled once it has processed `sections` sections"""
+
+    def __init__(self, sections):
+        super().__init__("test")
+        self.sections = sections
+
+    def advance(self):
+        if self.processed >= self.sections:
+            self.cancel_requested = True
+        super().advance()
+
+
+def test_sync_upserts_sections_and_folds_labs(db):
+    service = BracuConnectService()
+    assert service._store_courses(db, _feed(), None) == {"added": 3, "updated": 0, "failed": 0}
+    assert service._store_courses(db, _feed(consumed=20), None) == {"added": 0, "updated": 3, "failed": 0}
+
+    db.expire_all()
+    parent = db.query(Course).filter(Course.section_id == 1).one()
+    assert parent.consumed_seat == 20
+    assert parent.schedule_data["labSection"]["labSectionId"] == 2
+
+
+def test_cancelled_sync_writes_nothing(db):
+    service = BracuConnectService()
+    service._store_courses(db, _feed(), None)
+
+    # Cancelled after the lab row, which used to commit every upsert before it
+    feed = [_raw(5, "CSE230")] + _feed(consumed=20)
+    with pytest.raises(SyncCancelled):
+        service._store_courses(db, feed, _CancelAfter(3))
+
+    db.close()
+    assert db.query(Course).filter(Course.section_id == 5).count() == 0
+    assert {course.consumed_seat for course in db.query(Course)} == {10}
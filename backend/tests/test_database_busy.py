@@ -0,0 +1,19 @@
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+from app.database import DB_BUSY_RETRY_AFTER_SECONDS, engine
+from app.main import app
+from app.models.user import User
+
+
+def test_writes_answer_503_while_the_writer_is_taken(db, monkeypatch):
+    # Stands in for a sync holding the single writer connection
+    db.execute(text("SELECT 1"))
+    monkeypatch.setattr(engine.pool, "_timeout", 0.1)
+
+    response = TestClient(app).post("/api/users/", json={"email": "student@example.com"})
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == str(DB_BUSY_RETRY_AFTER_SECONDS)
+    db.rollback()
+    assert db.query(User).count() == 0
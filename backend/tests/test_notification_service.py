@@ -0,0 +1,134 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.models.alert import Alert, COOLING_DOWN, FIRED, REARMED, WATCHING
+from app.models.course import Course
+from app.models.user import User
+from app.services import email_service as email_module
+from app.services import notification_service
+from app.services.email_service import email_service
+from app.services.notification_service import advance, notify_due_alerts
+from app.services.webhook_service import webhook_service
+
+NOW = datetime(2025, 11, 1, 12, 0, tzinfo=timezone.utc)
+
+
+def test_armed_alert_fires_on_an_opening():
+    assert advance(WATCHING, 3, None, None, True, NOW) == (FIRED, True)
+    assert advance(REARMED, 3, None, None, True, NOW) == (FIRED, True)
+    assert advance(WATCHING, None, None, None, True, NOW) == (WATCHING, False)
+    # Within its notification interval
+    assert advance(WATCHING, 3, None, None, False, NOW) == (WATCHING, False)
+
+
+def test_fired_alert_cools_down_and_rearms():
+    assert advance(FIRED, None, 3, NOW, True, NOW) == (COOLING_DOWN, False)
+    # Reopened while cooling down: the same opening, no new notification
+    assert advance(COOLING_DOWN, 2, 3, NOW, True, NOW) == (FIRED, False)
+    rearm_after = timedelta(minutes=notification_service.ALERT_REARM_AFTER_MINUTES)
+    assert advance(COOLING_DOWN, None, 3, NOW - rearm_after, True, NOW) == (REARMED, False)
+    assert advance(COOLING_DOWN, None, 3, NOW - rearm_after / 2, True, NOW) == (COOLING_DOWN, False)
+
+
+def test_fired_alert_renotifies_only_when_the_opening_grows(monkeypatch):
+    monkeypatch.setattr(notification_service, "ALERT_RENOTIFY_SEAT_DELTA", 5)
+    assert advance(FIRED, 4, 3, NOW, True, NOW) == (FIRED, False)
+    assert advance(FIRED, 8, 3, NOW, True, NOW) == (FIRED, True)
+    assert advance(FIRED, 8, 3, NOW, False, NOW) == (FIRED, False)
+
+
+@pytest.fixture
+def delivery(monkeypatch):
+    """Stubbed SMTP and webhook transports; sets of addresses and URLs that fail"""
+    failing = {"emails": set(), "urls": set()}
+
+    async def send_email(to_email, subject, html_content, text_content):
+        return to_email not in failing["emails"]
+
+    async def post(url, secret, events):
+        return url not in failing["urls"], 200
+
+    async def no_sleep(seconds):
+        pass
+
+    async def no_snapshot():
+        return None
+
+    monkeypatch.setattr(email_service, "send_email", send_email)
+    monkeypatch.setattr(webhook_service, "post", post)
+    monkeypatch.setattr(email_module.asyncio, "sleep", no_sleep)
+    # Evaluate against the synced courses
+    monkeypatch.setattr(notification_service.realtime_service, "get_snapshot", no_snapshot)
+    return failing
+
+
+def _open_section(db, section_id=1, seats=5):
+    course = Course(
+        section_id=section_id, course_id=section_id, section_name=str(section_id), course_code="CSE110",
+        capacity=30, consumed_seat=30 - seats, real_time_seat_count=seats, semester_session_id=1,
+    )
+    db.add(course)
+    db.commit()
+    return course.id
+
+
+def _alert(db, course_id, email, webhook_url=None):
+    user = User(email=email, full_name=email.split("@")[0], webhook_url=webhook_url)
+    db.add(user)
+    db.commit()
+    alert = Alert(user_id=user.id, course_id=course_id)
+    db.add(alert)
+    db.commit()
+    return alert.id
+
+
+def _state(db, alert_id):
+    db.expire_all()
+    alert = db.get(Alert, alert_id)
+    return alert.state, alert.notification_count
+
+
+def test_failed_delivery_leaves_the_alert_armed(db, delivery):
+    course_id = _open_section(db)
+    alert_id = _alert(db, course_id, "down@example.com")
+    delivery["emails"].add("down@example.com")
+
+    queued, results = asyncio.run(notify_due_alerts(db))
+
+    assert queued == 1
+    assert results["failed"] == 1 and results["undelivered"] == 1
+    assert _state(db, alert_id) == (WATCHING, 0)
+
+    # The next run retries it
+    delivery["emails"].clear()
+    queued, results = asyncio.run(notify_due_alerts(db))
+
+    assert queued == 1 and results["sent"] == 1 and results["undelivered"] == 0
+    assert _state(db, alert_id) == (FIRED, 1)
+
+
+def test_only_delivered_alerts_fire(db, delivery):
+    course_id = _open_section(db)
+    delivered = _alert(db, course_id, "up@example.com")
+    failed = _alert(db, course_id, "down@example.com")
+    webhook_only = _alert(db, course_id, "hook@example.com", webhook_url="https://hooks.example.com/seatz")
+    delivery["emails"].update({"down@example.com", "hook@example.com"})
+
+    queued, results = asyncio.run(notify_due_alerts(db))
+
+    assert queued == 3 and results["undelivered"] == 1
+    assert results["webhooks"]["sent"] == 1
+    assert _state(db, delivered) == (FIRED, 1)
+    assert _state(db, failed) == (WATCHING, 0)
+    # Delivered by its webhook although its email failed
+    assert _state(db, webhook_only) == (FIRED, 1)
+
+
+def test_closed_section_does_not_notify(db, delivery):
+    course_id = _open_section(db, seats=0)
+    alert_id = _alert(db, course_id, "up@example.com")
+
+    assert asyncio.run(notify_due_alerts(db)) == (0, {"sent": 0, "failed": 0})
+    assert _state(db, alert_id) == (WATCHING, 0)
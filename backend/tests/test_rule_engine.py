@@ -0,0 +1,124 @@
+from app.services.rule_engine import CompiledRules, Rule, SectionTable, bitset, window_mask
+
+
+def _section(section_id, code="CSE110", free=5, faculties="ABC", schedules=(), lab_schedules=None, **extra):
+    return {
+        "sectionId": section_id, "courseCode": code, "sectionName": str(section_id),
+        "capacity": 30, "consumedSeat": 30 - free, "faculties": faculties,
+        "sectionSchedule": {"classSchedules": [
+            {"day": day, "startTime": start, "endTime": end} for day, start, end in schedules
+        ]},
+        "labSchedules": [
+            {"day": day, "startTime": start, "endTime": end} for day, start, end in lab_schedules or ()
+        ],
+        **extra,
+    }
+
+
+def _fired(compiled):
+    """{alert_id: [section_id, ...]} for the rules that fire"""
+    section_ids = compiled.table.section_ids
+    return {
+        rule.alert_id: [section_ids[position] for position in positions]
+        for positions, rules in compiled.evaluate()
+        for rule in rules
+    }
+
+
+def test_bitset_sets_the_given_positions():
+    assert bitset([0, 3, 9], 10) == 0b1000001001
+    assert bitset([], 10) == 0
+
+
+def test_window_mask_is_none_without_conditions():
+    assert window_mask(None, None, None) is None
+    assert window_mask(["SUNDAY"], None, None) != window_mask(["MONDAY"], None, None)
+
+
+def test_table_skips_lab_rows_and_folds_lab_schedules():
+    table = SectionTable.from_raw_courses([
+        _section(
+            1, schedules=[("SUNDAY", "08:00:00", "09:20:00")], lab_schedules=[("MONDAY", "14:00:00", "16:50:00")],
+        ),
+        _section(2, sectionType="LAB"),
+        None,
+    ])
+
+    assert table.section_ids == [1]
+    assert table.week_masks[0] == window_mask(["SUNDAY"], "08:00", "09:20") | window_mask(["MONDAY"], "14:00", "16:50")
+
+
+def test_section_rule_fires_at_min_seats():
+    table = SectionTable.from_raw_courses([_section(1, free=2), _section(2, free=0)])
+    compiled = CompiledRules(table, [
+        Rule(1, 1, section_id=1, min_seats=2),
+        Rule(2, 1, section_id=1, min_seats=3),
+        Rule(3, 1, section_id=2),
+    ])
+
+    assert _fired(compiled) == {1: [1]}
+
+
+def test_code_rule_lists_only_sections_with_enough_seats():
+    table = SectionTable.from_raw_courses([
+        _section(1, free=1), _section(2, free=4), _section(3, free=0), _section(4, code="MAT110", free=9),
+    ])
+    compiled = CompiledRules(table, [Rule(1, 1, course_code="cse110", min_seats=1)])
+
+    [(positions, rules)] = compiled.evaluate()
+    assert [table.section_ids[position] for position in positions] == [1, 2]
+    assert table.section_ids[compiled.best_section(positions)] == 2
+    assert [rule.alert_id for rule in rules] == [1]
+
+
+def test_identical_rules_share_a_group():
+    table = SectionTable.from_raw_courses([_section(1), _section(2)])
+    compiled = CompiledRules(table, [
+        Rule(1, 1, course_code="CSE110"),
+        Rule(2, 2, course_code="cse110"),
+        Rule(3, 3, section_id=2),
+        Rule(4, 4, section_id=2),
+    ])
+
+    assert len(compiled.set_groups) == 1
+    assert len(compiled.section_groups) == 1
+    assert _fired(compiled) == {1: [1, 2], 2: [1, 2], 3: [2], 4: [2]}
+
+
+def test_faculty_narrows_the_candidates():
+    table = SectionTable.from_raw_courses([
+        _section(1, faculties="ABC"), _section(2, faculties="XYZ, ABC"), _section(3, faculties="XYZ"),
+    ])
+    compiled = CompiledRules(table, [
+        Rule(1, 1, course_code="CSE110", faculty=" xyz "),
+        Rule(2, 1, section_id=1, faculty="XYZ"),
+    ])
+
+    assert _fired(compiled) == {1: [2, 3]}
+    assert compiled.unmatchable == 1
+
+
+def test_time_window_requires_the_whole_schedule_inside():
+    table = SectionTable.from_raw_courses([
+        _section(1, schedules=[("SUNDAY", "08:00:00", "09:20:00"), ("TUESDAY", "08:00:00", "09:20:00")]),
+        _section(2, schedules=[("SUNDAY", "08:00:00", "09:20:00")], lab_schedules=[("SUNDAY", "14:00:00", "16:50:00")]),
+        _section(3, schedules=[("MONDAY", "09:30:00", "10:50:00")]),
+        _section(4),
+    ])
+    compiled = CompiledRules(table, [
+        Rule(1, 1, course_code="CSE110", days=["sunday", "tuesday"], end_before="12:00"),
+        Rule(2, 1, course_code="CSE110", start_after="09:00"),
+        Rule(3, 1, section_id=4, days=["MONDAY"]),
+    ])
+
+    assert _fired(compiled) == {1: [1], 2: [3]}
+    assert compiled.unmatchable == 1
+
+
+def test_unknown_targets_are_unmatchable():
+    table = SectionTable.from_raw_courses([_section(1)])
+    compiled = CompiledRules(table, [Rule(1, 1, section_id=99), Rule(2, 1, course_code="PHY111"), Rule(3, 1)])
+
+    assert compiled.rule_count == 3
+    assert compiled.unmatchable == 3
+    assert compiled.evaluate() == []
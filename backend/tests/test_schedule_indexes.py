@@ -0,0 +1,130 @@
+from app.services.exam_index import DEFAULT_EXAM_MINUTES, ExamIndex, exam_slots
+from app.services.occupancy_index import OccupancyIndex, split_faculties
+from app.services.schedule_engine import ScheduleIndex, parse_time, schedule_mask, slot_mask
+
+
+def _section(section_id, code, schedules=(), free=5, room="UB1", faculties="ABC", exams=None, **extra):
+    return {
+        "sectionId": section_id, "courseCode": code, "sectionName": str(section_id),
+        "capacity": 30, "consumedSeat": 30 - free, "roomName": room, "faculties": faculties,
+        "sectionSchedule": {
+            "classSchedules": [{"day": day, "startTime": start, "endTime": end} for day, start, end in schedules],
+            **(exams or {}),
+        },
+        **extra,
+    }
+
+
+def _mid(day, start, end=None):
+    exam = {"midExamDate": day, "midExamStartTime": start}
+    if end:
+        exam["midExamEndTime"] = end
+    return exam
+
+
+# Schedule engine
+
+def test_slot_masks():
+    assert parse_time("08:00:00") == 480
+    assert parse_time("8am") is None
+    assert slot_mask("SUNDAY", 480, 560) & slot_mask("sunday", 550, 600)
+    assert not slot_mask("SUNDAY", 480, 560) & slot_mask("MONDAY", 480, 560)
+    assert slot_mask("SUNDAY", 560, 480) == 0
+    assert schedule_mask([None, {"day": "SUNDAY", "startTime": "08:00", "endTime": "09:20"}]) == slot_mask(
+        "SUNDAY", 480, 560
+    )
+
+
+def test_conflicts_reports_overlapping_pairs_once():
+    index = ScheduleIndex.from_raw_courses([
+        _section(1, "CSE110", [("SUNDAY", "08:00:00", "09:20:00")]),
+        _section(2, "MAT110", [("SUNDAY", "09:00:00", "10:20:00")]),
+        _section(3, "PHY111", [("MONDAY", "08:00:00", "09:20:00")]),
+        _section(4, "CSE110L", sectionType="LAB"),
+    ])
+
+    assert index.conflicts([1, 2, 3, 99]) == [(1, 2)]
+    assert index.conflicts([3, 1]) == []
+    assert 4 not in index.sections
+
+
+def test_conflicts_ignores_a_repeated_section():
+    index = ScheduleIndex.from_raw_courses([
+        _section(1, "CSE110", [("SUNDAY", "08:00:00", "09:20:00")]),
+        _section(2, "MAT110", [("MONDAY", "08:00:00", "09:20:00")]),
+    ])
+
+    assert index.conflicts([1, 1]) == []
+    assert index.conflicts([1, 2, 1, 2]) == []
+
+
+def test_build_routines_picks_one_compatible_section_per_course():
+    index = ScheduleIndex.from_raw_courses([
+        _section(1, "CSE110", [("SUNDAY", "08:00:00", "09:20:00")]),
+        _section(2, "CSE110", [("SUNDAY", "11:00:00", "12:20:00")], free=0),
+        _section(3, "MAT110", [("SUNDAY", "08:00:00", "09:20:00")]),
+    ])
+
+    result = index.build_routines(["cse110", "MAT110", "CSE110"])
+    assert [[section.section_id for section in routine] for routine in result["routines"]] == [[3, 2]]
+    assert index.build_routines(["CSE110", "MAT110"], open_seats_only=True)["routines"] == []
+    assert index.build_routines(["CSE110", "ENG101"])["missing_courses"] == ["ENG101"]
+
+
+# Exam index
+
+def test_exam_slots_default_the_end_time():
+    [(kind, start, end)] = exam_slots(_mid("2025-11-10", "10:00"))
+    assert kind == "mid"
+    assert end - start == DEFAULT_EXAM_MINUTES
+    assert exam_slots({"midExamDate": "not a date", "midExamStartTime": "10:00"}) == []
+
+
+def test_exam_clashes():
+    index = ExamIndex.from_raw_courses([
+        _section(1, "CSE110", exams=_mid("2025-11-10", "10:00", "12:00")),
+        _section(2, "MAT110", exams=_mid("2025-11-10", "11:00", "13:00")),
+        _section(3, "MAT110", exams=_mid("2025-11-11", "11:00", "13:00")),
+        _section(4, "PHY111"),
+    ])
+
+    assert index.clashes([1, 2, 3, 4]) == [(1, 2, "mid")]
+    assert index.clashes([1, 1]) == []
+    assert index.clashing_sections([1]) == {2}
+    assert index.has_clash(2, [1, 3])
+    assert not index.has_clash(3, [1, 3])
+    assert index.compatible_sections("mat110", [1]) == [3]
+
+
+# Occupancy index
+
+def test_split_faculties_drops_placeholders():
+    assert split_faculties(" abc, TBA,,xyz ") == ["ABC", "XYZ"]
+    assert split_faculties(None) == []
+
+
+def test_free_rooms_and_utilization():
+    index = OccupancyIndex.from_raw_courses([
+        _section(1, "CSE110", [("SUNDAY", "08:00:00", "09:20:00")], room="UB1", faculties="ABC"),
+        _section(2, "MAT110", [("SUNDAY", "09:00:00", "10:00:00")], room="UB1", faculties="XYZ"),
+        _section(3, "PHY111", [("MONDAY", "08:00:00", "09:20:00")], room="UB2", faculties="ABC"),
+    ])
+
+    assert index.free_rooms("sunday", 480, 540) == ["UB2"]
+    assert index.free_rooms("SUNDAY", 600, 660) == ["UB1", "UB2"]
+    # UB1 is booked 08:00-10:00 on Sunday, overlapping bookings counted once
+    assert index.utilization(480, 600, days=["SUNDAY"]) == [("UB1", 100.0), ("UB2", 0.0)]
+    assert [booking.section_id for booking in index.faculty_timetable("abc")] == [1, 3]
+
+
+def test_embedded_lab_rows_are_not_booked_twice():
+    index = OccupancyIndex.from_raw_courses([
+        _section(
+            1, "CSE110", [("SUNDAY", "08:00:00", "09:20:00")],
+            labSectionId=2, labRoomName="LAB1", labFaculties="XYZ",
+            labSchedules=[{"day": "MONDAY", "startTime": "14:00:00", "endTime": "16:50:00"}],
+        ),
+        _section(2, "CSE110L", [("MONDAY", "14:00:00", "16:50:00")], room="LAB1", sectionType="LAB"),
+    ])
+
+    assert [(booking.kind, booking.section_id) for booking in index.room_bookings("LAB1")] == [("lab", 1)]
@@ -0,0 +1,75 @@
+from app.models.alert import Alert, FROZEN, WATCHING
+from app.models.course import Course, CourseArchive
+from app.models.user import User
+from app.services.semester_service import archive_superseded
+
+
+def _add_semester(db, semester, sections=3):
+    courses = [
+        Course(
+            section_id=semester * 100 + number,
+            course_id=number,
+            section_name=str(number),
+            course_code=f"CSE11{number}",
+            capacity=30,
+            consumed_seat=30,
+            real_time_seat_count=0,
+            semester_session_id=semester,
+        )
+        for number in range(sections)
+    ]
+    db.add_all(courses)
+    db.commit()
+    return courses
+
+
+def test_archives_three_rollovers_with_reused_course_ids(db):
+    user = User(email="student@example.com", full_name="student")
+    db.add(user)
+    db.commit()
+    user_id = user.id
+
+    for semester in (1, 2, 3):
+        courses = _add_semester(db, semester)
+        # SQLite reuses the ids of the emptied table for every new semester
+        assert courses[0].id == 1
+        db.add(Alert(user_id=user_id, course_id=courses[0].id, state=WATCHING))
+        db.commit()
+        result = archive_superseded(db, [semester + 1])
+        db.expunge_all()
+        assert result["sections"] == 3
+        assert result["alerts_frozen"] == 1
+
+    assert db.query(Course).count() == 0
+    assert db.query(CourseArchive).count() == 9
+    assert db.query(CourseArchive.original_id).filter(CourseArchive.original_id == 1).count() == 3
+
+    alerts = db.query(Alert).order_by(Alert.id).all()
+    assert [alert.state for alert in alerts] == [FROZEN] * 3
+    for semester, alert in zip((1, 2, 3), alerts):
+        archived = db.get(CourseArchive, alert.archived_course_id)
+        assert archived.semester_session_id == semester
+        assert archived.section_id == alert.archived_section_id == semester * 100
+        assert alert.course_id is None and not alert.is_active
+        assert alert.course_code == "CSE110"
+
+
+def test_prunes_inactive_alerts(db):
+    user = User(email="student@example.com", full_name="student")
+    db.add(user)
+    db.commit()
+    courses = _add_semester(db, 1)
+    db.add(Alert(user_id=user.id, course_id=courses[1].id, is_active=False))
+    db.commit()
+
+    result = archive_superseded(db, [2])
+    db.expunge_all()
+
+    assert result["alerts_pruned"] == 1
+    assert db.query(Alert).count() == 0
+
+
+def test_nothing_to_archive(db):
+    _add_semester(db, 2)
+    assert archive_superseded(db, [2]) is None
+    assert db.query(Course).count() == 3
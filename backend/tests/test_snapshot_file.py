@@ -0,0 +1,81 @@
+import asyncio
+import threading
+from datetime import datetime, timezone
+
+from app.services.realtime_service import RealtimeService
+from app.services.snapshot import CourseSnapshot, SnapshotFile
+
+FETCHED_AT = datetime(2025, 11, 1, 12, 0, tzinfo=timezone.utc)
+FEED = [
+    {"sectionId": 1, "courseCode": "CSE110", "sectionName": "1", "capacity": 30, "consumedSeat": 10},
+    {"sectionId": 2, "courseCode": "CSE110", "sectionName": "2", "capacity": 30, "consumedSeat": 30},
+]
+
+
+def test_read_returns_a_newer_snapshot(tmp_path):
+    path = str(tmp_path / "snapshot.bin")
+    SnapshotFile(path).write(CourseSnapshot(FEED, version=3, fetched_at=FETCHED_AT))
+
+    snapshot_file = SnapshotFile(path)
+    try:
+        assert snapshot_file.header() == (3, FETCHED_AT)
+        snapshot = snapshot_file.read(newer_than=2)
+        assert snapshot.version == 3
+        assert snapshot.fetched_at == FETCHED_AT
+        assert snapshot.raw_courses == FEED
+        assert snapshot_file.read(newer_than=3) is None
+    finally:
+        snapshot_file.close()
+
+
+def test_each_read_is_a_private_copy(tmp_path):
+    path = str(tmp_path / "snapshot.bin")
+    SnapshotFile(path).write(CourseSnapshot(FEED, version=1, fetched_at=FETCHED_AT))
+
+    snapshot_file = SnapshotFile(path)
+    try:
+        first = snapshot_file.read()
+        first.raw_courses[0]["consumedSeat"] = 99
+        assert snapshot_file.read().raw_courses == FEED
+    finally:
+        snapshot_file.close()
+
+
+def test_corrupt_payload_is_ignored(tmp_path):
+    path = tmp_path / "snapshot.bin"
+    SnapshotFile(str(path)).write(CourseSnapshot(FEED, version=1, fetched_at=FETCHED_AT))
+    data = bytearray(path.read_bytes())
+    data[-1] ^= 0xFF
+    path.write_bytes(bytes(data))
+
+    snapshot_file = SnapshotFile(str(path))
+    try:
+        assert snapshot_file.read() is None
+    finally:
+        snapshot_file.close()
+
+
+class _Follower:
+    follower = True
+
+    def __init__(self):
+        self.threads = []
+
+    def read_shared_snapshot(self, newer_than, max_age_seconds):
+        self.threads.append(threading.current_thread())
+        return CourseSnapshot(FEED, newer_than + 1, FETCHED_AT), True
+
+
+def test_followers_read_the_shared_snapshot_off_the_event_loop():
+    service = RealtimeService()
+    service.coordinator = _Follower()
+
+    async def update():
+        async with service._snapshot_lock:
+            return await service._update_snapshot()
+
+    snapshot = asyncio.run(update())
+
+    assert snapshot.version == 1
+    assert service.snapshot is snapshot
+    assert service.coordinator.threads and service.coordinator.threads[0] is not threading.main_thread()
@@ -0,0 +1,51 @@
+import asyncio
+import os
+from datetime import datetime, timezone
+
+from app.models.sync_run import RUNNING, SUCCEEDED, SyncRun
+from app.services.sync_jobs import SyncJob, SyncJobManager
+
+
+def _other_worker_running(db, job_id="other"):
+    db.add(SyncRun(
+        id=job_id, trigger="scheduled", status=RUNNING, worker_pid=os.getpid() + 1,
+        started_at=datetime.now(timezone.utc), processed=0,
+    ))
+    db.commit()
+    db.close()
+
+
+def test_only_one_running_job_can_be_recorded(db):
+    manager = SyncJobManager()
+    first, second = SyncJob("manual"), SyncJob("sync_now")
+
+    assert manager._record_start(first)
+    assert not manager._record_start(second)
+
+    db.query(SyncRun).filter(SyncRun.id == first.id).update({SyncRun.status: SUCCEEDED})
+    db.commit()
+    db.close()
+    assert manager._record_start(second)
+
+
+def test_start_joins_a_job_claimed_after_its_check(db, monkeypatch):
+    manager = SyncJobManager()
+    running_elsewhere = manager._running_elsewhere
+    checks = []
+
+    def racing_check():
+        # The other worker inserts its job right after this worker looked
+        if not checks:
+            checks.append(None)
+            _other_worker_running(db)
+            return None
+        return running_elsewhere()
+
+    monkeypatch.setattr(manager, "_running_elsewhere", racing_check)
+
+    job, started = asyncio.run(manager.start("manual"))
+
+    assert not started
+    assert job["job_id"] == "other"
+    assert manager.current is None
+    assert db.query(SyncRun).count() == 1
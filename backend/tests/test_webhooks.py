@@ -0,0 +1,116 @@
+import asyncio
+import ipaddress
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services.webhook_service import (
+    UnsafeWebhookURL, WebhookService, _pinned, resolve_webhook_url, webhook_service,
+)
+
+SECRET = "s" * 32
+
+
+@pytest.mark.parametrize("url", [
+    "http://127.0.0.1/hook",
+    "http://10.1.2.3/hook",
+    "http://192.168.0.10:8080/hook",
+    "http://169.254.169.254/latest/meta-data/",
+    "http://100.64.0.1/hook",
+    "http://0.0.0.0/hook",
+    "http://[::1]/hook",
+    "http://[::ffff:127.0.0.1]/hook",
+    "http://[fd00:ec2::254]/hook",
+    "ftp://203.0.113.10/hook",
+    "http://203.0.113.10:99999/hook",
+])
+def test_non_public_webhook_urls_are_refused(url):
+    with pytest.raises(UnsafeWebhookURL):
+        asyncio.run(resolve_webhook_url(url))
+
+
+def test_public_address_is_allowed():
+    assert asyncio.run(resolve_webhook_url("https://8.8.8.8/hook")) == ipaddress.ip_address("8.8.8.8")
+    # Local development
+    assert asyncio.run(resolve_webhook_url("http://127.0.0.1/hook", allow_private=True)).is_loopback
+
+
+def test_requests_go_to_the_checked_address():
+    url, headers, extensions = _pinned("https://hooks.example.com:8443/a?b=c", ipaddress.ip_address("93.184.216.34"))
+    assert url == "https://93.184.216.34:8443/a?b=c"
+    assert headers == {"Host": "hooks.example.com:8443"}
+    assert extensions == {"sni_hostname": "hooks.example.com"}
+
+    url, headers, extensions = _pinned("http://hooks.example.com/a", ipaddress.ip_address("2001:db8::1"))
+    assert url == "http://[2001:db8::1]/a"
+    assert headers == {"Host": "hooks.example.com"} and extensions == {}
+
+
+def test_refused_url_is_not_posted():
+    service = WebhookService()
+    assert asyncio.run(service.post("http://127.0.0.1:9/hook", None, [{"type": "ping"}])) == (False, None)
+
+
+def test_slow_destinations_miss_the_deadline(monkeypatch):
+    service = WebhookService()
+    service.delivery_deadline_seconds = 0.1
+
+    async def post(url, secret, events):
+        if "slow" in url:
+            await asyncio.sleep(30)
+        return True, 200
+
+    monkeypatch.setattr(service, "post", post)
+    deliveries = [
+        {"url": "https://slow.example.com/hook", "secret": None, "event": {"n": 0}},
+        {"url": "https://fast.example.com/hook", "secret": None, "event": {"n": 1}},
+    ]
+
+    start = time.perf_counter()
+    results = asyncio.run(service.deliver(deliveries))
+
+    assert time.perf_counter() - start < 5
+    assert results["delivered"] == [1]
+    assert results["sent"] == 1 and results["failed"] == 1
+
+
+@pytest.fixture
+def client():
+    return TestClient(app)
+
+
+def test_private_webhook_url_is_rejected_on_create(client, db):
+    response = client.post("/api/users/", json={
+        "email": "hook@example.com", "webhook_url": "http://169.254.169.254/latest",
+    })
+    assert response.status_code == 400
+
+
+def test_webhook_test_requires_the_secret(client, db, monkeypatch):
+    posts = []
+
+    async def check_url(url):
+        pass
+
+    async def post(url, secret, events):
+        posts.append(url)
+        return True, 200
+
+    monkeypatch.setattr(webhook_service, "check_url", check_url)
+    monkeypatch.setattr(webhook_service, "post", post)
+    user = client.post("/api/users/", json={
+        "email": "hook@example.com", "webhook_url": "https://hooks.example.com/seatz", "webhook_secret": SECRET,
+    }).json()
+
+    assert client.post(f"/api/users/{user['id']}/webhook/test").status_code == 403
+    response = client.post(
+        f"/api/users/{user['id']}/webhook/test", headers={"X-Webhook-Secret": "wrong" * 4}
+    )
+    assert response.status_code == 403
+    assert posts == []
+
+    response = client.post(f"/api/users/{user['id']}/webhook/test", headers={"X-Webhook-Secret": SECRET})
+    assert response.status_code == 200 and response.json()["success"]
+    assert posts == ["https://hooks.example.com/seatz"]
@@ -0,0 +1 @@
+"""Developer tools: query plan checks, upstream simulator"""
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+EXPLAIN-based check that the hot router queries are served by an index.
+
+Runs against the database configured by DATABASE_URL (migrate it first with
+`alembic upgrade head`). Each query below mirrors one in app/routers; the
+check fails if its plan contains a full table scan.
+
+On SQLite the output of EXPLAIN QUERY PLAN is inspected for bare
+"SCAN <table>" steps. On Postgres sequential scans are disabled for the
+session so the planner reports whether an index *can* serve the query;
+on small tables it would otherwise prefer a Seq Scan regardless.
+
+Usage (from backend/):
+    python tools/check_query_plans.py
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import func, or_, select, true
+from sqlalchemy.orm import Query
+
+from app.database import engine
+from app.models.alert import Alert
+from app.models.class_slot import ClassSlot
+from app.models.course import Course, CourseArchive
+from app.models.sync_run import SyncRun
+
+# Placeholder ids; plans do not depend on the values
+USER_ID = 1
+COURSE_ID = 1
+SEMESTER_ID = 20253
+
+
+def hot_queries():
+    """(description, query) pairs mirroring the router queries"""
+    return [
+        ("alerts: duplicate check (create_alert)",
+         Query(Alert).filter(Alert.user_id == USER_ID, Alert.course_id == COURSE_ID).limit(1)),
+        ("alerts: per-user list (get_user_alerts)",
+         Query(Alert).filter(Alert.user_id == USER_ID)),
+        ("alerts: active per-user list (get_alerts)",
+         Query(Alert).filter(Alert.user_id == USER_ID, Alert.is_active == True)),
+        ("alerts: active alerts (check_and_send_notifications)",
+         Query(Alert).filter(Alert.is_active == True)),
+        ("alerts: fired and cooling-down alerts (notify_due_alerts)",
+         Query(Alert.id).filter(Alert.is_active == true(), Alert.state.in_(["fired", "cooling_down"]))),
+        ("alerts: armed section alerts on open codes (notify_due_alerts)",
+         Query(Alert.id).join(Course, Alert.course_id == Course.id).filter(
+             Alert.is_active == true(), Course.course_code.in_(["CSE110", "MAT110"]),
+             Alert.state.in_(["watching", "rearmed"])
+         )),
+        ("alerts: armed course code alerts on open codes (notify_due_alerts)",
+         Query(Alert.id).filter(
+             Alert.is_active == true(), Alert.course_id.is_(None), Alert.course_code.in_(["CSE110", "MAT110"]),
+             Alert.state.in_(["watching", "rearmed"])
+         )),
+        ("alerts: duplicate check of many sections (create_alerts)",
+         Query(Alert.course_id).filter(Alert.user_id == USER_ID, Alert.course_id.in_([COURSE_ID, COURSE_ID + 1]))),
+        ("alerts: alerts of many users (get_alerts_bulk)",
+         Query(Alert).filter(Alert.user_id.in_([USER_ID, USER_ID + 1]), Alert.is_active == True)),
+        ("alerts: alerts on many sections or codes (get_alerts_bulk)",
+         Query(Alert).filter(
+             or_(Alert.course_id.in_([COURSE_ID, COURSE_ID + 1]), Alert.course_code.in_(["CSE110", "MAT110"])),
+             Alert.is_active == True
+         )),
+        ("alerts: active alerts of a course",
+         Query(Alert).filter(Alert.is_active == True, Alert.course_id == COURSE_ID)),
+        ("courses: available non-lab listing (get_courses)",
+         Query(Course).filter(
+             Course.semester_session_id == SEMESTER_ID, Course.real_time_seat_count > 0, Course.section_type != "LAB"
+         ).limit(100)),
+        ("courses: full-section listing (get_courses available_only=false)",
+         Query(Course).filter(
+             Course.semester_session_id == SEMESTER_ID, Course.real_time_seat_count <= 0, Course.section_type != "LAB"
+         ).limit(100)),
+        ("courses: sections meeting in a day/time range (get_courses days, start_after)",
+         Query(Course.id).filter(
+             Course.semester_session_id == SEMESTER_ID, Course.section_type != "LAB",
+             Course.id.in_(select(ClassSlot.course_id).where(
+                 ClassSlot.weekday == "SUNDAY", ClassSlot.start_minute >= 840
+             ))
+         ).limit(100)),
+        ("courses: sections without lab days (get_courses exclude_days)",
+         Query(Course.id).filter(
+             Course.semester_session_id == SEMESTER_ID, Course.section_type != "LAB",
+             Course.id.notin_(select(ClassSlot.course_id).where(
+                 ClassSlot.weekday.in_(["SATURDAY"]), ClassSlot.kind == "LAB"
+             ))
+         ).limit(100)),
+        ("courses: exact code (get_courses search)",
+         Query(Course).filter(
+             Course.semester_session_id == SEMESTER_ID, Course.course_code == "CSE110", Course.section_type != "LAB"
+         )),
+        ("courses: available count (get_course_stats)",
+         Query(func.count(Course.id)).filter(
+             Course.semester_session_id == SEMESTER_ID, Course.real_time_seat_count > 0
+         )),
+        ("courses: active semester (active_semester_id)",
+         Query(func.max(Course.semester_session_id))),
+        ("courses_archive: past semester by code (get_courses_by_code)",
+         Query(CourseArchive).filter(
+             CourseArchive.semester_session_id == SEMESTER_ID, CourseArchive.course_code.ilike("CSE110")
+         )),
+        ("sync_runs: last successful run (get_sync_status)",
+         Query(SyncRun).filter(SyncRun.status == "succeeded").order_by(SyncRun.finished_at.desc()).limit(1)),
+        ("sync_runs: recent jobs (list_sync_jobs)",
+         Query(SyncRun).order_by(SyncRun.started_at.desc()).limit(20)),
+    ]
+
+
+def sqlite_plan(connection, sql):
+    rows = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}").fetchall()
+    steps = [row[-1] for row in rows]
+    full_scans = [
+        step for step in steps
+        if step.startswith("SCAN ") and "USING" not in step
+    ]
+    return steps, full_scans
+
+
+def postgresql_plan(connection, sql):
+    connection.exec_driver_sql("SET enable_seqscan = off")
+    rows = connection.exec_driver_sql(f"EXPLAIN {sql}").fetchall()
+    steps = [row[0] for row in rows]
+    full_scans = [step for step in steps if "Seq Scan" in step]
+    return steps, full_scans
+
+
+def main():
+    dialect = engine.dialect
+    explain = {"sqlite": sqlite_plan, "postgresql": postgresql_plan}.get(dialect.name)
+    if explain is None:
+        print(f"Unsupported dialect: {dialect.name}")
+        return 2
+
+    failures = 0
+    with engine.connect() as connection:
+        for description, query in hot_queries():
+            sql = str(query.statement.compile(dialect=dialect, compile_kwargs={"literal_binds": True}))
+            steps, full_scans = explain(connection, sql)
+            status = "FAIL" if full_scans else "ok"
+            print(f"[{status:>4}] {description}")
+            for step in steps:
+                print(f"         {step.strip()}")
+            failures += bool(full_scans)
+
+    print(f"\n{failures} of {len(hot_queries())} hot queries fall back to a full table scan")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,423 @@
+#!/usr/bin/env python3
+"""
+Registration-day load generator for a running SeatZ backend.
+
+Virtual users replay the traffic the frontend (frontend/src/services/api.js)
+sends, as one of these personas, picked by --mix weights:
+
+    dashboard  RealTimeDashboard: GET /api/realtime/courses and
+               /api/realtime/stats on load, then polls
+               GET /api/realtime/changes?since=<cursor> every 30 s (reloading
+               the full list when it answers resync_required) and stats
+               every 60 s
+    search     CourseSearchAutocomplete: types a course code, firing
+               GET /api/realtime/search?q=<prefix> whenever typing pauses
+               for the 300 ms debounce
+    alerts     AddAlertModal: one POST /api/alerts/bulk that finds or
+               creates the student by email and adds the alert
+    my_alerts  MyAlertsPage: GET /api/alerts/user/{id}, then
+               GET /api/courses/{course_id} for every alert
+
+Polling and think times are divided by --time-scale, so a 30 s poll with
+--time-scale 10 becomes 3 s. The number of active virtual users follows
+--profile over --duration seconds:
+
+    constant      --users the whole time
+    ramp          linear ramp to --users over the first half, then hold
+    spike         a tenth of --users, --users for the middle third, then back
+    registration  25%, 50%, 100%, 50% of --users in four equal steps
+
+At the end (and every --report-seconds) it prints requests, throughput,
+error rate and latency percentiles per endpoint; --json writes the final
+report to a file.
+
+Run the backend against the local upstream stand-in, then load it
+(from backend/):
+    python tools/upstream_simulator.py --port 8100 --scenario registration_rush &
+    REALTIME_API_URL=http://127.0.0.1:8100/raw-schedule BRACU_API_URL=http://127.0.0.1:8100 \\
+        uvicorn app.main:app --port 8000 &
+    python tools/loadgen.py --base-url http://127.0.0.1:8000 --users 200 --profile registration \\
+        --duration 120 --time-scale 10
+"""
+import argparse
+import asyncio
+import json
+import random
+import string
+import time
+import uuid
+from typing import List, Dict, Any, Optional, Callable
+
+import httpx
+
+# Frontend timings, in seconds
+COURSES_POLL_SECONDS = 30
+STATS_POLL_SECONDS = 60
+SEARCH_DEBOUNCE_SECONDS = 0.3
+SEARCH_MIN_CHARS = 2
+MY_ALERTS_REVISIT_SECONDS = 120
+PAGE_THINK_SECONDS = 20
+
+DEFAULT_MIX = "dashboard=55,search=25,alerts=12,my_alerts=8"
+REQUEST_TIMEOUT_SECONDS = 10
+
+PERCENTILES = (50, 90, 95, 99)
+
+
+def percentile(samples: List[float], pct: float) -> Optional[float]:
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+# Ramp profiles: fraction of --users active at progress 0..1
+
+def _profile_constant(progress: float) -> float:
+    return 1.0
+
+
+def _profile_ramp(progress: float) -> float:
+    return min(1.0, progress * 2)
+
+
+def _profile_spike(progress: float) -> float:
+    return 1.0 if 1 / 3 <= progress < 2 / 3 else 0.1
+
+
+def _profile_registration(progress: float) -> float:
+    return (0.25, 0.5, 1.0, 0.5)[min(int(progress * 4), 3)]
+
+
+PROFILES: Dict[str, Callable[[float], float]] = {
+    "constant": _profile_constant,
+    "ramp": _profile_ramp,
+    "spike": _profile_spike,
+    "registration": _profile_registration,
+}
+
+
+class EndpointStats:
+    def __init__(self):
+        self.latencies_ms: List[float] = []
+        self.errors = 0
+        self.statuses: Dict[str, int] = {}
+
+    def record(self, latency_ms: float, status: str, ok: bool):
+        self.latencies_ms.append(latency_ms)
+        self.statuses[status] = self.statuses.get(status, 0) + 1
+        if not ok:
+            self.errors += 1
+
+    def summary(self, elapsed: float) -> Dict[str, Any]:
+        count = len(self.latencies_ms)
+        summary = {
+            "requests": count,
+            "throughput_rps": round(count / elapsed, 2) if elapsed else None,
+            "error_rate": round(self.errors / count, 4) if count else 0,
+            "statuses": dict(sorted(self.statuses.items())),
+        }
+        for pct in PERCENTILES:
+            value = percentile(self.latencies_ms, pct)
+            summary[f"p{pct}_ms"] = round(value, 1) if value is not None else None
+        summary["max_ms"] = round(max(self.latencies_ms), 1) if count else None
+        return summary
+
+
+class LoadGenerator:
+    def __init__(
+        self,
+        base_url: str,
+        users: int,
+        duration: float,
+        profile: str = "constant",
+        mix: str = DEFAULT_MIX,
+        time_scale: float = 1.0,
+        seed: int = 0,
+    ):
+        if profile not in PROFILES:
+            raise ValueError(f"Unknown profile {profile!r}, expected one of {sorted(PROFILES)}")
+        self.base_url = base_url.rstrip("/")
+        self.users = users
+        self.duration = duration
+        self.profile = profile
+        self.mix = self._parse_mix(mix)
+        self.time_scale = time_scale
+        self.rng = random.Random(seed)
+
+        self.stats: Dict[str, EndpointStats] = {}
+        self.started_at = 0.0
+        self.active_users = 0
+        self.peak_users = 0
+        self._client: Optional[httpx.AsyncClient] = None
+        self._course_codes: List[str] = []
+        self._course_ids: List[int] = []
+        # Users created by the alerts persona, revisited by my_alerts
+        self._known_users: List[int] = []
+
+    @staticmethod
+    def _parse_mix(mix: str) -> Dict[str, float]:
+        weights = {}
+        for part in mix.split(","):
+            name, _, weight = part.partition("=")
+            name = name.strip()
+            if name not in PERSONAS:
+                raise ValueError(f"Unknown persona {name!r}, expected one of {sorted(PERSONAS)}")
+            weights[name] = float(weight or 1)
+        return weights
+
+    # Requests
+
+    async def request(
+        self, method: str, name: str, path: str, expected: tuple = (), **kwargs
+    ) -> Optional[httpx.Response]:
+        """Send one request, recording it under `name`; statuses in `expected` are not errors"""
+        stats = self.stats.get(name)
+        if stats is None:
+            stats = self.stats[name] = EndpointStats()
+        start = time.perf_counter()
+        try:
+            response = await self._client.request(method, path, **kwargs)
+        except httpx.HTTPError as e:
+            stats.record((time.perf_counter() - start) * 1000, type(e).__name__, False)
+            return None
+        ok = response.is_success or response.status_code in expected
+        stats.record((time.perf_counter() - start) * 1000, str(response.status_code), ok)
+        return response
+
+    async def sleep(self, seconds: float, jitter: float = 0.2):
+        """Sleep a frontend interval, compressed by --time-scale"""
+        await asyncio.sleep(seconds * self.rng.uniform(1 - jitter, 1 + jitter) / self.time_scale)
+
+    async def discover(self):
+        """Course codes to search for and course ids to alert on, as the frontend would see them"""
+        response = await self._client.get("/api/realtime/courses")
+        response.raise_for_status()
+        courses = response.json()["data"]["courses"]
+        self._course_codes = sorted({course["course_code"] for course in courses if course.get("course_code")})
+        response = await self._client.get("/api/courses/", params={"limit": 500})
+        if response.is_success:
+            self._course_ids = [course["id"] for course in response.json()]
+        if not self._course_codes:
+            raise RuntimeError("The backend returned no courses; is it pointed at a feed?")
+
+    # Virtual users
+
+    def _pick_persona(self) -> str:
+        names = list(self.mix)
+        return self.rng.choices(names, weights=[self.mix[name] for name in names])[0]
+
+    async def virtual_user(self, stop: asyncio.Event):
+        persona = PERSONAS[self._pick_persona()]
+        self.active_users += 1
+        self.peak_users = max(self.peak_users, self.active_users)
+        try:
+            while not stop.is_set():
+                await persona(self, stop)
+        except asyncio.CancelledError:
+            pass
+        finally:
+            self.active_users -= 1
+
+    async def run(self, report_seconds: float = 0) -> Dict[str, Any]:
+        limits = httpx.Limits(max_connections=max(self.users, 10), max_keepalive_connections=max(self.users, 10))
+        async with httpx.AsyncClient(
+            base_url=self.base_url, timeout=REQUEST_TIMEOUT_SECONDS, limits=limits, follow_redirects=True,
+        ) as client:
+            self._client = client
+            await self.discover()
+            self.stats = {}
+
+            shape = PROFILES[self.profile]
+            users: List[tuple] = []
+            self.started_at = time.perf_counter()
+            next_report = report_seconds
+            while True:
+                elapsed = time.perf_counter() - self.started_at
+                if elapsed >= self.duration:
+                    break
+                target = max(1, round(self.users * shape(elapsed / self.duration)))
+                while len(users) < target:
+                    stop = asyncio.Event()
+                    users.append((asyncio.create_task(self.virtual_user(stop)), stop))
+                while len(users) > target:
+                    # Leaving users finish their current page visit
+                    users.pop()[1].set()
+                if report_seconds and elapsed >= next_report:
+                    print(self.format_progress(elapsed), flush=True)
+                    next_report += report_seconds
+                await asyncio.sleep(0.25)
+
+            for _, stop in users:
+                stop.set()
+            tasks = [task for task, _ in users]
+            _, pending = await asyncio.wait(tasks, timeout=REQUEST_TIMEOUT_SECONDS) if tasks else (None, [])
+            for task in pending:
+                task.cancel()
+            elapsed = time.perf_counter() - self.started_at
+        return self.report(elapsed)
+
+    # Reporting
+
+    def report(self, elapsed: float) -> Dict[str, Any]:
+        total = EndpointStats()
+        for stats in self.stats.values():
+            total.latencies_ms.extend(stats.latencies_ms)
+            total.errors += stats.errors
+            for status, count in stats.statuses.items():
+                total.statuses[status] = total.statuses.get(status, 0) + count
+        return {
+            "base_url": self.base_url,
+            "profile": self.profile,
+            "users": self.users,
+            "peak_users": self.peak_users,
+            "mix": self.mix,
+            "time_scale": self.time_scale,
+            "elapsed_seconds": round(elapsed, 1),
+            "total": total.summary(elapsed),
+            "endpoints": {name: stats.summary(elapsed) for name, stats in sorted(self.stats.items())},
+        }
+
+    def format_progress(self, elapsed: float) -> str:
+        requests = sum(len(stats.latencies_ms) for stats in self.stats.values())
+        errors = sum(stats.errors for stats in self.stats.values())
+        return (
+            f"[{elapsed:6.1f}s] users={self.active_users:<5} requests={requests:<8} "
+            f"rps={requests / elapsed if elapsed else 0:8.1f} errors={errors}"
+        )
+
+
+# Personas: one page visit each; the virtual user repeats it until stopped
+
+async def dashboard(load: LoadGenerator, stop: asyncio.Event):
+    courses, _ = await asyncio.gather(
+        load.request("GET", "GET /api/realtime/courses", "/api/realtime/courses"),
+        load.request("GET", "GET /api/realtime/stats", "/api/realtime/stats"),
+    )
+    cursor = courses.json()["data"].get("cursor") if courses is not None and courses.is_success else None
+    since_stats = 0.0
+    # Stay on the page for a few polls
+    for _ in range(load.rng.randint(3, 10)):
+        if stop.is_set():
+            return
+        await load.sleep(COURSES_POLL_SECONDS, jitter=0.05)
+        since_stats += COURSES_POLL_SECONDS
+        changes = None
+        if cursor is not None:
+            changes = await load.request(
+                "GET", "GET /api/realtime/changes", "/api/realtime/changes", params={"since": cursor}
+            )
+        data = changes.json()["data"] if changes is not None and changes.is_success else None
+        if data is None or data.get("resync_required"):
+            # No usable cursor: fetchCourses falls back to the full list
+            courses = await load.request("GET", "GET /api/realtime/courses", "/api/realtime/courses")
+            data = courses.json()["data"] if courses is not None and courses.is_success else {}
+        cursor = data.get("cursor")
+        if since_stats >= STATS_POLL_SECONDS:
+            since_stats = 0.0
+            await load.request("GET", "GET /api/realtime/stats", "/api/realtime/stats")
+
+
+async def search(load: LoadGenerator, stop: asyncio.Event):
+    code = load.rng.choice(load._course_codes)
+    typed = code[:load.rng.randint(2, len(code))]
+    for index in range(1, len(typed) + 1):
+        if stop.is_set():
+            return
+        # Keystroke gap; a pause longer than the debounce fires a search
+        # (the endpoint needs at least SEARCH_MIN_CHARS characters)
+        gap = load.rng.uniform(0.08, 0.6)
+        if index >= SEARCH_MIN_CHARS and (gap >= SEARCH_DEBOUNCE_SECONDS or index == len(typed)):
+            await load.request(
+                "GET", "GET /api/realtime/search", "/api/realtime/search", params={"q": typed[:index].lower()}
+            )
+        await asyncio.sleep(gap / load.time_scale)
+    await load.sleep(PAGE_THINK_SECONDS)
+
+
+async def alerts(load: LoadGenerator, stop: asyncio.Event):
+    suffix = "".join(load.rng.choices(string.ascii_lowercase + string.digits, k=8))
+    email = f"loadgen-{uuid.uuid4().hex[:8]}{suffix}@g.bracu.ac.bd"
+    target = {"notification_interval_minutes": load.rng.choice((15, 30, 60))}
+    if load._course_ids:
+        target["course_id"] = load.rng.choice(load._course_ids)
+    else:
+        target["course_code"] = load.rng.choice(load._course_codes)
+    response = await load.request(
+        "POST", "POST /api/alerts/bulk", "/api/alerts/bulk",
+        json={"email": email, "full_name": email.split("@")[0], "alerts": [target]},
+    )
+    if response is not None and response.is_success:
+        data = response.json()["data"]
+        if data["created"]:
+            load._known_users.append(data["user"]["id"])
+    await load.sleep(PAGE_THINK_SECONDS)
+
+
+async def my_alerts(load: LoadGenerator, stop: asyncio.Event):
+    if not load._known_users:
+        # Nobody has created alerts yet: behave like a student creating one
+        return await alerts(load, stop)
+    user_id = load.rng.choice(load._known_users)
+    response = await load.request("GET", "GET /api/alerts/user/{id}", f"/api/alerts/user/{user_id}")
+    if response is not None and response.is_success:
+        course_ids = [alert["course_id"] for alert in response.json() if alert.get("course_id")]
+        await asyncio.gather(*(
+            load.request("GET", "GET /api/courses/{id}", f"/api/courses/{course_id}") for course_id in course_ids
+        ))
+    await load.sleep(MY_ALERTS_REVISIT_SECONDS)
+
+
+PERSONAS = {
+    "dashboard": dashboard,
+    "search": search,
+    "alerts": alerts,
+    "my_alerts": my_alerts,
+}
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    lines = [
+        f"{report['base_url']}  profile={report['profile']}  users={report['users']} "
+        f"(peak {report['peak_users']})  time_scale={report['time_scale']}  elapsed={report['elapsed_seconds']}s",
+        f"{'endpoint':<32} {'reqs':>7} {'rps':>8} {'err%':>6} {'p50':>8} {'p90':>8} {'p95':>8} {'p99':>8} {'max':>8}",
+    ]
+    rows = list(report["endpoints"].items()) + [("TOTAL", report["total"])]
+    for name, summary in rows:
+        def ms(key):
+            value = summary[key]
+            return f"{value:8.1f}" if value is not None else f"{'-':>8}"
+        lines.append(
+            f"{name:<32} {summary['requests']:>7} {summary['throughput_rps'] or 0:>8.1f} "
+            f"{summary['error_rate'] * 100:>6.2f} {ms('p50_ms')} {ms('p90_ms')} {ms('p95_ms')} {ms('p99_ms')} {ms('max_ms')}"
+        )
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--users", type=int, default=50, help="peak number of virtual users")
+    parser.add_argument("--duration", type=float, default=60, help="seconds")
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="ramp")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="persona weights, e.g. dashboard=60,search=40")
+    parser.add_argument("--time-scale", type=float, default=1.0, help="divide frontend poll and think times by this")
+    parser.add_argument("--report-seconds", type=float, default=10, help="progress line interval (0 = off)")
+    parser.add_argument("--json", help="write the final report to this file")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    load = LoadGenerator(
+        args.base_url, users=args.users, duration=args.duration, profile=args.profile,
+        mix=args.mix, time_scale=args.time_scale, seed=args.seed,
+    )
+    report = asyncio.run(load.run(report_seconds=args.report_seconds))
+    print(format_report(report))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+"""
+Minimal in-memory Redis stand-in speaking RESP2.
+
+Implements the commands the cache backend (app/cache.py) uses, plus a few
+for inspection: PING, ECHO, SELECT, CLIENT, GET, SET (EX/PX/NX/XX), DEL,
+UNLINK, EXISTS, EXPIRE, PEXPIRE, TTL, PTTL, KEYS, SCAN, DBSIZE, FLUSHDB,
+FLUSHALL, INFO. With --max-keys it evicts least recently used keys like
+maxmemory-policy allkeys-lru.
+
+Point the backend at it with:
+    CACHE_BACKEND=redis
+    REDIS_URL=redis://127.0.0.1:6380/0
+
+Command line (from backend/):
+    python tools/redis_standin.py --port 6380
+
+From tests and benchmarks:
+    with RedisStandIn() as redis_server:
+        os.environ["REDIS_URL"] = redis_server.url
+"""
+import argparse
+import fnmatch
+import socketserver
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Optional
+
+
+class _Error(Exception):
+    pass
+
+
+class RedisStandIn:
+    """Threaded TCP server holding one keyspace (SELECT is accepted but ignored)"""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, max_keys: int = 0):
+        self.host = host
+        self.port = port
+        self.max_keys = max_keys
+        self.stats = {"commands": 0, "hits": 0, "misses": 0, "evicted": 0, "expired": 0}
+        # key -> (value, expires_at or None), in least-recently-used order
+        self._data: "OrderedDict[bytes, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._server: Optional[socketserver.ThreadingTCPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        return f"redis://{self.host}:{self.port}/0"
+
+    def start(self) -> "RedisStandIn":
+        standin = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                while True:
+                    try:
+                        command = standin._read_command(self.rfile)
+                    except (ConnectionError, ValueError):
+                        return
+                    if command is None:
+                        return
+                    self.wfile.write(standin._execute(command))
+                    self.wfile.flush()
+
+        socketserver.ThreadingTCPServer.allow_reuse_address = True
+        self._server = socketserver.ThreadingTCPServer((self.host, self.port), Handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def __enter__(self) -> "RedisStandIn":
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    # Protocol
+
+    @staticmethod
+    def _read_command(rfile) -> Optional[List[bytes]]:
+        line = rfile.readline()
+        if not line:
+            return None
+        if not line.startswith(b"*"):
+            # Inline command (e.g. typed into telnet)
+            return line.strip().split()
+        count = int(line[1:])
+        parts = []
+        for _ in range(count):
+            header = rfile.readline()
+            if not header.startswith(b"$"):
+                raise ValueError("Expected bulk string")
+            length = int(header[1:])
+            parts.append(rfile.read(length + 2)[:-2])
+        return parts
+
+    @staticmethod
+    def _encode(value) -> bytes:
+        if value is None:
+            return b"$-1\r\n"
+        if isinstance(value, _Error):
+            return f"-ERR {value}\r\n".encode()
+        if isinstance(value, bool):
+            return f":{int(value)}\r\n".encode()
+        if isinstance(value, int):
+            return f":{value}\r\n".encode()
+        if isinstance(value, str):
+            return f"+{value}\r\n".encode()
+        if isinstance(value, bytes):
+            return b"$" + str(len(value)).encode() + b"\r\n" + value + b"\r\n"
+        if isinstance(value, list):
+            return b"*" + str(len(value)).encode() + b"\r\n" + b"".join(RedisStandIn._encode(item) for item in value)
+        raise TypeError(f"Cannot encode {type(value).__name__}")
+
+    def _execute(self, command: List[bytes]) -> bytes:
+        if not command:
+            return self._encode(_Error("empty command"))
+        name = command[0].decode().upper()
+        handler = getattr(self, f"_cmd_{name.lower()}", None)
+        if handler is None:
+            return self._encode(_Error(f"unknown command '{name}'"))
+        with self._lock:
+            self.stats["commands"] += 1
+            try:
+                return self._encode(handler(*command[1:]))
+            except _Error as e:
+                return self._encode(e)
+            except (TypeError, ValueError, IndexError):
+                return self._encode(_Error(f"wrong arguments for '{name}' command"))
+
+    # Keyspace helpers (called with the lock held)
+
+    def _live(self, key: bytes):
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        if entry[1] is not None and entry[1] <= time.monotonic():
+            del self._data[key]
+            self.stats["expired"] += 1
+            return None
+        return entry
+
+    def _evict(self):
+        while self.max_keys and len(self._data) > self.max_keys:
+            self._data.popitem(last=False)
+            self.stats["evicted"] += 1
+
+    def _live_keys(self) -> List[bytes]:
+        return [key for key in list(self._data) if self._live(key) is not None]
+
+    # Commands
+
+    def _cmd_ping(self, message: bytes = None):
+        return message if message is not None else "PONG"
+
+    def _cmd_echo(self, message: bytes):
+        return message
+
+    def _cmd_select(self, index: bytes):
+        return "OK"
+
+    def _cmd_client(self, *args):
+        return "OK"
+
+    def _cmd_get(self, key: bytes):
+        entry = self._live(key)
+        if entry is None:
+            self.stats["misses"] += 1
+            return None
+        self.stats["hits"] += 1
+        self._data.move_to_end(key)
+        return entry[0]
+
+    def _cmd_set(self, key: bytes, value: bytes, *options: bytes):
+        expires_at = None
+        only_if_missing = only_if_present = False
+        options = [option.upper() for option in options]
+        index = 0
+        while index < len(options):
+            option = options[index]
+            if option in (b"EX", b"PX"):
+                amount = int(options[index + 1])
+                expires_at = time.monotonic() + (amount if option == b"EX" else amount / 1000)
+                index += 2
+                continue
+            if option == b"NX":
+                only_if_missing = True
+            elif option == b"XX":
+                only_if_present = True
+            else:
+                raise _Error("syntax error")
+            index += 1
+        exists = self._live(key) is not None
+        if (only_if_missing and exists) or (only_if_present and not exists):
+            return None
+        self._data.pop(key, None)
+        self._data[key] = (value, expires_at)
+        self._evict()
+        return "OK"
+
+    def _cmd_del(self, *keys: bytes):
+        removed = 0
+        for key in keys:
+            if self._live(key) is not None:
+                del self._data[key]
+                removed += 1
+        return removed
+
+    _cmd_unlink = _cmd_del
+
+    def _cmd_exists(self, *keys: bytes):
+        return sum(1 for key in keys if self._live(key) is not None)
+
+    def _expire(self, key: bytes, seconds: float):
+        entry = self._live(key)
+        if entry is None:
+            return 0
+        self._data[key] = (entry[0], time.monotonic() + seconds)
+        return 1
+
+    def _cmd_expire(self, key: bytes, seconds: bytes):
+        return self._expire(key, int(seconds))
+
+    def _cmd_pexpire(self, key: bytes, milliseconds: bytes):
+        return self._expire(key, int(milliseconds) / 1000)
+
+    def _remaining(self, key: bytes, scale: int):
+        entry = self._live(key)
+        if entry is None:
+            return -2
+        if entry[1] is None:
+            return -1
+        return int((entry[1] - time.monotonic()) * scale)
+
+    def _cmd_ttl(self, key: bytes):
+        return self._remaining(key, 1)
+
+    def _cmd_pttl(self, key: bytes):
+        return self._remaining(key, 1000)
+
+    def _cmd_keys(self, pattern: bytes):
+        return [key for key in self._live_keys() if fnmatch.fnmatchcase(key.decode(errors="replace"), pattern.decode())]
+
+    def _cmd_scan(self, cursor: bytes, *options: bytes):
+        pattern, count = "*", 10
+        options = list(options)
+        for index in range(0, len(options) - 1, 2):
+            option = options[index].upper()
+            if option == b"MATCH":
+                pattern = options[index + 1].decode()
+            elif option == b"COUNT":
+                count = int(options[index + 1])
+        keys = self._live_keys()
+        start = int(cursor)
+        page = keys[start:start + count]
+        next_cursor = start + count if start + count < len(keys) else 0
+        matched = [key for key in page if fnmatch.fnmatchcase(key.decode(errors="replace"), pattern)]
+        return [str(next_cursor).encode(), matched]
+
+    def _cmd_dbsize(self):
+        return len(self._live_keys())
+
+    def _cmd_flushdb(self, *args):
+        self._data.clear()
+        return "OK"
+
+    _cmd_flushall = _cmd_flushdb
+
+    def _cmd_info(self, *sections):
+        lines = ["# Stats"] + [f"{name}:{value}" for name, value in self.stats.items()]
+        lines.append(f"keys:{len(self._data)}")
+        return "\r\n".join(lines).encode()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=6380)
+    parser.add_argument("--max-keys", type=int, default=0, help="evict least recently used keys beyond this (0 = unbounded)")
+    args = parser.parse_args()
+
+    server = RedisStandIn(host=args.host, port=args.port, max_keys=args.max_keys).start()
+    print(f"Redis stand-in listening at {server.url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
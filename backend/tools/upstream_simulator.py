@@ -0,0 +1,321 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the BRACU Connect feed.
+
+Serves connect.json at /raw-schedule (and /connect.json), mutating seat
+counts over time according to a scenario, with optional fault injection:
+latency, 5xx errors, truncated bodies and ETag / If-None-Match handling.
+
+Point the backend at it with:
+    BRACU_API_URL=http://127.0.0.1:8100
+    REALTIME_API_URL=http://127.0.0.1:8100/raw-schedule
+
+Command line (from backend/):
+    python tools/upstream_simulator.py --port 8100 --scenario registration_rush --tick-seconds 5
+
+From tests and benchmarks:
+    with UpstreamSimulator(scenario="mass_drop", error_rate=0.1) as upstream:
+        os.environ["REALTIME_API_URL"] = upstream.feed_url
+        upstream.tick(3)
+
+While running, GET /_control returns the simulator state and POST /_control
+with a JSON body (scenario, latency_ms, latency_jitter_ms, error_rate,
+truncate_rate, etag, tick) changes it, so load tests in other processes can
+script it as well.
+"""
+import argparse
+import json
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Dict, Any, Optional
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_FEED = os.path.join(os.path.dirname(BACKEND_DIR), "connect.json")
+
+FEED_PATHS = {"/raw-schedule", "/connect.json", "/"}
+CONTROL_PATH = "/_control"
+
+
+def _scenario_static(rng, sections):
+    pass
+
+
+def _scenario_steady(rng, sections):
+    """A trickle of single-seat adds and drops"""
+    for section in rng.sample(sections, max(1, len(sections) // 50)):
+        delta = rng.choice((-1, 1))
+        section["consumedSeat"] = min(section["capacity"], max(0, section["consumedSeat"] + delta))
+
+
+def _scenario_registration_rush(rng, sections):
+    """Open sections fill quickly; a few seats still get dropped"""
+    open_sections = [section for section in sections if section["consumedSeat"] < section["capacity"]]
+    for section in rng.sample(open_sections, len(open_sections) * 3 // 10):
+        section["consumedSeat"] = min(section["capacity"], section["consumedSeat"] + rng.randint(1, 3))
+    for section in rng.sample(sections, max(1, len(sections) // 200)):
+        section["consumedSeat"] = max(0, section["consumedSeat"] - 1)
+
+
+def _scenario_mass_drop(rng, sections):
+    """Many full sections free up several seats at once"""
+    full_sections = [section for section in sections if section["consumedSeat"] >= section["capacity"]]
+    for section in rng.sample(full_sections, len(full_sections) // 5):
+        section["consumedSeat"] = max(0, section["consumedSeat"] - rng.randint(1, 5))
+
+
+SCENARIOS = {
+    "static": _scenario_static,
+    "steady": _scenario_steady,
+    "registration_rush": _scenario_registration_rush,
+    "mass_drop": _scenario_mass_drop,
+}
+
+
+class UpstreamSimulator:
+    """Threaded HTTP server replaying a mutable copy of the feed"""
+
+    def __init__(
+        self,
+        feed_path: str = DEFAULT_FEED,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        scenario: str = "static",
+        tick_seconds: float = 0,
+        latency_ms: float = 0,
+        latency_jitter_ms: float = 0,
+        error_rate: float = 0,
+        truncate_rate: float = 0,
+        etag: bool = True,
+        seed: int = 0,
+        sections: Optional[List[Dict[str, Any]]] = None,
+    ):
+        if scenario not in SCENARIOS:
+            raise ValueError(f"Unknown scenario {scenario!r}, expected one of {sorted(SCENARIOS)}")
+        if sections is None:
+            with open(feed_path) as f:
+                sections = json.load(f)
+        # Private copies: scenarios mutate seat counts in place
+        self.sections: List[Dict[str, Any]] = [dict(section) for section in sections]
+        self.host = host
+        self.port = port
+        self.scenario = scenario
+        self.tick_seconds = tick_seconds
+        self.latency_ms = latency_ms
+        self.latency_jitter_ms = latency_jitter_ms
+        self.error_rate = error_rate
+        self.truncate_rate = truncate_rate
+        self.etag = etag
+
+        self.version = 1
+        self.stats = {"requests": 0, "served": 0, "not_modified": 0, "errors": 0, "truncated": 0}
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._body: Optional[bytes] = None
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._threads: List[threading.Thread] = []
+        self._stopping = threading.Event()
+
+    # Scripting API
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    @property
+    def feed_url(self) -> str:
+        return f"{self.base_url}/raw-schedule"
+
+    def tick(self, count: int = 1) -> int:
+        """Apply the current scenario `count` times; returns the new feed version"""
+        with self._lock:
+            for _ in range(count):
+                SCENARIOS[self.scenario](self._rng, self.sections)
+                self.version += 1
+            self._body = None
+            return self.version
+
+    def configure(self, **settings) -> Dict[str, Any]:
+        """Change scenario or fault settings at runtime"""
+        with self._lock:
+            for name in ("scenario", "latency_ms", "latency_jitter_ms", "error_rate", "truncate_rate", "etag", "tick_seconds"):
+                if name in settings:
+                    if name == "scenario" and settings[name] not in SCENARIOS:
+                        raise ValueError(f"Unknown scenario {settings[name]!r}")
+                    setattr(self, name, settings[name])
+        return self.state()
+
+    def state(self) -> Dict[str, Any]:
+        return {
+            "version": self.version,
+            "sections": len(self.sections),
+            "scenario": self.scenario,
+            "tick_seconds": self.tick_seconds,
+            "latency_ms": self.latency_ms,
+            "latency_jitter_ms": self.latency_jitter_ms,
+            "error_rate": self.error_rate,
+            "truncate_rate": self.truncate_rate,
+            "etag": self.etag,
+            "stats": dict(self.stats),
+        }
+
+    def start(self) -> "UpstreamSimulator":
+        self._server = ThreadingHTTPServer((self.host, self.port), self._handler_class())
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._stopping.clear()
+        self._threads = [threading.Thread(target=self._server.serve_forever, daemon=True)]
+        self._threads.append(threading.Thread(target=self._auto_tick, daemon=True))
+        for thread in self._threads:
+            thread.start()
+        return self
+
+    def stop(self):
+        self._stopping.set()
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        for thread in self._threads:
+            thread.join(timeout=5)
+        self._threads = []
+
+    def __enter__(self) -> "UpstreamSimulator":
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    # Internals
+
+    def _auto_tick(self):
+        while not self._stopping.wait(self.tick_seconds if self.tick_seconds > 0 else 0.5):
+            if self.tick_seconds > 0:
+                self.tick()
+
+    def _snapshot(self):
+        with self._lock:
+            if self._body is None:
+                self._body = json.dumps(self.sections).encode()
+            return self._body, self.version
+
+    def _handler_class(self):
+        simulator = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def _send(self, status: int, body: bytes = b"", headers: Optional[Dict[str, str]] = None):
+                self.send_response(status)
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                if body and self.command != "HEAD":
+                    self.wfile.write(body)
+
+            def _send_json(self, status: int, payload: Any):
+                self._send(status, json.dumps(payload).encode(), {"Content-Type": "application/json"})
+
+            def do_GET(self):
+                path = self.path.split("?", 1)[0]
+                if path == CONTROL_PATH:
+                    return self._send_json(200, simulator.state())
+                if path not in FEED_PATHS:
+                    return self._send_json(404, {"detail": "Not Found"})
+                self._serve_feed()
+
+            do_HEAD = do_GET
+
+            def do_POST(self):
+                if self.path.split("?", 1)[0] != CONTROL_PATH:
+                    return self._send_json(404, {"detail": "Not Found"})
+                length = int(self.headers.get("Content-Length") or 0)
+                try:
+                    settings = json.loads(self.rfile.read(length) or b"{}")
+                    ticks = int(settings.pop("tick", 0))
+                    state = simulator.configure(**settings)
+                    if ticks:
+                        simulator.tick(ticks)
+                        state = simulator.state()
+                except (ValueError, TypeError) as e:
+                    return self._send_json(400, {"detail": str(e)})
+                self._send_json(200, state)
+
+            def _serve_feed(self):
+                rng = simulator._rng
+                with simulator._lock:
+                    simulator.stats["requests"] += 1
+                    latency = simulator.latency_ms + rng.uniform(0, simulator.latency_jitter_ms)
+                    fail = rng.random() < simulator.error_rate
+                    truncate = rng.random() < simulator.truncate_rate
+                if latency > 0:
+                    time.sleep(latency / 1000)
+
+                if fail:
+                    with simulator._lock:
+                        simulator.stats["errors"] += 1
+                    return self._send_json(rng.choice((500, 502, 503)), {"detail": "Injected upstream failure"})
+
+                body, version = simulator._snapshot()
+                headers = {"Content-Type": "application/json", "Cache-Control": "no-cache"}
+                if simulator.etag:
+                    etag = f'"v{version}"'
+                    headers["ETag"] = etag
+                    if self.headers.get("If-None-Match") == etag:
+                        with simulator._lock:
+                            simulator.stats["not_modified"] += 1
+                        return self._send(304, headers={"ETag": etag})
+
+                if truncate:
+                    with simulator._lock:
+                        simulator.stats["truncated"] += 1
+                    # Advertise the truncated length so clients see a parse error,
+                    # not a connection reset
+                    body = body[: len(body) // 2]
+
+                with simulator._lock:
+                    simulator.stats["served"] += 1
+                self._send(200, body, headers)
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--feed", default=DEFAULT_FEED, help="path to connect.json")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--scenario", choices=sorted(SCENARIOS), default="steady")
+    parser.add_argument("--tick-seconds", type=float, default=10, help="apply the scenario this often (0 = manual)")
+    parser.add_argument("--latency-ms", type=float, default=0)
+    parser.add_argument("--latency-jitter-ms", type=float, default=0)
+    parser.add_argument("--error-rate", type=float, default=0, help="fraction of requests answered with 5xx")
+    parser.add_argument("--truncate-rate", type=float, default=0, help="fraction of bodies cut in half")
+    parser.add_argument("--no-etag", action="store_true", help="disable ETag / If-None-Match")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    simulator = UpstreamSimulator(
+        feed_path=args.feed, host=args.host, port=args.port, scenario=args.scenario,
+        tick_seconds=args.tick_seconds, latency_ms=args.latency_ms,
+        latency_jitter_ms=args.latency_jitter_ms, error_rate=args.error_rate,
+        truncate_rate=args.truncate_rate, etag=not args.no_etag, seed=args.seed,
+    ).start()
+    print(f"Serving {len(simulator.sections)} sections at {simulator.feed_url} (scenario: {simulator.scenario})")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        simulator.stop()
+
+
+if __name__ == "__main__":
+    main()
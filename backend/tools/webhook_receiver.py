@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+Local receiver for SeatZ webhooks.
+
+Accepts webhook POSTs at any path, checks the X-SeatZ-Signature and
+timestamp against a shared secret, and counts deliveries, events, retried
+deliveries (a repeated X-SeatZ-Delivery id) and rejections. It can inject
+latency and 503 errors to exercise retries.
+
+Point a user at it with:
+    PUT /api/users/{id}  {"webhook_url": "http://127.0.0.1:8200/hooks/seatz",
+                          "webhook_secret": "local-test-secret-0001"}
+
+Command line (from backend/):
+    python tools/webhook_receiver.py --port 8200 --secret local-test-secret-0001 --print
+
+From tests and benchmarks:
+    with WebhookReceiver(secret="local-test-secret-0001", error_rate=0.2) as receiver:
+        ...deliver to receiver.url...
+        receiver.stats["events"]
+
+While running, GET /_stats returns the counters and POST /_control with a
+JSON body (latency_ms, error_rate, reset) changes the receiver.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Dict, Any, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.webhook_service import DELIVERY_HEADER, SIGNATURE_HEADER, TIMESTAMP_HEADER, verify
+
+STATS_PATH = "/_stats"
+CONTROL_PATH = "/_control"
+
+
+class WebhookReceiver:
+    """Threaded HTTP server verifying and counting webhook deliveries"""
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        secret: Optional[str] = None,
+        tolerance_seconds: float = 300,
+        latency_ms: float = 0,
+        error_rate: float = 0,
+        keep_events: bool = False,
+        print_events: bool = False,
+        seed: int = 0,
+    ):
+        self.host = host
+        self.port = port
+        self.secret = secret
+        self.tolerance_seconds = tolerance_seconds
+        self.latency_ms = latency_ms
+        self.error_rate = error_rate
+        self.keep_events = keep_events
+        self.print_events = print_events
+        self.events: List[Dict[str, Any]] = []
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._seen_deliveries: set = set()
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+        self.reset()
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}/hooks/seatz"
+
+    def reset(self):
+        with self._lock:
+            self.stats = {
+                "requests": 0, "deliveries": 0, "events": 0, "redelivered": 0,
+                "bad_signature": 0, "stale_timestamp": 0, "bad_body": 0, "injected_errors": 0,
+            }
+            self.events = []
+            self._seen_deliveries = set()
+
+    def configure(self, **settings) -> Dict[str, Any]:
+        with self._lock:
+            for name in ("latency_ms", "error_rate"):
+                if name in settings:
+                    setattr(self, name, float(settings[name]))
+        if settings.get("reset"):
+            self.reset()
+        return self.state()
+
+    def state(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "url": self.url,
+                "signed": self.secret is not None,
+                "latency_ms": self.latency_ms,
+                "error_rate": self.error_rate,
+                "stats": dict(self.stats),
+            }
+
+    def start(self) -> "WebhookReceiver":
+        ThreadingHTTPServer.request_queue_size = 128
+        self._server = ThreadingHTTPServer((self.host, self.port), self._handler_class())
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def __enter__(self) -> "WebhookReceiver":
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    # Internals
+
+    def _receive(self, headers, body: bytes) -> int:
+        """Status code for one webhook POST"""
+        with self._lock:
+            self.stats["requests"] += 1
+            inject_error = self.error_rate and self._rng.random() < self.error_rate
+            if inject_error:
+                self.stats["injected_errors"] += 1
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+        if inject_error:
+            return 503
+
+        if self.secret is not None:
+            timestamp = headers.get(TIMESTAMP_HEADER) or ""
+            if not verify(self.secret, timestamp, body, headers.get(SIGNATURE_HEADER)):
+                with self._lock:
+                    self.stats["bad_signature"] += 1
+                return 401
+            if not timestamp.isdigit() or abs(time.time() - int(timestamp)) > self.tolerance_seconds:
+                with self._lock:
+                    self.stats["stale_timestamp"] += 1
+                return 401
+
+        try:
+            events = json.loads(body)["events"]
+        except (ValueError, KeyError, TypeError):
+            with self._lock:
+                self.stats["bad_body"] += 1
+            return 400
+
+        delivery_id = headers.get(DELIVERY_HEADER)
+        with self._lock:
+            if delivery_id in self._seen_deliveries:
+                # A retry of a batch already accepted: acknowledge without counting it twice
+                self.stats["redelivered"] += 1
+                return 200
+            self._seen_deliveries.add(delivery_id)
+            self.stats["deliveries"] += 1
+            self.stats["events"] += len(events)
+            if self.keep_events:
+                self.events.extend(events)
+        if self.print_events:
+            for event in events:
+                print(json.dumps(event), flush=True)
+        return 200
+
+    def _handler_class(self):
+        receiver = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def _send_json(self, status: int, payload: Any):
+                body = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _read_body(self) -> bytes:
+                return self.rfile.read(int(self.headers.get("Content-Length") or 0))
+
+            def do_GET(self):
+                if self.path.split("?", 1)[0] == STATS_PATH:
+                    return self._send_json(200, receiver.state())
+                self._send_json(404, {"detail": "Not Found"})
+
+            def do_POST(self):
+                body = self._read_body()
+                if self.path.split("?", 1)[0] == CONTROL_PATH:
+                    try:
+                        settings = json.loads(body or b"{}")
+                    except ValueError:
+                        return self._send_json(400, {"detail": "Invalid JSON"})
+                    return self._send_json(200, receiver.configure(**settings))
+                status = receiver._receive(self.headers, body)
+                self._send_json(status, {"ok": status == 200})
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8200)
+    parser.add_argument("--secret", help="verify signatures with this secret (unsigned deliveries accepted if omitted)")
+    parser.add_argument("--tolerance-seconds", type=float, default=300, help="reject timestamps older or newer than this")
+    parser.add_argument("--latency-ms", type=float, default=0)
+    parser.add_argument("--error-rate", type=float, default=0, help="fraction of deliveries answered with 503")
+    parser.add_argument("--print", action="store_true", help="print every received event as a JSON line")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    receiver = WebhookReceiver(
+        host=args.host, port=args.port, secret=args.secret, tolerance_seconds=args.tolerance_seconds,
+        latency_ms=args.latency_ms, error_rate=args.error_rate, print_events=args.print, seed=args.seed,
+    ).start()
+    print(f"Receiving webhooks at {receiver.url} (stats at {STATS_PATH})")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(json.dumps(receiver.state()["stats"]))
+        receiver.stop()
+
+
+if __name__ == "__main__":
+    main()
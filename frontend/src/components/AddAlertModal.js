@@ -14,7 +14,12 @@ const AddAlertModal = ({ course, isOpen, onClose }) => {
   const queryClient = useQueryClient();
 
   const createAlertMutation = useMutation(
-    (alertData) => alertsAPI.create(alertData),
+    async (alertData) => {
+      // Finds or creates the user by email and adds the alert in one request
+      const { data } = (await alertsAPI.createBulk(alertData)).data;
+      if (!data.created.length) throw new Error(data.skipped[0]?.reason || 'Failed to create alert');
+      return data;
+    },
     {
       onSuccess: () => {
         queryClient.invalidateQueries('alerts');
@@ -22,7 +27,7 @@ const AddAlertModal = ({ course, isOpen, onClose }) => {
         onClose();
       },
       onError: (error) => {
-        const message = error.response?.data?.detail || 'Failed to create alert';
+        const message = error.response?.data?.detail || error.message || 'Failed to create alert';
         toast.error(message);
       },
     }
@@ -44,30 +49,10 @@ const AddAlertModal = ({ course, isOpen, onClose }) => {
     setIsSubmitting(true);
 
     try {
-      // First, create or get user
-      const userResponse = await fetch('/api/users/email/' + email, {
-        method: 'GET',
-      });
-
-      let userId;
-      if (userResponse.ok) {
-        const user = await userResponse.json();
-        userId = user.id;
-      } else {
-        // Create new user
-        const createUserResponse = await fetch('/api/users', {
-          method: 'POST',
-          headers: { 'Content-Type': 'application/json' },
-          body: JSON.stringify({ email, full_name: email.split('@')[0] }),
-        });
-        const newUser = await createUserResponse.json();
-        userId = newUser.id;
-      }
-
       await createAlertMutation.mutateAsync({
-        user_id: userId,
-        course_id: course.id,
-        notification_interval_minutes: interval,
+        email,
+        full_name: email.split('@')[0],
+        alerts: [{ course_id: course.id, notification_interval_minutes: interval }],
       });
     } catch (error) {
       console.error('Error creating alert:', error);
@@ -45,9 +45,38 @@ export const realtimeAPI = {
   getByCode: (code) => api.get(`/api/realtime/courses/${code}`),
   search: (query) => api.get('/api/realtime/search', { params: { q: query } }),
   getStats: () => api.get('/api/realtime/stats'),
+  getChanges: (since) => api.get('/api/realtime/changes', { params: { since } }),
 };
 
-export const fetchCourses = (params = {}) => realtimeAPI.getAll().then(res => res.data.data.courses);
+// Last full course list and its snapshot cursor; polls only download the changes since
+const courseFeed = { cursor: null, courses: [] };
+
+const loadAllCourses = async () => {
+  const { data } = (await realtimeAPI.getAll()).data;
+  courseFeed.cursor = data.cursor;
+  courseFeed.courses = data.courses;
+  return courseFeed.courses;
+};
+
+export const fetchCourses = async (params = {}) => {
+  if (courseFeed.cursor == null) return loadAllCourses();
+
+  const { data } = (await realtimeAPI.getChanges(courseFeed.cursor)).data;
+  if (data.resync_required) return loadAllCourses();
+  if (data.courses.length || data.removed_section_ids.length) {
+    const changed = new Map(data.courses.map(course => [course.section_id, course]));
+    const removed = new Set(data.removed_section_ids);
+    const courses = [];
+    courseFeed.courses.forEach(course => {
+      if (removed.has(course.section_id)) return;
+      courses.push(changed.get(course.section_id) || course);
+      changed.delete(course.section_id);
+    });
+    courseFeed.courses = courses.concat([...changed.values()]);
+  }
+  courseFeed.cursor = data.cursor;
+  return courseFeed.courses;
+};
 export const fetchCourseById = (id) => coursesAPI.getById(id).then(res => res.data);
 export const fetchCourseStats = () => realtimeAPI.getStats().then(res => res.data.data);
 
@@ -64,6 +93,10 @@ export const usersAPI = {
 // Alerts API
 export const alertsAPI = {
   create: (alertData) => api.post('/api/alerts', alertData),
+  createBulk: (bulkData) => api.post('/api/alerts/bulk', bulkData),
+  getBulk: (params = {}) => api.get('/api/alerts/bulk', { params, paramsSerializer: { indexes: null } }),
+  updateBulk: (bulkData) => api.put('/api/alerts/bulk', bulkData),
+  deleteBulk: (bulkData) => api.post('/api/alerts/bulk/delete', bulkData),
   getAll: (params = {}) => api.get('/api/alerts', { params }),
   getById: (id) => api.get(`/api/alerts/${id}`),
   getByUser: (userId) => api.get(`/api/alerts/user/${userId}`),
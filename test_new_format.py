@@ -37,8 +37,9 @@ def test_api_endpoints():
         data = response.json()
         print(f"✓ /api/realtime/courses/CSE330 - Status: {response.status_code}")
         
-        if 'data' in data and data['data']:
-            course = data['data']
+        if 'data' in data and data['data'] and data['data'].get('sections'):
+            print(f"  Sections: {data['data']['total']}")
+            course = data['data']['sections'][0]
             print(f"  Course: {course.get('course_code')} - {course.get('course_title', 'N/A')}")
             has_schedule = 'schedule_data' in course
             print(f"  Schedule data present: {has_schedule}")